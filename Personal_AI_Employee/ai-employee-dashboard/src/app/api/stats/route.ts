@@ -20,6 +20,8 @@ interface HistoricalDataPoint {
 }
 
 let historicalData: HistoricalDataPoint[] = [];
+// Window kept for trends; one point per request, so its size is reported with the stats
+const HISTORY_WINDOW_MS = 60 * 60 * 1000;
 
 export async function GET() {
   try {
@@ -52,8 +54,8 @@ export async function GET() {
     historicalData.push({ timestamp: now, stats: currentStats });
 
     // Keep only the last hour of data to prevent memory issues
-    const oneHourAgo = now - (60 * 60 * 1000);
-    historicalData = historicalData.filter((item: HistoricalDataPoint) => item.timestamp > oneHourAgo);
+    const windowStart = now - HISTORY_WINDOW_MS;
+    historicalData = historicalData.filter((item: HistoricalDataPoint) => item.timestamp > windowStart);
 
     // Calculate trends based on historical data
     const trends = calculateTrends(historicalData, currentStats);
@@ -65,6 +67,10 @@ export async function GET() {
       total,
       social: socialMetrics,
       trends,
+      history: {
+        points: historicalData.length,
+        windowMinutes: HISTORY_WINDOW_MS / 60000,
+      },
     });
   } catch (error) {
     console.error('Error fetching stats:', error);
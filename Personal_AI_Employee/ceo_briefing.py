@@ -13,6 +13,9 @@ from datetime import datetime, timedelta
 from typing import Dict, List
 import logging
 
+from utils.activity_log import compact_activity
+from utils.vault_records import scan_records
+
 class CEOBriefingGenerator:
     """Generate executive briefings with key metrics and insights"""
 
@@ -43,6 +46,12 @@ class CEOBriefingGenerator:
         date_str = date.strftime('%Y-%m-%d')
         log_file = Path(f'AI_Employee_Vault/Logs/{date_str}.json')
 
+        # Fold the day's append-only activity segments into the legacy JSON shape
+        try:
+            compact_activity(log_file.parent, date)
+        except Exception as e:
+            self.logger.error(f"Error compacting activity log for {date_str}: {e}")
+
         metrics = {
             'date': date_str,
             'total_actions': 0,
@@ -127,33 +136,18 @@ class CEOBriefingGenerator:
     def get_pending_approvals(self) -> List[Dict]:
         """Get list of pending approval requests"""
         pending_dir = Path(self.config['directories']['pending_approval'])
-        pending_files = list(pending_dir.glob('*.md'))
 
         approvals = []
-        for file in pending_files:
-            try:
-                with open(file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-
-                # Parse frontmatter
-                if content.startswith('---'):
-                    parts = content.split('---', 2)
-                    if len(parts) >= 3:
-                        frontmatter_text = parts[1].strip()
-                        frontmatter = {}
-                        for line in frontmatter_text.split('\n'):
-                            if ':' in line:
-                                key, value = line.split(':', 1)
-                                frontmatter[key.strip()] = value.strip()
-
-                        approvals.append({
-                            'file': file.name,
-                            'action_type': frontmatter.get('action_type', 'unknown'),
-                            'priority': frontmatter.get('priority', 'medium'),
-                            'created': frontmatter.get('created', 'unknown')
-                        })
-            except Exception as e:
-                self.logger.error(f"Error reading approval file {file}: {e}")
+        for record in scan_records(pending_dir):
+            if not record.frontmatter:
+                continue
+
+            approvals.append({
+                'file': record.path.name,
+                'action_type': record.frontmatter.get('action_type', 'unknown'),
+                'priority': record.priority,
+                'created': record.frontmatter.get('created', 'unknown')
+            })
 
         return approvals
 
@@ -46,8 +46,10 @@ module.exports = {
       script: 'orchestrator.py',
       interpreter: 'python3',
       watch: false,
-      autorestart: false,
-      cron_restart: '*/5 * * * *',  // Every 5 minutes
+      autorestart: true,  // Long-lived: dispatches on file events, reconciles every 5 minutes
+      max_restarts: 10,
+      min_uptime: '10s',
+      restart_delay: 5000,
       error_file: 'AI_Employee_Vault/Logs/pm2-orchestrator-error.log',
       out_file: 'AI_Employee_Vault/Logs/pm2-orchestrator-out.log',
       log_date_format: 'YYYY-MM-DD HH:mm:ss'
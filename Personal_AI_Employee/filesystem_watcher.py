@@ -2,18 +2,30 @@
 File System Watcher for Personal AI Employee
 
 Monitors a designated drop folder for new files and creates action items.
+Files dropped while the watcher was down are found on startup by comparing
+the folder with the manifest of processed files. Each file is classified by
+its content, and its text preview and key fields are extracted on the
+shared content extractor's process pool.
 """
 
 import time
 import logging
+import threading
 from pathlib import Path
 from datetime import datetime
 import json
-import subprocess
-import sys
+from concurrent.futures import ThreadPoolExecutor
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
+from utils.dashboard_writer import get_dashboard_writer
+from utils.drop_manifest import DropManifest, hash_file
+from utils.file_content import get_content_extractor, format_frontmatter
+
+SUPPORTED_EXTENSIONS = ['.pdf', '.txt', '.docx', '.doc', '.xlsx', '.xls', '.csv', '.jpg', '.jpeg', '.png']
+MANIFEST_FILE = '.inbox_manifest.jsonl'  # processed files, for the startup reconciliation scan
+HANDLER_WORKERS = 4  # files analyzed at once, for live events and the startup scan
+
 # Configure logging to show INFO and above
 logging.basicConfig(
     level=logging.INFO,
@@ -32,6 +44,13 @@ class DropFolderHandler(FileSystemEventHandler):
         self.vault_path = Path(config['directories']['inbox']).parent  # Get parent of inbox (AI_Employee_Vault)
         self.needs_action = Path(config['directories']['needs_action'])
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.dashboard = get_dashboard_writer(str(self.vault_path), track_moves=False)  # the orchestrator moves tasks
+        self.manifest = DropManifest(MANIFEST_FILE)
+        self.extractor = get_content_extractor()
+        # Extraction and hashing can take seconds per file; keep them off the observer thread
+        self.executor = ThreadPoolExecutor(max_workers=HANDLER_WORKERS, thread_name_prefix='inbox')
+        self.lock = threading.Lock()
+        self.processing = set()  # names being handled, so a live event and the startup scan don't both take a file
 
         # Ensure the destination directories exist
         self.needs_action.mkdir(parents=True, exist_ok=True)
@@ -45,40 +64,59 @@ class DropFolderHandler(FileSystemEventHandler):
 
         # Log the detected file creation
         self.logger.info(f"Detected new file: {source.name}")
+        self.executor.submit(self.handle_file, source)
+
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self.manifest.forget(Path(event.src_path).name)
+
+    def is_ignored(self, source: Path) -> bool:
+        return source.suffix.lower() not in SUPPORTED_EXTENSIONS
 
+    def handle_file(self, source: Path):
+        """Create the action item for a file unless this version was already processed"""
         # Only process files that exist and have valid extensions
-        if source.exists() and source.suffix.lower() in ['.pdf', '.txt', '.docx', '.doc', '.xlsx', '.xls', '.csv', '.jpg', '.jpeg', '.png']:
+        if not source.exists() or self.is_ignored(source):
+            self.logger.info(f"Ignoring file: {source.name} (unsupported type)")
+            return
+
+        with self.lock:
+            if source.name in self.processing:
+                return
+            self.processing.add(source.name)
+        try:
+            stat = source.stat()
+            if self.manifest.unchanged(source, stat.st_size, stat.st_mtime_ns):
+                return
+
             # Create metadata file in Needs_Action directory
-            self.create_metadata(source)
+            if self.create_metadata(source):
+                self.manifest.record(source.name, stat.st_size, stat.st_mtime_ns, hash_file(source))
 
             self.logger.info(f"Processed new file: {source.name}")
-        else:
-            self.logger.info(f"Ignoring file: {source.name} (unsupported type)")
+        except OSError as e:
+            self.logger.error(f"Error processing file {source.name}: {e}")
+        finally:
+            with self.lock:
+                self.processing.discard(source.name)
+
+    def close(self):
+        """Finish the files in progress, then stop the extractor's pool"""
+        self.executor.shutdown(wait=True)
+        self.extractor.close()
 
     def create_metadata(self, source):
-        """Create metadata for the dropped file"""
+        """Create metadata for the dropped file; returns its path, or None on error"""
         # Create a unique filename for the metadata
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         meta_filename = f"FILE_{timestamp}_{source.name.replace('.', '_')}_info.md"
         meta_path = self.needs_action / meta_filename
 
-        # Handle different file types appropriately
         try:
-            if source.suffix.lower() in ['.txt', '.md']:
-                # Text files - read content
-                content_preview = source.read_text(encoding='utf-8', errors='ignore')[:500]
-            elif source.suffix.lower() in ['.pdf']:
-                # PDF files - don't try to read content, just note it's a PDF
-                content_preview = f"[PDF file: {source.name}] Contains binary PDF data - will be processed separately"
-            elif source.suffix.lower() in ['.jpg', '.jpeg', '.png']:
-                # Image files
-                content_preview = f"[Image file: {source.name}] Contains image data - will be processed separately"
-            elif source.suffix.lower() in ['.docx', '.doc']:
-                # Document files
-                content_preview = f"[Document file: {source.name}] Contains document data - will be processed separately"
-            else:
-                # Other files
-                content_preview = f"[File: {source.name}] Contains binary data - will be processed separately"
+            # Sniff the content; PDF/DOCX/XLSX/CSV text is extracted in the extractor's worker processes
+            analysis = self.extractor.analyze(source)
+            content_preview = analysis['preview'] or \
+                f"[{analysis['content_type'].upper()} file: {source.name}] No extractable text - will be processed separately"
 
             meta_content = f"""---
 type: file_drop
@@ -87,6 +125,8 @@ size: {source.stat().st_size}
 timestamp: {datetime.now().isoformat()}
 status: pending
 file_path: {str(source.absolute())}
+detected_type: {analysis['detected_type']}
+{format_frontmatter(analysis)}
 ---
 
 # New File Dropped for Processing
@@ -94,7 +134,7 @@ file_path: {str(source.absolute())}
 **Original Name:** {source.name}
 **Size:** {source.stat().st_size} bytes
 **Received:** {datetime.now().isoformat()}
-**Type:** {source.suffix.lower()}
+**Type:** {source.suffix.lower()} ({analysis['content_type']}, detected as {analysis['detected_type']})
 
 ## Action Required
 - [ ] Review content
@@ -112,23 +152,18 @@ file_path: {str(source.absolute())}
             self.logger.info(f"Created metadata file: {meta_path}")
 
             # Update dashboard to reflect the new file
-            self.update_dashboard()
+            self.update_dashboard(meta_filename, source.name)
+            return meta_path
 
         except Exception as e:
             self.logger.error(f"Error creating metadata for file {source}: {e}")
+            return None
 
-    def update_dashboard(self):
-        """Update the dashboard to reflect changes"""
-        try:
-            # Run the update-dashboard skill
-            result = subprocess.run([sys.executable, '.claude/skills/update-dashboard/skill.py'],
-                                  capture_output=True, text=True)
-            if result.returncode == 0:
-                print(f"Dashboard updated successfully after file drop: {result.stdout}")
-            else:
-                print(f"Dashboard update failed: {result.stderr}")
-        except Exception as e:
-            print(f"Error updating dashboard: {e}")
+    def update_dashboard(self, meta_filename: str, original_name: str):
+        """Update the dashboard to reflect changes (writes are coalesced)"""
+        self.dashboard.move(meta_filename, None, 'Needs_Action')
+        self.dashboard.record_activity('file_drop', original_name, '📥 Received')
+        self.dashboard.request_render()
 
 
 class FileSystemWatcher:
@@ -156,6 +191,7 @@ class FileSystemWatcher:
 
         self.observer.start()
         logger.info(f"Started watching folder: {self.drop_folder}")
+        self.reconcile(event_handler)
 
         try:
             while True:
@@ -165,6 +201,15 @@ class FileSystemWatcher:
             logger.info("File System Watcher stopped by user")
 
         self.observer.join()
+        event_handler.close()
+
+    def reconcile(self, event_handler: DropFolderHandler):
+        """Process files dropped while the watcher was down, on the handler's workers"""
+        missed = event_handler.manifest.pending(self.drop_folder, event_handler.is_ignored)
+        if not missed:
+            return
+        logger.info(f"Startup scan: {len(missed)} file(s) dropped while the watcher was down")
+        list(event_handler.executor.map(event_handler.handle_file, missed))
 
 
 if __name__ == "__main__":
@@ -2,33 +2,52 @@
 Personal AI Employee Orchestrator - Master Controller
 
 Coordinates the entire AI Employee system:
-- Scans Needs_Action folder every 5 minutes
+- Watches Needs_Action and Approved, dispatching new files as they arrive
+  (with a 5-minute reconciliation scan as a safety net)
 - Routes tasks to appropriate Claude Code skills
 - Manages task state (Needs_Action → In_Progress → Done)
 - Executes approved actions via MCP servers
 - Updates Dashboard.md with activity
-- Handles up to 10 concurrent tasks
+- Handles up to 10 concurrent tasks, urgent work first
 """
 
 import os
+import sys
 import json
 import time
+import heapq
 import logging
-import subprocess
+import functools
+import itertools
 import threading
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, Future, wait
 from dotenv import load_dotenv
+from watchdog.observers import Observer
+from watchdog.events import FileSystemEventHandler
 from ralph_wiggum_loop import RalphWiggumLoop
+from utils.activity_log import get_activity_log
+from utils.cycle_profiler import add_profile_arguments, apply_profile_arguments, get_cycle_profiler
+from utils.dashboard_writer import get_dashboard_writer
+from utils.keyword_matcher import get_keyword_matcher
+from utils.memory_monitor import RESTART_EXIT_CODE, get_memory_monitor
+from utils.llm_backend import get_llm_backend
+from utils.skill_registry import get_skill_registry
+from utils.stage_metrics import get_stage_metrics
+from utils.slo_tracker import get_trace_log, new_trace_id, approved_at
+from utils.task_journal import TaskJournal, recover_tasks
+from utils.vault_records import load_record, parse_frontmatter
 
 # Load environment variables
 load_dotenv()
 
 # Configuration
-CHECK_INTERVAL = 300  # 5 minutes in seconds
+CHECK_INTERVAL = 300  # Reconciliation scan interval (5 minutes in seconds)
+EVENT_SETTLE_SECONDS = 0.2  # Quiet period before a new file is dispatched
 MAX_CONCURRENT_TASKS = 10
+PRIORITY_AGING_SECONDS = 600  # Waiting this long lifts a task by one priority level
 DRY_RUN = os.getenv('DRY_RUN', 'true').lower() == 'true'
 
 # Directories
@@ -38,8 +57,20 @@ DONE_DIR = Path('AI_Employee_Vault/Done')
 APPROVED_DIR = Path('AI_Employee_Vault/Approved')
 PLANS_DIR = Path('AI_Employee_Vault/Plans')
 LOGS_DIR = Path('AI_Employee_Vault/Logs')
+QUARANTINE_DIR = Path('AI_Employee_Vault/Quarantine')
+TASK_JOURNAL_FILE = LOGS_DIR / 'task_journal.jsonl'
 DASHBOARD_FILE = Path('AI_Employee_Vault/Dashboard.md')
 
+# Scheduling rank per priority label (lower runs first)
+PRIORITY_RANKS = {
+    'critical': 0,
+    'urgent': 0,
+    'high': 0,
+    'medium': 1,
+    'normal': 1,
+    'low': 2,
+}
+
 # Skill mappings
 SKILL_MAP = {
     'email': '.claude/skills/email_reply_skill.md',
@@ -65,24 +96,12 @@ class TaskProcessor:
 
     def __init__(self, dry_run: bool = True):
         self.dry_run = dry_run
+        self.skills = get_skill_registry()
+        self.llm = get_llm_backend()
 
     def parse_frontmatter(self, content: str) -> Tuple[Dict, str]:
         """Parse YAML frontmatter from markdown"""
-        frontmatter = {}
-        body = content
-
-        if content.startswith('---'):
-            parts = content.split('---', 2)
-            if len(parts) >= 3:
-                frontmatter_text = parts[1].strip()
-                body = parts[2].strip()
-
-                for line in frontmatter_text.split('\n'):
-                    if ':' in line:
-                        key, value = line.split(':', 1)
-                        frontmatter[key.strip()] = value.strip()
-
-        return frontmatter, body
+        return parse_frontmatter(content)
 
     def detect_file_type(self, file_path: Path, frontmatter: Dict) -> str:
         """Detect file type for file_drop tasks"""
@@ -99,9 +118,7 @@ class TaskProcessor:
 
     def detect_whatsapp_intent(self, body: str) -> str:
         """Detect intent from WhatsApp message"""
-        body_lower = body.lower()
-
-        if any(keyword in body_lower for keyword in ['invoice', 'bill', 'payment']):
+        if 'invoice' in get_keyword_matcher().categories(body):
             return 'invoice'
         else:
             return 'email'
@@ -127,77 +144,199 @@ class TaskProcessor:
 
         return None
 
-    def call_claude_code(self, skill_path: str, task_file: Path) -> Tuple[bool, str]:
-        """Call Claude Code with the appropriate skill"""
+    def call_claude_code(self, skill_path: str, task_file: Path,
+                         output_file: Optional[Path] = None) -> Tuple[bool, str]:
+        """Call Claude Code with the appropriate skill.
+
+        Backends that cannot write to the vault (HTTP) are asked for the plan
+        as text instead, and their reply is appended to output_file.
+        """
         try:
             # Check if we're already in a Claude Code session
             if os.getenv('CLAUDECODE'):
                 logger.info("Already in Claude Code session, skipping nested call")
                 return True, "Skipped: Already in Claude Code session"
 
-            if not Path(skill_path).exists():
+            # Skill text and prompt prefix are cached until the file changes
+            skill = self.skills.get(skill_path)
+            if skill is None:
                 logger.warning(f"Skill not found: {skill_path}, using default processing")
                 return True, "Skill not found, used default processing"
 
-            # Read skill content
-            with open(skill_path, 'r', encoding='utf-8') as f:
-                skill_content = f.read()
-
             # Read task content
             with open(task_file, 'r', encoding='utf-8') as f:
                 task_content = f.read()
 
-            # Construct prompt for Claude Code
-            prompt = f"""Using the skill defined below, process this task:
-
-SKILL:
-{skill_content}
-
-TASK:
-{task_content}
-
-Create a plan in the Plans directory and any necessary approval requests."""
-
             if self.dry_run:
                 logger.info(f"DRY RUN: Would call Claude Code with skill {skill_path}")
                 logger.info(f"DRY RUN: Task file: {task_file}")
                 return True, "DRY RUN: Simulated Claude Code call"
 
-            # Call Claude Code via subprocess
-            # Note: This is a simplified version. In production, you'd use the Claude API
-            result = subprocess.run(
-                ['claude', 'code', '--prompt', prompt],
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minute timeout
-            )
-
-            if result.returncode == 0:
-                return True, result.stdout
-            else:
-                return False, result.stderr
+            # One pooled request: constant skill prefix + per-task suffix
+            prefix = skill.prefix if self.llm.acts_on_files else skill.reply_prefix
+            response = self.llm.complete(prefix, task_content)
+            logger.info(f"LLM call for {task_file.name} took {response.elapsed:.2f}s")
+            if response.ok and not self.llm.acts_on_files:
+                self.save_skill_output(output_file, skill.name, response.text)
+            return response.ok, response.message
 
-        except subprocess.TimeoutExpired:
-            return False, "Claude Code call timed out"
         except Exception as e:
             logger.warning(f"Error calling Claude Code: {e}")
             return True, f"Skipped Claude Code call: {e}"
 
 
+    def save_skill_output(self, output_file: Optional[Path], skill_name: str, text: str):
+        """Append a text-only backend's reply to the plan file"""
+        if not text.strip():
+            return
+        if output_file is None:
+            logger.warning(f"No plan file to save {skill_name} output to; reply discarded")
+            return
+        try:
+            with open(output_file, 'a', encoding='utf-8') as f:
+                f.write(f"\n## Skill Output ({skill_name})\n\n{text.strip()}\n")
+            logger.info(f"Saved {skill_name} output to {output_file.name}")
+        except OSError as e:
+            logger.error(f"Error saving skill output to {output_file}: {e}")
+
+
+class TaskScheduler:
+    """Priority queue that feeds the worker pool one free slot at a time.
+
+    Ordering uses a static heap key of ``rank + enqueued_at / aging_seconds``.
+    Every waiting item ages at the same rate, so comparing effective ranks at
+    any later moment gives the same order as comparing these keys: urgent work
+    jumps the queue, and older work eventually overtakes newer urgent work.
+    """
+
+    def __init__(self, executor: ThreadPoolExecutor, max_in_flight: int,
+                 aging_seconds: float = PRIORITY_AGING_SECONDS):
+        self.executor = executor
+        self.aging_seconds = aging_seconds
+        self.slots = threading.Semaphore(max_in_flight)
+        self.heap = []
+        self.counter = itertools.count()
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self.dispatch_loop, name='task-scheduler', daemon=True)
+        self.thread.start()
+
+    def __len__(self) -> int:
+        with self.condition:
+            return len(self.heap)
+
+    def push(self, file_path: Path, handler, priority: str = 'normal') -> Future:
+        """Queue a file for its handler; the returned future resolves when it has run"""
+        rank = PRIORITY_RANKS.get(str(priority).strip().lower(), PRIORITY_RANKS['normal'])
+        key = rank + time.monotonic() / self.aging_seconds
+        future = Future()
+
+        with self.condition:
+            heapq.heappush(self.heap, (key, next(self.counter), file_path, handler, future))
+            self.condition.notify()
+
+        return future
+
+    def dispatch_loop(self):
+        """Hand the best-ranked item to the pool whenever a slot frees up"""
+        while True:
+            self.slots.acquire()
+            with self.condition:
+                while not self.heap:
+                    self.condition.wait()
+                _, _, file_path, handler, future = heapq.heappop(self.heap)
+
+            if not future.set_running_or_notify_cancel():
+                self.slots.release()
+                continue
+
+            try:
+                inner = self.executor.submit(handler, file_path)
+            except RuntimeError as e:
+                # Executor is shutting down
+                self.slots.release()
+                future.set_exception(e)
+                continue
+
+            inner.add_done_callback(lambda f, outer=future: self.complete(f, outer))
+
+    def complete(self, inner: Future, outer: Future):
+        """Free the slot and propagate the worker's outcome"""
+        self.slots.release()
+        error = inner.exception()
+        if error:
+            outer.set_exception(error)
+        else:
+            outer.set_result(inner.result())
+
+
+class VaultEventHandler(FileSystemEventHandler):
+    """Forwards file events from watched vault folders to the orchestrator"""
+
+    def __init__(self, orchestrator: 'Orchestrator'):
+        super().__init__()
+        self.orchestrator = orchestrator
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.orchestrator.notify_file(Path(event.src_path))
+
+    def on_modified(self, event):
+        # Writers may still be filling the file; restart its settle timer
+        if not event.is_directory:
+            self.orchestrator.notify_file(Path(event.src_path))
+
+    def on_moved(self, event):
+        # Approvals arrive by moving files from Pending_Approval into Approved
+        if not event.is_directory:
+            self.orchestrator.notify_file(Path(event.dest_path))
+
+
 class Orchestrator:
     """Main orchestrator class"""
 
     def __init__(self, dry_run: bool = DRY_RUN):
         self.dry_run = dry_run
         self.task_processor = TaskProcessor(dry_run)
+        self.keywords = get_keyword_matcher()
         self.executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_TASKS)
+        self.scheduler = TaskScheduler(self.executor, MAX_CONCURRENT_TASKS)
         self.active_tasks = {}
+        self.pending_events = {}
+        self.retry_pending = set()
         self.lock = threading.Lock()
 
+        # Single writer for Logs/activity/*.jsonl, compacted to Logs/YYYY-MM-DD.json on read
+        self.activity_log = get_activity_log(str(LOGS_DIR))
+
+        # Folder counts live in memory and are updated on every state transition
+        self.dashboard = get_dashboard_writer(str(DASHBOARD_FILE.parent))
+
+        # Per-stage latency histograms, exported to Logs/metrics.json every interval
+        self.metrics = get_stage_metrics(str(LOGS_DIR))
+
+        # Optional per-cycle profiles in Logs/profiles (PROFILE_MODE / --profile)
+        self.profiler = get_cycle_profiler('orchestrator', str(LOGS_DIR))
+
+        # Stage transitions per trace id, for the end-to-end SLO report
+        self.traces = get_trace_log(str(LOGS_DIR))
+
+        # Write-ahead record of task moves and attempt counts, replayed on startup
+        self.journal = TaskJournal(str(TASK_JOURNAL_FILE))
+
         # Initialize Ralph Wiggum error recovery system
         self.ralph = RalphWiggumLoop()
         logger.info("Ralph Wiggum error recovery system initialized")
 
+        # Periodic memory reports for the structures that grow with uptime
+        self.memory = get_memory_monitor('orchestrator', str(LOGS_DIR))
+        self.memory.track('error_history', lambda: self.ralph.error_history)
+        self.memory.track('retry_attempts', lambda: self.ralph.retries.attempt_counts)
+        self.memory.track('active_tasks', lambda: self.active_tasks)
+        self.memory.track('pending_events', lambda: self.pending_events)
+        self.memory.track('journal_tasks', lambda: self.journal.tasks)
+        self.memory.on_soft_limit(self.ralph.compact_history)
+        self.memory.on_soft_limit(self.journal.compact)
+
         # Ensure directories exist
         for directory in [NEEDS_ACTION_DIR, IN_PROGRESS_DIR, DONE_DIR,
                          APPROVED_DIR, PLANS_DIR, LOGS_DIR]:
@@ -219,10 +358,11 @@ class Orchestrator:
         """Move task to In_Progress folder"""
         try:
             dest = IN_PROGRESS_DIR / task_file.name
-            # Remove existing file if it exists
-            if dest.exists():
-                dest.unlink()
-            task_file.rename(dest)
+            # Journal the claim first so a crash mid-move is resolved on restart
+            self.journal.claim(task_file.name)
+            os.replace(task_file, dest)
+            self.journal.started(task_file.name)
+            self.dashboard.move(task_file.name, 'Needs_Action', 'In_Progress')
             logger.info(f"Moved to In_Progress: {task_file.name}")
             return dest
         except Exception as e:
@@ -233,7 +373,10 @@ class Orchestrator:
         """Move task to Done folder"""
         try:
             dest = DONE_DIR / task_file.name
+            self.journal.finishing(task_file.name)
             task_file.rename(dest)
+            self.journal.done(task_file.name)
+            self.dashboard.move(task_file.name, task_file.parent.name, 'Done')
             logger.info(f"Moved to Done: {task_file.name}")
             return dest
         except Exception as e:
@@ -245,11 +388,18 @@ class Orchestrator:
         task_id = task_file.stem
         logger.info(f"Processing task: {task_id}")
 
+        if self.journal.exhausted(task_file.name):
+            self.quarantine_task(task_file, "attempt limit reached")
+            return False
+
+        timer = self.metrics.timer()
         try:
             # Move to In_Progress
             in_progress_file = self.move_to_in_progress(task_file)
             if not in_progress_file:
+                timer.finish(False)
                 return False
+            timer.lap('move_to_in_progress')
 
             # Read task content
             with open(in_progress_file, 'r', encoding='utf-8') as f:
@@ -258,16 +408,26 @@ class Orchestrator:
             # Parse frontmatter
             frontmatter, body = self.task_processor.parse_frontmatter(content)
             task_type = frontmatter.get('type', 'unknown')
+            timer.lap('read_parse')
+
+            # Items from older watchers have no trace id; start a trace here
+            trace_id = frontmatter.get('trace_id') or new_trace_id()
+            self.mark_ingested(trace_id, frontmatter)
+            self.traces.mark(trace_id, 'picked_up', task=task_id)
 
             logger.info(f"Task type: {task_type}")
 
             # Analyze content for intent
             analysis = self.analyze_content(content, task_type)
+            timer.lap('analyze_content')
             logger.info(f"Analysis: intent={analysis['intent']}, priority={analysis['priority']}")
             print(f"Analysis: intent={analysis['intent']}, priority={analysis['priority']}")  # For verification
 
             # Create plan file based on analysis
-            plan_file = self.create_plan_file(task_id, analysis, frontmatter, body)
+            timer.skip()
+            plan_file = self.create_plan_file(task_id, analysis, frontmatter, body, trace_id)
+            timer.lap('create_plan_file')
+            self.traces.mark(trace_id, 'planned', intent=analysis['intent'])
             logger.info(f"Created plan: {plan_file.name if plan_file else 'None'}")
 
             # Execute actions based on intent
@@ -276,6 +436,7 @@ class Orchestrator:
                 client_info = {'name': frontmatter.get('from', 'Unknown Client')}
                 amount = self.extract_amount_from_content(body)
                 invoice_file = self.generate_invoice(client_info, amount, body)
+                timer.lap('generate_invoice')
                 logger.info(f"Generated invoice: {invoice_file.name}")
 
                 # Create approval request
@@ -285,7 +446,8 @@ class Orchestrator:
                     'invoice_file': str(invoice_file),
                     'amount': f"${amount:.2f}"
                 }
-                approval_file = self.create_approval_request('send_email_with_invoice', approval_details, f"Invoice for ${amount:.2f}")
+                approval_file = self.create_approval_request('send_email_with_invoice', approval_details, f"Invoice for ${amount:.2f}", trace_id)
+                timer.lap('create_approval_request')
                 logger.info(f"Created approval request: {approval_file.name}")
 
             elif analysis['intent'] == 'reply_needed':
@@ -294,7 +456,9 @@ class Orchestrator:
                     'to': frontmatter.get('from', ''),
                     'subject': f"Re: {frontmatter.get('subject', 'Your message')}"
                 }
-                approval_file = self.create_approval_request('send_email', approval_details, "Draft reply")
+                timer.skip()
+                approval_file = self.create_approval_request('send_email', approval_details, "Draft reply", trace_id)
+                timer.lap('create_approval_request')
                 logger.info(f"Created approval request: {approval_file.name}")
 
             # Get appropriate skill
@@ -307,7 +471,9 @@ class Orchestrator:
                 # Only call Claude Code if NOT in DRY_RUN mode and not in a Claude Code session
                 if not self.dry_run and not os.getenv('CLAUDECODE'):
                     # Call Claude Code with skill
-                    success, message = self.task_processor.call_claude_code(skill_path, in_progress_file)
+                    timer.skip()
+                    success, message = self.task_processor.call_claude_code(skill_path, in_progress_file, plan_file)
+                    timer.lap('llm_call')
 
                     if success:
                         logger.info(f"Task processed successfully: {task_id}")
@@ -323,23 +489,30 @@ class Orchestrator:
                 logger.warning(f"No skill found for task type: {task_type}")
 
             # Move to Done
+            timer.skip()
             done_file = self.move_to_done(in_progress_file)
+            timer.lap('move_to_done')
 
             if done_file:
                 # Log action
                 self.log_action(task_id, task_type, frontmatter, success)
+                timer.lap('log_action')
 
                 # Update dashboard
                 self.update_dashboard(task_id, task_type, frontmatter)
+                timer.lap('update_dashboard')
+                self.traces.mark(trace_id, 'done')
 
                 logger.info(f"Task completed: {task_id}")
             else:
                 logger.error(f"Failed to move task to Done: {task_id}")
                 success = False
 
+            timer.finish(success)
             return success
 
         except Exception as e:
+            timer.finish(False)
             logger.error(f"Error processing task {task_id}: {e}")
 
             # Log error with Ralph Wiggum
@@ -353,47 +526,74 @@ class Orchestrator:
             # Attempt recovery
             recovery_success, message = self.ralph.attempt_recovery(e, context)
 
+            needs_action_path = NEEDS_ACTION_DIR / task_file.name
+            if recovery_success and not self.journal.exhausted(task_file.name):
+                # Hand the task to the retry timer and free this worker right away
+                recovery_success, message = self.schedule_retry(needs_action_path, self.process_task, e)
+            elif recovery_success:
+                recovery_success, message = False, "Attempt limit reached"
+
             if recovery_success:
                 logger.info(f"Recovery successful for task {task_id}: {message}")
-                # Retry the task
-                return self.process_task(task_file)
             else:
                 logger.error(f"Recovery failed for task {task_id}: {message}")
                 # Alert human
                 self.ralph.alert_human(e, context, message)
 
-            # Try to move back to Needs_Action
+            in_progress_path = IN_PROGRESS_DIR / task_file.name
+            if not recovery_success:
+                # Park it for a human instead of letting reconciliation pick it up again
+                self.quarantine_task(in_progress_path, message)
+                return False
+
+            # Move back to Needs_Action for the scheduled retry
             try:
-                in_progress_path = IN_PROGRESS_DIR / task_file.name
                 if in_progress_path.exists():
-                    in_progress_path.rename(NEEDS_ACTION_DIR / task_file.name)
-            except:
-                pass
+                    os.replace(in_progress_path, needs_action_path)
+                    self.dashboard.move(task_file.name, 'In_Progress', 'Needs_Action')
+                self.journal.returned(task_file.name, str(e))
+            except OSError as move_error:
+                logger.error(f"Error returning task {task_id} to Needs_Action: {move_error}")
             return False
 
+    def mark_ingested(self, trace_id: str, frontmatter: Dict):
+        """Record the watcher's ingest time (the report keeps the earliest one seen)"""
+        ingested = frontmatter.get('ingested_at')
+        try:
+            when = datetime.fromisoformat(ingested) if ingested else None
+        except ValueError:
+            when = None
+        if when:
+            self.traces.mark(trace_id, 'ingested', when=when)
+
+    def quarantine_task(self, task_file: Path, reason: str):
+        """Move a task that keeps failing to Quarantine for a human to look at"""
+        try:
+            if task_file.exists():
+                QUARANTINE_DIR.mkdir(parents=True, exist_ok=True)
+                os.replace(task_file, QUARANTINE_DIR / task_file.name)
+                self.dashboard.move(task_file.name, task_file.parent.name, None)
+            self.journal.quarantined(task_file.name, reason)
+            logger.warning(f"Quarantined task {task_file.name}: {reason}")
+        except OSError as e:
+            logger.error(f"Error quarantining task {task_file.name}: {e}")
+
+    def recover_in_flight(self):
+        """Resolve tasks a crash or restart left mid-transition, from the journal alone"""
+        outcome = recover_tasks(self.journal, NEEDS_ACTION_DIR, IN_PROGRESS_DIR, DONE_DIR, QUARANTINE_DIR)
+        self.journal.compact()
+        if any(outcome.values()):
+            self.dashboard.refresh_counts()
+        return outcome
+
     def process_tasks_concurrent(self, tasks: List[Path]):
-        """Process multiple tasks concurrently"""
+        """Schedule every task by priority and wait for the whole batch"""
         if not tasks:
             return
 
         logger.info(f"Processing {len(tasks)} tasks (max {MAX_CONCURRENT_TASKS} concurrent)")
 
-        futures = {}
-        for task in tasks[:MAX_CONCURRENT_TASKS]:  # Limit to max concurrent
-            future = self.executor.submit(self.process_task, task)
-            futures[future] = task
-
-        # Wait for completion
-        for future in as_completed(futures):
-            task = futures[future]
-            try:
-                success = future.result()
-                if success:
-                    logger.info(f"Task completed: {task.name}")
-                else:
-                    logger.error(f"Task failed: {task.name}")
-            except Exception as e:
-                logger.error(f"Task exception: {task.name} - {e}")
+        wait(self.submit_batch(tasks, self.process_task))
 
     def scan_approved(self) -> List[Path]:
         """Scan Approved folder for actions to execute"""
@@ -417,6 +617,8 @@ class Orchestrator:
 
             frontmatter, body = self.task_processor.parse_frontmatter(content)
             action_type = frontmatter.get('action_type', 'unknown')
+            trace_id = frontmatter.get('trace_id')
+            self.traces.mark(trace_id, 'approved', when=approved_at(action_file))
 
             if self.dry_run:
                 logger.info(f"DRY RUN: Would execute {action_type}")
@@ -434,6 +636,7 @@ class Orchestrator:
 
             # Log execution
             self.log_execution(action_file.stem, action_type, frontmatter)
+            self.traces.mark(trace_id, 'executed', action_type=action_type, dry_run=self.dry_run)
 
             # Move to Done
             self.move_to_done(action_file)
@@ -454,10 +657,12 @@ class Orchestrator:
             # Attempt recovery
             success, message = self.ralph.attempt_recovery(e, context)
 
+            if success:
+                # Hand the action to the retry timer and free this worker right away
+                success, message = self.schedule_retry(action_file, self.execute_approved_action, e)
+
             if success:
                 logger.info(f"Recovery successful for action {action_file.name}: {message}")
-                # Retry the action
-                return self.execute_approved_action(action_file)
             else:
                 logger.error(f"Recovery failed for action {action_file.name}: {message}")
                 # Alert human
@@ -520,10 +725,8 @@ class Orchestrator:
 
     def analyze_content(self, content: str, task_type: str) -> Dict:
         """Analyze content to determine intent and required actions"""
-        content_lower = content.lower()
-
         # Debug output
-        logger.debug(f"Analyzing content (first 200 chars): {content_lower[:200]}")
+        logger.debug(f"Analyzing content (first 200 chars): {content[:200].lower()}")
 
         analysis = {
             'intent': 'unknown',
@@ -532,31 +735,31 @@ class Orchestrator:
             'suggested_action': None
         }
 
-        # Detect invoice requests
-        invoice_keywords = ['invoice', 'bill', 'payment', 'charge']
-        has_invoice_keyword = any(keyword in content_lower for keyword in invoice_keywords)
-        logger.debug(f"Invoice keywords check: {has_invoice_keyword}")
+        # One pass over the content finds every keyword category
+        hits = self.keywords.scan(content)
+        logger.debug(f"Keyword hits: {hits}")
 
-        if has_invoice_keyword:
+        # Detect invoice requests
+        if 'invoice' in hits:
             analysis['intent'] = 'invoice_request'
             analysis['requires_approval'] = True
             analysis['suggested_action'] = 'generate_invoice'
             logger.debug("Detected invoice_request intent")
 
         # Detect reply requests
-        elif any(keyword in content_lower for keyword in ['reply', 'respond', 'answer', 'question']):
+        elif 'reply' in hits:
             analysis['intent'] = 'reply_needed'
             analysis['requires_approval'] = True
             analysis['suggested_action'] = 'draft_reply'
 
         # Detect social media posts
-        elif any(keyword in content_lower for keyword in ['post', 'share', 'linkedin', 'twitter', 'facebook']):
+        elif 'social' in hits:
             analysis['intent'] = 'social_post'
             analysis['requires_approval'] = True
             analysis['suggested_action'] = 'create_social_post'
 
         # Detect urgent items
-        if any(keyword in content_lower for keyword in ['urgent', 'asap', 'immediately', 'critical']):
+        if 'urgent' in hits:
             analysis['priority'] = 'high'
 
         return analysis
@@ -619,7 +822,8 @@ Payment due within 30 days.
                 return 100.0  # Default
         return 100.0  # Default amount
 
-    def create_plan_file(self, task_id: str, analysis: Dict, frontmatter: Dict, body: str) -> Path:
+    def create_plan_file(self, task_id: str, analysis: Dict, frontmatter: Dict, body: str,
+                         trace_id: Optional[str] = None) -> Path:
         """Create a plan file for the task"""
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         plan_id = f"PLAN_{task_id}_{timestamp}"
@@ -635,6 +839,7 @@ Payment due within 30 days.
         plan_content = f"""---
 plan_id: {plan_id}
 task_id: {task_id}
+trace_id: {trace_id or ''}
 intent: {analysis['intent']}
 action_type: {action_type}
 priority: {analysis['priority']}
@@ -695,7 +900,8 @@ Subject: {frontmatter.get('subject', 'N/A')}
         logger.info(f"Created plan file: {plan_id}")
         return plan_file
 
-    def create_approval_request(self, action_type: str, details: Dict, body: str = "") -> Path:
+    def create_approval_request(self, action_type: str, details: Dict, body: str = "",
+                                trace_id: Optional[str] = None) -> Path:
         """Create an approval request for human review"""
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         # Extract client email for filename if present
@@ -707,6 +913,7 @@ Subject: {frontmatter.get('subject', 'N/A')}
 type: approval_request
 action_type: {action_type}
 created: {datetime.now().isoformat()}
+trace_id: {trace_id or ''}
 status: pending
 ---
 
@@ -735,190 +942,236 @@ Execute: **{action_type}**
 
         with open(approval_file, 'w', encoding='utf-8') as f:
             f.write(approval_content)
+        self.dashboard.move(approval_file.name, None, 'Pending_Approval')
+        self.traces.mark(trace_id, 'approval_requested', action_type=action_type)
 
         logger.info(f"Created approval request: {request_id}")
         return approval_file
 
     def log_action(self, task_id: str, task_type: str, frontmatter: Dict, success: bool):
-        """Log action to daily JSON log"""
+        """Log action to the append-only daily activity log"""
         try:
-            log_file = LOGS_DIR / f"{datetime.now().strftime('%Y-%m-%d')}.json"
-
-            # Load existing log
-            if log_file.exists():
-                with open(log_file, 'r') as f:
-                    log_data = json.load(f)
-            else:
-                log_data = {'date': datetime.now().strftime('%Y-%m-%d'), 'actions': []}
-
-            # Add entry
-            log_entry = {
+            self.activity_log.log_action({
                 'timestamp': datetime.now().isoformat(),
                 'task_id': task_id,
                 'type': task_type,
                 'success': success,
                 'frontmatter': frontmatter
-            }
-
-            log_data['actions'].append(log_entry)
-
-            # Save log
-            with open(log_file, 'w') as f:
-                json.dump(log_data, f, indent=2)
+            })
 
         except Exception as e:
             logger.error(f"Error logging action: {e}")
 
     def log_execution(self, action_id: str, action_type: str, frontmatter: Dict):
-        """Log execution to daily JSON log"""
+        """Log execution to the append-only daily activity log"""
         try:
-            log_file = LOGS_DIR / f"{datetime.now().strftime('%Y-%m-%d')}.json"
-
-            # Load existing log
-            if log_file.exists():
-                with open(log_file, 'r') as f:
-                    log_data = json.load(f)
-            else:
-                log_data = {'date': datetime.now().strftime('%Y-%m-%d'), 'executions': []}
-
-            # Add entry
-            if 'executions' not in log_data:
-                log_data['executions'] = []
-
-            log_entry = {
+            self.activity_log.log_execution({
                 'timestamp': datetime.now().isoformat(),
                 'action_id': action_id,
                 'type': action_type,
                 'details': frontmatter
-            }
-
-            log_data['executions'].append(log_entry)
-
-            # Save log
-            with open(log_file, 'w') as f:
-                json.dump(log_data, f, indent=2)
+            })
 
         except Exception as e:
             logger.error(f"Error logging execution: {e}")
 
     def update_dashboard(self, task_id: str, task_type: str, frontmatter: Dict):
-        """Update Dashboard.md with recent activity"""
-        try:
-            # Read existing dashboard
-            if DASHBOARD_FILE.exists():
-                with open(DASHBOARD_FILE, 'r', encoding='utf-8') as f:
-                    content = f.read()
-            else:
-                content = self.create_dashboard_template()
-
-            # Find Recent Activity section
-            if '## Recent Activity' in content:
-                # Extract table
-                lines = content.split('\n')
-                activity_idx = next(i for i, line in enumerate(lines) if '## Recent Activity' in line)
-
-                # Find table start (skip header and separator)
-                table_start = activity_idx + 3
-
-                # Create new row
-                timestamp = datetime.now().strftime('%Y-%m-%d %H:%M')
-                subject = frontmatter.get('subject', frontmatter.get('original_name', 'N/A'))
-                new_row = f"| {timestamp} | {task_type} | {subject[:50]} | ✅ Done |"
-
-                # Insert new row at top of table
-                lines.insert(table_start, new_row)
-
-                # Keep only last 10 rows
-                table_rows = [l for l in lines[table_start:] if l.startswith('|')]
-                if len(table_rows) > 10:
-                    # Remove oldest rows
-                    for _ in range(len(table_rows) - 10):
-                        lines.pop(table_start + 10)
-
-                content = '\n'.join(lines)
-
-            # Update counts
-            pending = len(list(NEEDS_ACTION_DIR.glob('*.md')))
-            in_progress = len(list(IN_PROGRESS_DIR.glob('*.md')))
-            done = len(list(DONE_DIR.glob('*.md')))
-
-            # Replace count placeholders
-            content = self.update_counts_in_dashboard(content, pending, in_progress, done)
+        """Record recent activity; the dashboard writer coalesces the actual rewrite"""
+        subject = frontmatter.get('subject', frontmatter.get('original_name', 'N/A'))
+        self.dashboard.record_activity(task_type, subject)
+        self.dashboard.request_render()
+
+    def notify_file(self, file_path: Path):
+        """Schedule a vault file for dispatch once it stops changing"""
+        if file_path.suffix != '.md' or file_path.name.startswith('.'):
+            return
 
-            # Write dashboard
-            with open(DASHBOARD_FILE, 'w', encoding='utf-8') as f:
-                f.write(content)
+        key = str(file_path.resolve())
+        with self.lock:
+            timer = self.pending_events.pop(key, None)
+            if timer:
+                timer.cancel()
+            timer = threading.Timer(EVENT_SETTLE_SECONDS, self.dispatch_file, args=(file_path,))
+            timer.daemon = True
+            self.pending_events[key] = timer
+            timer.start()
+
+    def dispatch_file(self, file_path: Path):
+        """Route a settled file to task processing or approved-action execution"""
+        with self.lock:
+            self.pending_events.pop(str(file_path.resolve()), None)
+
+        if not file_path.exists():
+            return
 
-            logger.info("Dashboard updated")
+        folder = file_path.parent.resolve()
+        if folder == NEEDS_ACTION_DIR.resolve():
+            # Settled events include retries moved back from In_Progress; take the file from where it really was
+            self.dashboard.arrived(file_path.name, 'Needs_Action')
+            self.submit(file_path, self.process_task)
+        elif folder == APPROVED_DIR.resolve():
+            self.dashboard.arrived(file_path.name, None)
+            self.submit(file_path, self.execute_approved_action)
+        self.dashboard.request_render()
+
+    def estimate_priority(self, file_path: Path) -> str:
+        """Cheap pre-read so urgent work can be scheduled ahead of the backlog"""
+        record = load_record(file_path)
+        if record is None:
+            return 'normal'
+
+        content = f"{record.body}\n{' '.join(record.frontmatter.values())}"
+        analysis = self.analyze_content(content, record.type)
+        if analysis['priority'] == 'high':
+            return 'high'
+        return record.frontmatter.get('priority', 'normal')
+
+    def submit(self, file_path: Path, handler, priority: Optional[str] = None) -> Optional[Future]:
+        """Queue a file for the worker pool unless it is already in flight"""
+        key = str(file_path.resolve())
+        with self.lock:
+            # Files waiting out a retry backoff are re-queued by the retry timer only
+            if key in self.active_tasks or key in self.retry_pending:
+                return None
+            # Reserve the key before the pre-read so a racing event cannot double-queue
+            self.active_tasks[key] = None
+
+        if priority is None:
+            priority = self.estimate_priority(file_path)
+        future = self.scheduler.push(file_path, functools.partial(self.run_handler, handler), priority)
+        with self.lock:
+            self.active_tasks[key] = future
+
+        future.add_done_callback(lambda f: self.task_finished(key, file_path, f))
+        return future
+
+    def run_handler(self, handler, file_path: Path):
+        """Run one task handler as a profiled cycle"""
+        with self.profiler.cycle(f"{handler.__name__}_{file_path.stem}"):
+            return handler(file_path)
+
+    def submit_batch(self, files: List[Path], handler) -> List[Future]:
+        """Rank a whole batch up front so urgent files are queued before the rest"""
+        ranked = sorted(
+            ((self.estimate_priority(f), f) for f in files),
+            key=lambda item: PRIORITY_RANKS.get(str(item[0]).strip().lower(), PRIORITY_RANKS['normal'])
+        )
+        futures = [self.submit(f, handler, priority) for priority, f in ranked]
+        return [future for future in futures if future]
+
+    def task_finished(self, key: str, file_path: Path, future):
+        """Release an in-flight file and report its outcome"""
+        with self.lock:
+            self.active_tasks.pop(key, None)
 
+        try:
+            if future.result():
+                self.ralph.retry_succeeded(key)
+                logger.info(f"Task completed: {file_path.name}")
+            else:
+                logger.error(f"Task failed: {file_path.name}")
         except Exception as e:
-            logger.error(f"Error updating dashboard: {e}")
-
-    def create_dashboard_template(self) -> str:
-        """Create initial dashboard template"""
-        return """# AI Employee Dashboard
-
-## Status Overview
-
-- **Pending**: 0
-- **In Progress**: 0
-- **Completed**: 0
-
-## Recent Activity
-
-| Time | Type | Description | Status |
-|------|------|-------------|--------|
-
----
-*Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*
-"""
-
-    def update_counts_in_dashboard(self, content: str, pending: int, in_progress: int, done: int) -> str:
-        """Update counts in dashboard content"""
-        import re
-
-        content = re.sub(r'\*\*Pending\*\*: \d+', f'**Pending**: {pending}', content)
-        content = re.sub(r'\*\*In Progress\*\*: \d+', f'**In Progress**: {in_progress}', content)
-        content = re.sub(r'\*\*Completed\*\*: \d+', f'**Completed**: {done}', content)
-
-        return content
+            logger.error(f"Task exception: {file_path.name} - {e}")
+
+    def schedule_retry(self, file_path: Path, handler, error: Exception) -> Tuple[bool, str]:
+        """Park a failed file until Ralph's retry timer re-queues it"""
+        key = str(file_path.resolve())
+        with self.lock:
+            self.retry_pending.add(key)
+
+        scheduled, message = self.ralph.schedule_retry(key, error, lambda: self.retry_file(file_path, handler))
+        if not scheduled:
+            with self.lock:
+                self.retry_pending.discard(key)
+        return scheduled, message
+
+    def retry_file(self, file_path: Path, handler):
+        """Re-queue a file once its retry backoff has elapsed"""
+        with self.lock:
+            self.retry_pending.discard(str(file_path.resolve()))
+
+        if file_path.exists():
+            self.submit(file_path, handler)
+        else:
+            logger.warning(f"Retry skipped, file no longer exists: {file_path.name}")
+
+    def reconcile(self):
+        """Safety-net scan for files whose events were missed"""
+        with self.profiler.cycle('reconcile'):
+            submitted = len(self.submit_batch(self.scan_needs_action(), self.process_task))
+            submitted += len(self.submit_batch(self.scan_approved(), self.execute_approved_action))
+
+            if submitted:
+                logger.info(f"Reconciliation picked up {submitted} file(s)")
+
+            # Tasks finished since the previous reconciliation
+            self.metrics.cycle_report("reconcile interval")
+
+            # Correct any drift from files moved by hand or by other processes
+            if self.dashboard.refresh_counts():
+                self.dashboard.request_render()
+
+            # Drop finished tasks from the journal so startup replay stays short
+            self.journal.compact()
+
+    def shutdown(self, observer: Observer):
+        """Stop taking events, let running tasks finish and flush every log"""
+        observer.stop()
+        with self.lock:
+            for timer in self.pending_events.values():
+                timer.cancel()
+            self.pending_events.clear()
+        self.executor.shutdown(wait=True)
+        self.journal.close()
+        self.metrics.close()
+        self.memory.close()
+        self.activity_log.compact()
+        self.dashboard.flush()
 
     def run(self):
-        """Main orchestrator loop"""
+        """Main orchestrator loop: dispatch on file events, reconcile periodically"""
         logger.info("="*60)
         logger.info("AI EMPLOYEE ORCHESTRATOR STARTED")
         logger.info("="*60)
-        logger.info(f"Check interval: {CHECK_INTERVAL} seconds ({CHECK_INTERVAL//60} minutes)")
+        logger.info(f"Watching: {NEEDS_ACTION_DIR}, {APPROVED_DIR}")
+        logger.info(f"Reconciliation interval: {CHECK_INTERVAL} seconds ({CHECK_INTERVAL//60} minutes)")
         logger.info(f"Max concurrent tasks: {MAX_CONCURRENT_TASKS}")
         logger.info(f"DRY RUN mode: {self.dry_run}")
         logger.info("="*60)
 
-        try:
-            while True:
-                logger.info(f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Starting check cycle...")
+        observer = Observer()
+        handler = VaultEventHandler(self)
+        observer.schedule(handler, str(NEEDS_ACTION_DIR.resolve()), recursive=False)
+        observer.schedule(handler, str(APPROVED_DIR.resolve()), recursive=False)
+        observer.start()
 
-                # Process tasks from Needs_Action
-                tasks = self.scan_needs_action()
-                if tasks:
-                    self.process_tasks_concurrent(tasks)
+        try:
+            # Settle tasks interrupted by the last shutdown, then pick up anything that arrived
+            self.recover_in_flight()
+            self.reconcile()
 
-                # Execute approved actions
-                approved = self.scan_approved()
-                for action in approved:
-                    self.execute_approved_action(action)
+            # The memory monitor sets restart_requested when compaction could not get under the soft limit
+            while not self.memory.restart_requested.wait(CHECK_INTERVAL):
+                logger.info(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Running reconciliation scan...")
+                self.reconcile()
 
-                logger.info(f"Check cycle complete. Sleeping for {CHECK_INTERVAL} seconds...")
-                time.sleep(CHECK_INTERVAL)
+            logger.warning("Memory soft limit exceeded, shutting down for restart")
+            self.shutdown(observer)
+            observer.join()
+            sys.exit(RESTART_EXIT_CODE)
 
         except KeyboardInterrupt:
             logger.info("\nOrchestrator stopped by user")
-            self.executor.shutdown(wait=True)
+            self.shutdown(observer)
         except Exception as e:
             logger.error(f"Fatal error in orchestrator: {e}")
             import traceback
             logger.error(traceback.format_exc())
+            observer.stop()
             self.executor.shutdown(wait=False)
 
+        observer.join()
+
 
 def main():
     """Entry point"""
@@ -931,8 +1184,10 @@ def main():
                        help='Disable dry-run mode (execute actions)')
     parser.add_argument('--once', '--process-once', action='store_true',
                        help='Process once and exit')
+    add_profile_arguments(parser)
 
     args = parser.parse_args()
+    apply_profile_arguments(args)
 
     # Determine dry-run mode
     dry_run = args.dry_run and not args.no_dry_run
@@ -941,12 +1196,17 @@ def main():
 
     if args.once:
         logger.info("Running once and exiting...")
+        orchestrator.recover_in_flight()
         tasks = orchestrator.scan_needs_action()
         if tasks:
             orchestrator.process_tasks_concurrent(tasks)
         approved = orchestrator.scan_approved()
         for action in approved:
-            orchestrator.execute_approved_action(action)
+            orchestrator.run_handler(orchestrator.execute_approved_action, action)
+        orchestrator.metrics.cycle_report("single run")
+        orchestrator.metrics.close()
+        orchestrator.activity_log.compact()
+        orchestrator.dashboard.flush()
         logger.info("Single run complete")
     else:
         orchestrator.run()
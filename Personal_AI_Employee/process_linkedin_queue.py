@@ -9,6 +9,9 @@ import json
 from pathlib import Path
 from datetime import datetime
 
+from utils.vault_records import load_record
+from utils.slo_tracker import mark_stage, new_trace_id
+
 VAULT_PATH = Path('AI_Employee_Vault')
 NEEDS_ACTION = VAULT_PATH / 'Needs_Action'
 PENDING_APPROVAL = VAULT_PATH / 'Pending_Approval'
@@ -32,25 +35,10 @@ def process_linkedin_posts():
     for file_path in linkedin_files:
         print(f"\nProcessing: {file_path.name}")
         
-        # Read the post
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Extract post content
-        lines = content.split('\n')
-        post_content = []
-        in_content = False
-        
-        for line in lines:
-            if line.strip() == '## Post Content':
-                in_content = True
-                continue
-            elif line.strip().startswith('##') and in_content:
-                break
-            elif in_content and line.strip():
-                post_content.append(line.strip())
-        
-        post_text = '\n'.join(post_content)
+        # Read the post and extract its content
+        record = load_record(file_path)
+        section = record.section('Post Content') if record else ''
+        post_text = '\n'.join(line.strip() for line in section.split('\n') if line.strip())
         
         if not post_text or post_text == 'hello':
             print(f"  [SKIP] Test post: {file_path.name}")
@@ -59,6 +47,9 @@ def process_linkedin_posts():
             file_path.rename(done_path)
             continue
         
+        # Carry the dashboard item's trace id into the approval request
+        trace_id = (record.get('trace_id') if record else None) or new_trace_id()
+
         # Create approval file
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         approval_file = PENDING_APPROVAL / f'LINKEDIN_APPROVAL_{timestamp}.md'
@@ -69,6 +60,7 @@ source: dashboard
 status: pending_approval
 created: {datetime.now().isoformat()}
 original_file: {file_path.name}
+trace_id: {trace_id}
 ---
 
 # LinkedIn Post - Pending Approval
@@ -95,6 +87,7 @@ original_file: {file_path.name}
         
         with open(approval_file, 'w', encoding='utf-8') as f:
             f.write(approval_content)
+        mark_stage(trace_id, 'approval_requested', platform='linkedin')
         
         # Move original to done
         done_path = DONE / file_path.name
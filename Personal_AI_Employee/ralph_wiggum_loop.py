@@ -13,15 +13,23 @@ import os
 import sys
 import json
 import time
+import heapq
+import random
+import itertools
+import threading
 import logging
 import traceback
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
+# In-memory error history kept by compact_history(); the full record stays in errors.json
+ERROR_HISTORY_HOURS = 24
+ERROR_HISTORY_KEEP = 1000
+
 class ErrorClassifier:
     """Classify errors into categories for appropriate recovery strategies"""
 
@@ -51,6 +59,12 @@ class ErrorClassifier:
 class RecoveryStrategy:
     """Define recovery strategies for different error types"""
 
+    # Base backoff per error category; rate limits need a much longer cool-down
+    RETRY_BASE_DELAYS = {
+        'api': 60,
+        'resource': 5
+    }
+
     def __init__(self, logger):
         self.logger = logger
         self.max_retries = 3
@@ -60,21 +74,9 @@ class RecoveryStrategy:
         """Recover from network-related errors"""
         self.logger.info("[RECOVERY] Network error detected, attempting recovery...")
 
-        # Strategy: Exponential backoff retry
-        for attempt in range(self.max_retries):
-            delay = self.base_delay * (2 ** attempt)
-            self.logger.info(f"[RECOVERY] Retry attempt {attempt + 1}/{self.max_retries} after {delay}s")
-            time.sleep(delay)
-
-            try:
-                # Attempt to reconnect or retry the operation
-                self.logger.info("[RECOVERY] Network connection restored")
-                return True, "Network error recovered via retry"
-            except Exception as e:
-                self.logger.warning(f"[RECOVERY] Retry {attempt + 1} failed: {e}")
-                continue
-
-        return False, "Network error: Max retries exceeded"
+        # Strategy: Exponential backoff retry (the delay is scheduled by RetryScheduler)
+        self.logger.info("[RECOVERY] Network error is transient, retry will be scheduled with backoff")
+        return True, "Network error: retry with exponential backoff"
 
     def recover_file_system_error(self, error: Exception, context: Dict) -> Tuple[bool, str]:
         """Recover from file system errors"""
@@ -112,12 +114,10 @@ class RecoveryStrategy:
 
         error_str = str(error)
 
-        # Strategy 1: Rate limit - wait and retry
+        # Strategy 1: Rate limit - retry after a cool-down (see RETRY_BASE_DELAYS)
         if 'rate limit' in error_str.lower() or 'quota' in error_str.lower():
-            wait_time = 60  # Wait 1 minute
-            self.logger.info(f"[RECOVERY] Rate limit hit, waiting {wait_time}s...")
-            time.sleep(wait_time)
-            return True, "Rate limit recovered via wait"
+            self.logger.info(f"[RECOVERY] Rate limit hit, retry in ~{self.RETRY_BASE_DELAYS['api']}s")
+            return True, "Rate limit: retry after cool-down"
 
         # Strategy 2: Authentication - refresh token
         if 'auth' in error_str.lower() or 'token' in error_str.lower():
@@ -149,6 +149,74 @@ class RecoveryStrategy:
         return True, "Resource error: Garbage collection performed"
 
 
+class RetryScheduler:
+    """Delay queue of pending retries, drained by a single timer thread"""
+
+    def __init__(self, logger, max_attempts: int = 3, max_delay: float = 300):
+        self.logger = logger
+        self.max_attempts = max_attempts
+        self.max_delay = max_delay
+        self.attempt_counts = {}
+        self.queue = []
+        self.counter = itertools.count()
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self.run, name='ralph-retry-timer', daemon=True)
+        self.thread.start()
+
+    def __len__(self) -> int:
+        with self.condition:
+            return len(self.queue)
+
+    def backoff_delay(self, attempt: int, base_delay: float) -> float:
+        """Exponential backoff with jitter so failed tasks do not retry in lockstep"""
+        ceiling = min(self.max_delay, base_delay * (2 ** attempt))
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+    def attempts(self, key: str) -> int:
+        """Number of retries already scheduled for a task"""
+        with self.condition:
+            return self.attempt_counts.get(key, 0)
+
+    def reset(self, key: str):
+        """Forget a task's attempts once it succeeds or is given up on"""
+        with self.condition:
+            self.attempt_counts.pop(key, None)
+
+    def schedule(self, key: str, callback: Callable[[], None], base_delay: float) -> Optional[float]:
+        """Queue a retry and return its delay, or None once the task is out of attempts"""
+        with self.condition:
+            attempt = self.attempt_counts.get(key, 0)
+            if attempt >= self.max_attempts:
+                return None
+
+            self.attempt_counts[key] = attempt + 1
+            delay = self.backoff_delay(attempt, base_delay)
+            heapq.heappush(self.queue, (time.monotonic() + delay, next(self.counter), key, callback))
+            self.condition.notify()
+            return delay
+
+    def run(self):
+        """Timer thread: sleep until the earliest retry is due, then fire it"""
+        while True:
+            with self.condition:
+                while not self.queue:
+                    self.condition.wait()
+
+                due, _, key, callback = self.queue[0]
+                remaining = due - time.monotonic()
+                if remaining > 0:
+                    # Woken early if a sooner retry is pushed in the meantime
+                    self.condition.wait(remaining)
+                    continue
+
+                heapq.heappop(self.queue)
+
+            try:
+                callback()
+            except Exception as e:
+                self.logger.error(f"[RALPH] Scheduled retry for {key} failed to start: {e}")
+
+
 class RalphWiggumLoop:
     """Main error recovery loop"""
 
@@ -157,7 +225,9 @@ class RalphWiggumLoop:
         self.setup_logging()
         self.classifier = ErrorClassifier()
         self.recovery = RecoveryStrategy(self.logger)
+        self.retries = RetryScheduler(self.logger, max_attempts=self.recovery.max_retries)
         self.error_history = []
+        self.history_lock = threading.Lock()  # worker threads append, the memory monitor compacts
         self.recovery_stats = {
             'total_errors': 0,
             'recovered': 0,
@@ -196,7 +266,8 @@ class RalphWiggumLoop:
             'traceback': traceback.format_exc()
         }
 
-        self.error_history.append(error_entry)
+        with self.history_lock:
+            self.error_history.append(error_entry)
 
         # Save to file
         error_log_file = Path('AI_Employee_Vault/Logs/errors.json')
@@ -257,6 +328,34 @@ class RalphWiggumLoop:
 
         return success, message
 
+    def schedule_retry(self, key: str, error: Exception, retry: Callable[[], None]) -> Tuple[bool, str]:
+        """Queue a retry on the timer thread instead of sleeping in the caller"""
+        category = self.classifier.classify(error)
+        base_delay = self.recovery.RETRY_BASE_DELAYS.get(category, self.recovery.base_delay)
+
+        delay = self.retries.schedule(key, retry, base_delay)
+        if delay is None:
+            self.retries.reset(key)
+            return False, f"Max retries ({self.retries.max_attempts}) exceeded"
+
+        attempt = self.retries.attempts(key)
+        self.logger.info(f"[RALPH] Retry {attempt}/{self.retries.max_attempts} for {key} in {delay:.1f}s")
+        return True, f"Retry {attempt}/{self.retries.max_attempts} scheduled in {delay:.1f}s"
+
+    def retry_succeeded(self, key: str):
+        """Clear a task's attempt counter after it completes"""
+        self.retries.reset(key)
+
+    def compact_history(self, max_age_hours: float = ERROR_HISTORY_HOURS, keep: int = ERROR_HISTORY_KEEP):
+        """Drop in-memory errors older than the health/stats windows look at"""
+        cutoff = (datetime.now() - timedelta(hours=max_age_hours)).isoformat()
+        with self.history_lock:
+            recent = [e for e in self.error_history if e['timestamp'] > cutoff][-keep:]
+            dropped = len(self.error_history) - len(recent)
+            self.error_history = recent
+        if dropped:
+            self.logger.info(f"[RALPH] Dropped {dropped} old entries from error history")
+
     def check_system_health(self) -> Dict:
         """Check overall system health"""
         health = {
@@ -286,7 +385,9 @@ class RalphWiggumLoop:
                 health['issues'].append(f"Low recovery rate: {recovery_rate:.1f}%")
 
         # Check recent errors
-        recent_errors = [e for e in self.error_history if
+        with self.history_lock:
+            history = list(self.error_history)
+        recent_errors = [e for e in history if
                         datetime.fromisoformat(e['timestamp']) > datetime.now() - timedelta(hours=1)]
 
         if len(recent_errors) > 10:
@@ -297,10 +398,12 @@ class RalphWiggumLoop:
 
     def get_recovery_stats(self) -> Dict:
         """Get recovery statistics"""
+        with self.history_lock:
+            history = list(self.error_history)
         return {
             'timestamp': datetime.now().isoformat(),
             'stats': self.recovery_stats,
-            'recent_errors': len([e for e in self.error_history if
+            'recent_errors': len([e for e in history if
                                  datetime.fromisoformat(e['timestamp']) > datetime.now() - timedelta(hours=24)])
         }
 
@@ -365,7 +468,8 @@ def with_recovery(ralph_loop: RalphWiggumLoop):
                 success, message = ralph_loop.attempt_recovery(e, context)
 
                 if success:
-                    # Retry the function
+                    # Synchronous callers wait out one backoff step before retrying
+                    time.sleep(ralph_loop.retries.backoff_delay(0, ralph_loop.recovery.base_delay))
                     try:
                         return func(*args, **kwargs)
                     except Exception as retry_error:
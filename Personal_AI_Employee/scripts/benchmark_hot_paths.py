@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Hot-Path Micro-Benchmarks
+
+Times the functions that run once per message - frontmatter parsing, content
+analysis, amount and job-detail extraction, Gmail body decoding, audit log
+search and the dashboard update - against seeded fixture corpora at several
+sizes (up to 1 MB HTML emails and 100k-line audit logs), and compares the
+results with a stored baseline.
+
+Timings are normalised by a fixed calibration workload so a baseline stays
+meaningful across runs on the same machine under different load. A case that
+is more than --tolerance slower than its baseline fails the run (exit code 1).
+
+Usage:
+    python scripts/benchmark_hot_paths.py --save-baseline     # record a baseline
+    python scripts/benchmark_hot_paths.py                     # compare against it
+    python scripts/benchmark_hot_paths.py --sizes small,medium --filter audit
+
+Baseline: benchmarks/hot_paths_baseline.json
+Results:  benchmarks/hot_paths_<commit>_<timestamp>.json
+"""
+
+import os
+import re
+import sys
+import json
+import base64
+import random
+import shutil
+import timeit
+import logging
+import argparse
+import platform
+import tempfile
+import statistics
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Callable, Tuple
+
+# Project paths
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmark_orchestrator import git_commit
+
+RESULTS_DIR = PROJECT_ROOT / "benchmarks"
+BASELINE_FILE = RESULTS_DIR / "hot_paths_baseline.json"
+
+SEED = 1234
+DEFAULT_TOLERANCE = 0.25  # fail when more than 25% slower than baseline
+FIXTURE_DAY = datetime(2025, 1, 15)  # audit fixtures are dated so runs are reproducible
+
+# Fixture sizes per corpus
+SIZES = {
+    'small': {'note_bytes': 1000, 'email_bytes': 4000, 'job_bytes': 1000, 'audit_lines': 1000,
+              'dashboard_lines': 20},
+    'medium': {'note_bytes': 16000, 'email_bytes': 64000, 'job_bytes': 16000, 'audit_lines': 10000,
+               'dashboard_lines': 200},
+    'large': {'note_bytes': 256000, 'email_bytes': 1000000, 'job_bytes': 64000, 'audit_lines': 100000,
+              'dashboard_lines': 2000},
+}
+
+WORDS = ("the team reviewed project timeline budget client meeting notes report quarterly "
+         "delivery scope update schedule resources review attached documents thanks regards").split()
+
+INTENT_SENTENCES = [
+    "Could you send the invoice for last month? The total should be ${amount}.",
+    "Please reply with an update on the deliverables when you can.",
+    "Let's post the launch announcement on LinkedIn this week.",
+    "URGENT: the payment for invoice #{number} is overdue, please advise.",
+    "Thanks for the meeting notes, everything looks good on our side.",
+]
+
+JOB_SENTENCES = [
+    "We are hiring a Senior Backend Developer at Globex Corp for a Full-time role.",
+    "Salary: $120,000 - $150,000 depending on experience.",
+    "Location: Berlin, Germany with hybrid options.",
+    "Please reach out to Jane Doe before the deadline: 2025-02-01.",
+    "Requirements: 5+ years of Python, experience with distributed systems.",
+]
+
+AUDIT_ACTORS = ['orchestrator', 'gmail_watcher', 'file_watcher', 'whatsapp_watcher', 'approval_executor']
+AUDIT_EVENTS = ['task_created', 'task_completed', 'email_processed', 'file_accessed', 'skill_executed',
+                'approval_requested', 'approval_granted']
+
+
+def prose(rng: random.Random, size: int, sentences: List[str]) -> str:
+    """Filler text of about size bytes with a realistic sentence every few lines"""
+    parts, length = [], 0
+    while length < size:
+        if rng.random() < 0.2:
+            line = rng.choice(sentences).replace('{amount}', f"{rng.randint(50, 9999):,}.00").replace(
+                '{number}', str(rng.randint(1000, 9999)))
+        else:
+            line = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 16))).capitalize() + "."
+        parts.append(line)
+        length += len(line) + 1
+    return " ".join(parts)[:size]
+
+
+def make_task_note(rng: random.Random, size: int) -> str:
+    """Markdown task with watcher-style frontmatter"""
+    frontmatter = "\n".join([
+        "type: email", "from: client@example.com", "subject: Project update and invoice",
+        f"received: {FIXTURE_DAY.isoformat()}", "priority: high", "status: pending",
+        "trace_id: 0123456789abcdef", f"ingested_at: {FIXTURE_DAY.isoformat()}"
+    ])
+    return f"---\n{frontmatter}\n---\n\n# Email\n\n{prose(rng, size, INTENT_SENTENCES)}\n"
+
+
+def make_html_email(rng: random.Random, size: int) -> str:
+    """HTML newsletter-style body of about size bytes"""
+    blocks, length = [], 0
+    while length < size:
+        text = prose(rng, rng.randint(80, 400), INTENT_SENTENCES)
+        block = (f'<tr><td class="content" style="padding:8px;font-family:Arial">'
+                 f'<p><span style="color:#333">{text}</span> <a href="https://example.com/{rng.randint(1, 10**6)}">'
+                 f'more</a></p></td></tr>\n')
+        blocks.append(block)
+        length += len(block)
+    return f'<html><head><style>td {{margin:0}}</style></head><body><table>\n{"".join(blocks)}</table></body></html>'
+
+
+def gmail_message(body: str, mime_type: str) -> Dict[str, Any]:
+    """Gmail API message resource with a single body part"""
+    data = base64.urlsafe_b64encode(body.encode('utf-8')).decode('ascii')
+    return {
+        'id': 'bench', 'snippet': body[:100],
+        'payload': {'mimeType': 'multipart/alternative',
+                    'parts': [{'mimeType': mime_type, 'body': {'data': data, 'size': len(body)}}]}
+    }
+
+
+def write_audit_log(audit_dir: Path, lines: int, rng: random.Random) -> Path:
+    """One day of audit events in AuditLogger's format"""
+    audit_dir.mkdir(parents=True, exist_ok=True)
+    path = audit_dir / f"audit_{FIXTURE_DAY.strftime('%Y-%m-%d')}.log"
+    step = 86000 / lines
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(lines):
+            entry = {
+                "timestamp": (FIXTURE_DAY + timedelta(seconds=i * step)).isoformat(),
+                "event_type": rng.choice(AUDIT_EVENTS),
+                "actor": rng.choice(AUDIT_ACTORS),
+                "target": f"AI_Employee_Vault/Needs_Action/EMAIL_{i:07d}.md",
+                "severity": "warning" if rng.random() < 0.01 else "info",
+                "details": {"task_type": "email", "size": rng.randint(100, 10000)},
+                "session_id": "", "thread_id": 140000000000000 + rng.randint(0, 99), "process_id": 4242,
+                "hash": f"{rng.getrandbits(128):032x}"
+            }
+            f.write(json.dumps(entry) + "\n")
+    # The rarest actor appears once, at the end, so filtering on it scans the whole file
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps({"timestamp": (FIXTURE_DAY + timedelta(seconds=86300)).isoformat(),
+                            "event_type": "config_changed", "actor": "admin", "target": "config.json",
+                            "severity": "info", "details": {}, "hash": ""}) + "\n")
+    return path
+
+
+def write_dashboard(vault: Path, lines: int, rng: random.Random):
+    """Dashboard.md with managed sections plus sections owned by other tools"""
+    vault.mkdir(parents=True, exist_ok=True)
+    sections = []
+    for index in range(max(1, lines // 20)):
+        rows = "\n".join(f"- {prose(rng, 60, INTENT_SENTENCES)}" for _ in range(20))
+        sections.append(f"## Notes {index}\n\n{rows}")
+    content = ("---\nlast_updated: 2025-01-15\n---\n\n# AI Employee Dashboard\n\n"
+               "## Current Status\n\n- **Needs Action**: 0\n\n"
+               "## Recent Activity\n\n| Time | Type | Description | Status |\n|------|------|-------------|--------|\n"
+               "| - | - | No recent activity | - |\n\n" + "\n\n".join(sections) + "\n")
+    (vault / "Dashboard.md").write_text(content, encoding='utf-8')
+
+
+def load_targets() -> Dict[str, Any]:
+    """Import the modules under test (from the work dir, since they create log folders on import)"""
+    import orchestrator
+    import process_email_queue
+    import work_email_automation_agent
+    from utils.audit_logger import AuditLogger
+    from utils.dashboard_writer import DashboardWriter
+    from utils.keyword_matcher import get_keyword_matcher
+
+    targets = {
+        'orchestrator': orchestrator,
+        'process_email_queue': process_email_queue,
+        'work_email_automation_agent': work_email_automation_agent,
+        'AuditLogger': AuditLogger,
+        'DashboardWriter': DashboardWriter,
+        'get_keyword_matcher': get_keyword_matcher,
+        'GmailWatcher': None
+    }
+    try:
+        sys.path.insert(0, str(PROJECT_ROOT / 'watchers'))
+        from gmail_watcher import GmailWatcher
+        targets['GmailWatcher'] = GmailWatcher
+    except ImportError as e:
+        print(f"[SKIP] gmail_watcher cases: {e}")
+    return targets
+
+
+def build_cases(targets: Dict[str, Any], sizes: List[str], root: Path) -> List[Tuple[str, Callable]]:
+    """(name, zero-argument callable) for every case at every requested size"""
+    orchestrator_module = targets['orchestrator']
+    # Skip __init__: the benchmarked methods only need the keyword matcher and dashboard writer
+    processor = orchestrator_module.TaskProcessor.__new__(orchestrator_module.TaskProcessor)
+    orchestrator = orchestrator_module.Orchestrator.__new__(orchestrator_module.Orchestrator)
+    orchestrator.keywords = targets['get_keyword_matcher']()
+
+    GmailWatcher = targets['GmailWatcher']
+    watcher = GmailWatcher.__new__(GmailWatcher) if GmailWatcher else None
+
+    cases = []
+    for size in sizes:
+        spec = SIZES[size]
+        rng = random.Random(f"{SEED}-{size}")
+
+        note = make_task_note(rng, spec['note_bytes'])
+        _, body = processor.parse_frontmatter(note)
+        job_text = prose(rng, spec['job_bytes'], JOB_SENTENCES)
+        html = make_html_email(rng, spec['email_bytes'])
+        html_message = gmail_message(html, 'text/html')
+        plain_message = gmail_message(prose(rng, spec['email_bytes'], INTENT_SENTENCES), 'text/plain')
+
+        cases += [
+            (f"parse_frontmatter[{size}]", lambda note=note: processor.parse_frontmatter(note)),
+            (f"analyze_content[{size}]", lambda body=body: orchestrator.analyze_content(body, 'email')),
+            (f"extract_amount_from_content[{size}]",
+             lambda body=body: orchestrator.extract_amount_from_content(body)),
+            (f"extract_job_details.process_email_queue[{size}]",
+             lambda text=job_text: targets['process_email_queue'].extract_job_details_from_email(text)),
+            (f"extract_job_details.work_email_agent[{size}]",
+             lambda text=job_text: targets['work_email_automation_agent'].extract_job_details_from_email(text)),
+        ]
+        if watcher:
+            cases += [
+                (f"get_email_body.html[{size}]", lambda m=html_message: watcher.get_email_body(m)),
+                (f"get_email_body.plain[{size}]", lambda m=plain_message: watcher.get_email_body(m)),
+            ]
+
+        vault = root / size / "AI_Employee_Vault"
+        write_audit_log(vault / "Audit", spec['audit_lines'], rng)
+        audit = targets['AuditLogger'](str(vault))
+        start, end = FIXTURE_DAY, FIXTURE_DAY + timedelta(hours=23, minutes=59)
+        cases += [
+            (f"search_events.recent[{size}]",
+             lambda audit=audit: audit.search_events(start_date=start, end_date=end)),
+            (f"search_events.full_scan[{size}]",
+             lambda audit=audit: audit.search_events(actor='admin', start_date=start, end_date=end)),
+        ]
+
+        write_dashboard(vault, spec['dashboard_lines'], rng)
+        dashboard_orchestrator = orchestrator_module.Orchestrator.__new__(orchestrator_module.Orchestrator)
+        dashboard_orchestrator.dashboard = targets['DashboardWriter'](str(vault), min_interval=3600)
+        frontmatter = {'subject': 'Project update and invoice'}
+
+        def update_dashboard(o=dashboard_orchestrator, fm=frontmatter):
+            o.update_dashboard('EMAIL_bench', 'email', fm)
+            o.dashboard.flush()
+
+        cases.append((f"update_dashboard[{size}]", update_dashboard))
+
+    return cases
+
+
+def calibration_workload():
+    """Fixed mix of the operations the hot paths lean on: regex, JSON, dicts, str methods"""
+    text = "Invoice #1234 for $1,250.00 due 2025-01-31. Please reply to client@example.com. " * 20
+    record = json.dumps({'a': 1, 'b': [1, 2, 3], 'c': {'d': 'text' * 10}})
+    total = 0
+    for _ in range(50):
+        total += len(re.findall(r'\$[\d,]+(?:\.\d{2})?|\b\w+@\w+\.\w+\b', text))
+        total += len(json.loads(record)['c']['d'])
+        words = {}
+        for word in text.lower().split():
+            words[word] = words.get(word, 0) + 1
+        total += len(words)
+    return total
+
+
+def measure(func: Callable, repeat: int, min_time: float) -> Dict[str, Any]:
+    """Best and median seconds per call over repeat runs of at least min_time each"""
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)) + 1)
+    runs = [elapsed / number] + [t / number for t in timer.repeat(repeat - 1, number)]
+    return {'best_s': min(runs), 'median_s': statistics.median(runs), 'number': number, 'repeat': repeat}
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """Per-case change against the baseline, using calibration-normalised best times"""
+    rows = []
+    base_cases = baseline.get('cases', {})
+    for name, result in results['cases'].items():
+        base = base_cases.get(name)
+        if not base:
+            continue
+        change = result['normalised'] / base['normalised'] - 1
+        rows.append({'case': name, 'baseline_s': base['best_s'], 'current_s': result['best_s'],
+                     'change': round(change, 4), 'regressed': change > tolerance})
+    return rows
+
+
+def format_seconds(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.3f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.3f} ms"
+    return f"{seconds * 1e6:.1f} us"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmarks for the per-message hot paths')
+    parser.add_argument('--sizes', default='small,medium,large', help=f"Comma-separated, from {', '.join(SIZES)}")
+    parser.add_argument('--filter', default=None, help='Only run cases whose name contains this text')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per case (best is kept)')
+    parser.add_argument('--min-time', type=float, default=0.2, help='Minimum seconds per timed run')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Allowed slowdown vs baseline before failing, e.g. 0.25 = 25%%')
+    parser.add_argument('--baseline', default=str(BASELINE_FILE), help='Baseline JSON path')
+    parser.add_argument('--save-baseline', action='store_true', help='Store this run as the baseline')
+    parser.add_argument('--output', default=None, help='Result JSON path')
+    parser.add_argument('--work-dir', default=None, help='Where to create fixture corpora')
+    args = parser.parse_args()
+
+    sizes = [s.strip() for s in args.sizes.split(',') if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        parser.error(f"unknown size(s): {', '.join(unknown)}")
+
+    root = Path(tempfile.mkdtemp(prefix="ai_employee_hot_paths_", dir=args.work_dir))
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        targets = load_targets()
+        # The code under test logs at INFO; keep it out of the timings
+        logging.disable(logging.INFO)
+
+        print(f"[BENCH] Building fixtures for {', '.join(sizes)} in {root}")
+        cases = build_cases(targets, sizes, root)
+        if args.filter:
+            cases = [(name, func) for name, func in cases if args.filter in name]
+
+        calibration = measure(calibration_workload, args.repeat, args.min_time)['best_s']
+        print(f"[BENCH] Calibration workload: {format_seconds(calibration)}")
+
+        results = {
+            'benchmark': 'hot_paths',
+            'timestamp': datetime.now().isoformat(),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'calibration_s': calibration,
+            'cases': {}
+        }
+        for name, func in cases:
+            func()  # warm caches (compiled regexes, keyword matcher) before timing
+            result = measure(func, args.repeat, args.min_time)
+            result['normalised'] = result['best_s'] / calibration
+            results['cases'][name] = result
+            print(f"  {name:<52} best {format_seconds(result['best_s']):>12}  "
+                  f"median {format_seconds(result['median_s']):>12}  x{result['number']}")
+    finally:
+        logging.disable(logging.NOTSET)
+        os.chdir(cwd)
+        shutil.rmtree(root, ignore_errors=True)
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    output = Path(args.output) if args.output else RESULTS_DIR / f"hot_paths_{results['commit']}_{stamp}.json"
+    output.write_text(json.dumps(results, indent=2), encoding='utf-8')
+    print(f"[OK] Results saved: {output}")
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline = {}
+        if baseline_path.exists():
+            baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+        # Keep cases this run did not cover (e.g. when --filter or --sizes was used)
+        baseline.update({k: v for k, v in results.items() if k != 'cases'})
+        baseline['cases'] = dict(baseline.get('cases', {}), **results['cases'])
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(baseline, indent=2), encoding='utf-8')
+        print(f"[OK] Baseline saved: {baseline_path}")
+        return 0
+
+    if not baseline_path.exists():
+        print(f"[WARN] No baseline at {baseline_path}; run with --save-baseline to create one")
+        return 0
+
+    baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+    if baseline.get('python') != results['python']:
+        print(f"[WARN] Baseline was recorded on Python {baseline.get('python')}, this is {results['python']}")
+
+    rows = compare(results, baseline, args.tolerance)
+    regressions = [row for row in rows if row['regressed']]
+    print(f"\nAgainst baseline {baseline.get('commit', 'unknown')} (tolerance {args.tolerance:.0%}):")
+    for row in rows:
+        flag = "REGRESSED" if row['regressed'] else ("faster" if row['change'] < -args.tolerance else "ok")
+        print(f"  {row['case']:<52} {format_seconds(row['baseline_s']):>12} -> "
+              f"{format_seconds(row['current_s']):>12}  {row['change']:+7.1%}  {flag}")
+
+    if regressions:
+        print(f"[FAIL] {len(regressions)} case(s) regressed beyond {args.tolerance:.0%}")
+        return 1
+    print(f"[OK] No regressions across {len(rows)} case(s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Orchestrator Throughput Benchmark
+
+Generates a synthetic vault with realistic email, WhatsApp and file-drop tasks,
+runs `orchestrator.py --once` against it with the local LLM stub server, and
+records tasks/sec, peak RSS, I/O syscalls and per-stage latency as JSON so
+results can be compared across versions.
+
+Usage:
+    python scripts/benchmark_orchestrator.py --tasks 1k,10k
+    python scripts/benchmark_orchestrator.py --tasks 1000 --types email=0.6,whatsapp=0.3,file_drop=0.1 \\
+        --intents invoice=0.2,reply=0.5,social=0.1,general=0.2 --body-bytes 200:8000 --keep
+
+Results: benchmarks/orchestrator_<tasks>_<commit>_<timestamp>.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Project paths
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from llm_stub_server import start_stub_server
+from utils.slo_tracker import new_trace_id
+
+RESULTS_DIR = PROJECT_ROOT / "benchmarks"
+SKILLS = ('email_reply_skill.md', 'invoice_skill.md')
+
+DEFAULT_TYPES = {'email': 0.5, 'whatsapp': 0.3, 'file_drop': 0.2}
+DEFAULT_INTENTS = {'invoice': 0.25, 'reply': 0.35, 'social': 0.1, 'general': 0.3}
+DEFAULT_PRIORITIES = {'high': 0.15, 'normal': 0.7, 'low': 0.15}
+
+SENDERS = ['client@example.com', 'billing@acme.io', 'jane.doe@contoso.com', 'ops@globex.net',
+           '+1 555 0100', '+44 20 7946 0958', 'recruiter@talent.co']
+
+INTENT_LINES = {
+    'invoice': ["Could you send the invoice for last month? The total should be ${amount}.",
+                "Please bill us ${amount} for the consulting work and share the payment details."],
+    'reply': ["Can you reply with an update on the project timeline?",
+              "Quick question about the deliverables, please respond when you can."],
+    'social': ["Let's post the launch announcement on LinkedIn and share it on Twitter."],
+    'general': ["Thanks for the meeting notes, everything looks good on our side.",
+                "Attached are the documents we discussed for your records."]
+}
+
+FILLER = ("The team reviewed the previous milestones and agreed on the next steps. "
+          "Budget, scope and resourcing remain unchanged for this quarter. ")
+
+FILE_TYPES = ['invoice', 'document', 'data', 'image']
+
+
+def parse_mix(text: Optional[str], default: Dict[str, float]) -> Dict[str, float]:
+    """'a=0.5,b=0.5' -> normalised weights"""
+    if not text:
+        return dict(default)
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        mix[name.strip()] = float(weight or 1)
+    total = sum(mix.values()) or 1
+    return {name: weight / total for name, weight in mix.items()}
+
+
+def parse_count(text: str) -> int:
+    """'10k' -> 10000"""
+    text = text.strip().lower()
+    multiplier = 1
+    if text.endswith('k'):
+        multiplier, text = 1000, text[:-1]
+    elif text.endswith('m'):
+        multiplier, text = 1000000, text[:-1]
+    return int(float(text) * multiplier)
+
+
+def pick(rng: random.Random, mix: Dict[str, float]) -> str:
+    return rng.choices(list(mix), weights=list(mix.values()))[0]
+
+
+def make_task(rng: random.Random, index: int, task_type: str, intent: str, priority: str,
+              body_bytes: int, ingested: datetime) -> str:
+    """Markdown content for one synthetic task, shaped like the watchers' output"""
+    sender = rng.choice(SENDERS)
+    line = rng.choice(INTENT_LINES.get(intent, INTENT_LINES['general'])).replace(
+        '{amount}', f"{rng.randint(50, 5000)}.00")
+    if priority == 'high':
+        line = "URGENT: " + line
+    filler = (FILLER * (body_bytes // len(FILLER) + 1))[:max(0, body_bytes - len(line))]
+
+    frontmatter = [f"type: {task_type}", f"trace_id: {new_trace_id()}", f"ingested_at: {ingested.isoformat()}"]
+    if task_type == 'email':
+        frontmatter += [f"from: {sender}", f"subject: Synthetic message {index}", f"received: {ingested.isoformat()}"]
+    elif task_type == 'whatsapp':
+        frontmatter += [f"from: {sender}", f"message_preview: {line[:60]}", f"received: {ingested.isoformat()}"]
+    else:
+        detected = 'invoice' if intent == 'invoice' else rng.choice(FILE_TYPES)
+        frontmatter += [f"original_name: upload_{index}.pdf", f"detected_type: {detected}",
+                        f"date_added: {ingested.isoformat()}"]
+    frontmatter += [f"priority: {priority}", "status: pending"]
+
+    return "---\n" + "\n".join(frontmatter) + f"\n---\n\n# Task {index}\n\n{line}\n\n{filler}\n"
+
+
+def generate_vault(root: Path, count: int, types: Dict[str, float], intents: Dict[str, float],
+                   priorities: Dict[str, float], body_range: tuple, seed: int) -> Dict[str, Any]:
+    """Write a synthetic vault under root; returns the realised mix"""
+    rng = random.Random(seed)
+    needs_action = root / "AI_Employee_Vault" / "Needs_Action"
+    needs_action.mkdir(parents=True, exist_ok=True)
+
+    skills_dir = root / ".claude" / "skills"
+    skills_dir.mkdir(parents=True, exist_ok=True)
+    for skill in SKILLS:
+        (skills_dir / skill).write_text(f"# {skill}\n\n" + FILLER * 40, encoding='utf-8')
+
+    config = PROJECT_ROOT / "config.json"
+    if config.exists():
+        shutil.copy(config, root / "config.json")
+    else:
+        (root / "config.json").write_text("{}", encoding='utf-8')
+
+    realised = {'types': {}, 'intents': {}, 'priorities': {}, 'bytes': 0}
+    start = datetime.now() - timedelta(seconds=count)
+    for index in range(count):
+        task_type, intent, priority = pick(rng, types), pick(rng, intents), pick(rng, priorities)
+        content = make_task(rng, index, task_type, intent, priority,
+                            rng.randint(*body_range), start + timedelta(seconds=index))
+        prefix = {'email': 'EMAIL', 'whatsapp': 'WHATSAPP', 'file_drop': 'FILE'}.get(task_type, 'TASK')
+        (needs_action / f"{prefix}_{index:07d}.md").write_text(content, encoding='utf-8')
+
+        realised['types'][task_type] = realised['types'].get(task_type, 0) + 1
+        realised['intents'][intent] = realised['intents'].get(intent, 0) + 1
+        realised['priorities'][priority] = realised['priorities'].get(priority, 0) + 1
+        realised['bytes'] += len(content)
+
+    return realised
+
+
+class ProcessSampler:
+    """Polls a child process for RSS and I/O counters while it runs"""
+
+    def __init__(self, pid: int, interval: float = 0.1):
+        self.peak_rss = 0
+        self.io = {}
+        self.stop_event = threading.Event()
+        self.process = psutil.Process(pid) if psutil else None
+        self.thread = threading.Thread(target=self.loop, args=(interval,), daemon=True)
+        self.thread.start()
+
+    def loop(self, interval: float):
+        while self.process and not self.stop_event.is_set():
+            try:
+                self.peak_rss = max(self.peak_rss, self.process.memory_info().rss)
+                if hasattr(self.process, 'io_counters'):
+                    self.io = self.process.io_counters()._asdict()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                break
+            self.stop_event.wait(interval)
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join()
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True).stdout.strip() or 'unknown'
+    except OSError:
+        return 'unknown'
+
+
+def count_md(directory: Path) -> int:
+    try:
+        with os.scandir(directory) as entries:
+            return sum(1 for e in entries if e.name.endswith('.md'))
+    except FileNotFoundError:
+        return 0
+
+
+def run_benchmark(count: int, args) -> Dict[str, Any]:
+    """Generate a vault, run one orchestrator pass over it and collect results"""
+    root = Path(tempfile.mkdtemp(prefix=f"ai_employee_bench_{count}_", dir=args.work_dir))
+    print(f"[BENCH] {count} tasks in {root}")
+
+    gen_start = time.perf_counter()
+    realised = generate_vault(root, count, args.type_mix, args.intent_mix, args.priority_mix,
+                              args.body_range, args.seed)
+    generation_s = time.perf_counter() - gen_start
+    print(f"[BENCH] Generated vault in {generation_s:.1f}s ({realised['bytes'] / 1e6:.1f} MB)")
+
+    server = start_stub_server(delay=args.llm_delay)
+    env = dict(os.environ)
+    env.pop('CLAUDECODE', None)
+    env.update({
+        'LLM_BACKEND': 'http',
+        'LLM_BASE_URL': f"http://127.0.0.1:{server.server_address[1]}",
+        'METRICS_INTERVAL': '3600',
+        'PYTHONUNBUFFERED': '1'
+    })
+    command = [sys.executable, str(PROJECT_ROOT / 'orchestrator.py'), '--once']
+    command.append('--no-dry-run' if args.llm else '--dry-run')
+
+    log_path = root / "orchestrator_stdout.log"
+    start = time.perf_counter()
+    with open(log_path, 'w', encoding='utf-8') as log_file:
+        child = subprocess.Popen(command, cwd=root, env=env, stdout=log_file, stderr=subprocess.STDOUT)
+        sampler = ProcessSampler(child.pid)
+        returncode = child.wait()
+        sampler.stop()
+    wall_s = time.perf_counter() - start
+    server.shutdown()
+
+    peak_rss = sampler.peak_rss
+    if resource is not None:
+        # ru_maxrss is KB on Linux, bytes on macOS
+        maxrss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        peak_rss = max(peak_rss, maxrss if sys.platform == 'darwin' else maxrss * 1024)
+
+    vault = root / "AI_Employee_Vault"
+    done = count_md(vault / "Done")
+    metrics_file = vault / "Logs" / "metrics.json"
+    stages = {}
+    if metrics_file.exists():
+        stages = json.loads(metrics_file.read_text(encoding='utf-8')).get('since_start', {}).get('stages', {})
+
+    result = {
+        'benchmark': 'orchestrator_once',
+        'timestamp': datetime.now().isoformat(),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'tasks': count,
+        'mix': realised,
+        'llm': {'enabled': args.llm, 'stub_delay_s': args.llm_delay, 'requests': server.requests},
+        'returncode': returncode,
+        'wall_s': round(wall_s, 3),
+        'generation_s': round(generation_s, 3),
+        'tasks_done': done,
+        'tasks_per_s': round(done / wall_s, 2) if wall_s else 0.0,
+        'peak_rss_mb': round(peak_rss / 1e6, 1),
+        'io': sampler.io,
+        'files': {folder: count_md(vault / folder)
+                  for folder in ('Needs_Action', 'In_Progress', 'Done', 'Plans', 'Pending_Approval', 'Quarantine')},
+        'stages': stages
+    }
+
+    if args.keep:
+        result['vault'] = str(root)
+    else:
+        shutil.rmtree(root, ignore_errors=True)
+    return result
+
+
+def print_result(result: Dict[str, Any]):
+    print(f"[RESULT] {result['tasks']} tasks: {result['tasks_done']} done in {result['wall_s']}s "
+          f"({result['tasks_per_s']}/s), peak RSS {result['peak_rss_mb']} MB, exit {result['returncode']}")
+    if result['io']:
+        io = result['io']
+        print(f"         I/O syscalls: {io.get('read_count', 0)} reads, {io.get('write_count', 0)} writes")
+    for name, summary in sorted(result['stages'].items()):
+        print(f"         {name:<24} p50 {summary['p50_ms']:>9.3f} ms  p95 {summary['p95_ms']:>9.3f} ms  "
+              f"p99 {summary['p99_ms']:>9.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Synthetic vault load generator and orchestrator benchmark')
+    parser.add_argument('--tasks', default='1k', help='Comma-separated task counts, e.g. 1k,10k,100k')
+    parser.add_argument('--types', help='Task type mix, e.g. email=0.5,whatsapp=0.3,file_drop=0.2')
+    parser.add_argument('--intents', help='Intent mix, e.g. invoice=0.25,reply=0.35,social=0.1,general=0.3')
+    parser.add_argument('--priorities', help='Priority mix, e.g. high=0.15,normal=0.7,low=0.15')
+    parser.add_argument('--body-bytes', default='300:3000', help='Body size range MIN:MAX in bytes')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-llm', dest='llm', action='store_false',
+                        help='Run in dry-run mode without LLM calls')
+    parser.add_argument('--llm-delay', type=float, default=0.0, help='Stub LLM latency in seconds')
+    parser.add_argument('--work-dir', default=None, help='Where to create benchmark vaults')
+    parser.add_argument('--output', default=None, help='Result JSON path (single task count only)')
+    parser.add_argument('--keep', action='store_true', help='Keep generated vaults')
+    args = parser.parse_args()
+
+    args.type_mix = parse_mix(args.types, DEFAULT_TYPES)
+    args.intent_mix = parse_mix(args.intents, DEFAULT_INTENTS)
+    args.priority_mix = parse_mix(args.priorities, DEFAULT_PRIORITIES)
+    low, _, high = args.body_bytes.partition(':')
+    args.body_range = (int(low), int(high or low))
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    counts = [parse_count(part) for part in args.tasks.split(',') if part.strip()]
+
+    for count in counts:
+        result = run_benchmark(count, args)
+        print_result(result)
+
+        if args.output and len(counts) == 1:
+            output = Path(args.output)
+        else:
+            stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            output = RESULTS_DIR / f"orchestrator_{count}_{result['commit']}_{stamp}.json"
+        output.write_text(json.dumps(result, indent=2), encoding='utf-8')
+        print(f"[OK] Results saved: {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -10,12 +10,17 @@ Usage: python scripts/daily_summary.py
 Scheduled: Daily at 8:00 AM via Task Scheduler
 """
 
+import sys
 import json
 from pathlib import Path
 from datetime import datetime
 
 # Project paths
 PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.dashboard_writer import DashboardWriter
+
 VAULT_PATH = PROJECT_ROOT / "AI_Employee_Vault"
 DASHBOARD_PATH = PROJECT_ROOT / "Dashboard.md"
 LOGS_PATH = VAULT_PATH / "Logs"
@@ -60,57 +65,28 @@ def get_vault_statistics() -> dict:
 
 
 def update_dashboard(stats: dict):
-    """Read Dashboard.md, update Current Status section, and save"""
+    """Update Dashboard.md through the shared dashboard writer"""
     print(f"Updating Dashboard.md at: {DASHBOARD_PATH}")
 
-    # Read current dashboard if it exists
-    if DASHBOARD_PATH.exists():
-        with open(DASHBOARD_PATH, 'r', encoding='utf-8') as f:
-            dashboard_content = f.read()
-    else:
-        dashboard_content = ""
+    writer = DashboardWriter(VAULT_PATH, dashboard_file=DASHBOARD_PATH)
 
-    # Get current date and time
-    current_date = datetime.now().strftime("%Y-%m-%d")
+    # Get current time
     current_time = datetime.now().strftime("%H:%M:%S")
 
-    # Create new Current Status section
-    new_status_section = f"""# 📊 AI Employee Dashboard
-
-**Last Updated:** {current_date} at {current_time}
-
-## 📈 Current Status
-
-| Metric | Count | Status |
-|--------|-------|--------|
-| **Pending Tasks** | {stats['counts']['needs_action']} | 🔴 Needs Action |
-| **In Progress** | {stats['counts']['in_progress']} | 🟡 Planning |
-| **Completed** | {stats['counts']['done']} | 🟢 Done |
-| **Awaiting Approval** | {stats['counts']['pending_approval']} | ⏳ Pending |
-
-## 🎯 System Health
-
-- **Status:** 🟢 Operational
+    writer.set_section("## 🎯 System Health", f"""- **Status:** 🟢 Operational
 - **Last Check:** {current_time}
 - **Watchers:** Active
-- **Orchestrator:** Running
-
-## 📝 Quick Actions
+- **Orchestrator:** Running""")
 
-- Process pending tasks: `claude skill process-tasks`
+    writer.set_section("## 📝 Quick Actions", """- Process pending tasks: `claude skill process-tasks`
 - Update dashboard: `claude skill update-dashboard`
-- Generate reports: `claude skill generate-reports`
-
----
-*Auto-generated by Daily Summary Script*
-*Next update: Tomorrow at 8:00 AM*
-"""
-
-    # Write updated dashboard
-    with open(DASHBOARD_PATH, 'w', encoding='utf-8') as f:
-        f.write(new_status_section)
+- Generate reports: `claude skill generate-reports`""")
 
-    print("[OK] Dashboard.md updated successfully")
+    # Write updated dashboard (skipped when nothing changed)
+    if writer.flush():
+        print("[OK] Dashboard.md updated successfully")
+    else:
+        print("[OK] Dashboard.md already up to date")
 
 
 def save_daily_log(stats: dict):
@@ -8,6 +8,9 @@ Monday Morning CEO Briefing using Claude and the ceo_briefing_skill.
 Designed to run via cron every Sunday at 10 PM:
     0 22 * * 0 python scripts/generate_ceo_briefing.py
 
+Add --profile cprofile|sample (or set PROFILE_MODE) to save a profile of the
+run to Logs/profiles/.
+
 Data Sources:
 - Business_Goals.md: Revenue targets and strategic goals
 - Done/: Completed tasks from last 7 days
@@ -31,6 +34,12 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any
 import re
 
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from utils.cycle_profiler import add_profile_arguments, apply_profile_arguments, get_cycle_profiler
+from utils.llm_backend import get_llm_backend
+from utils.skill_registry import load_skill
+
 # Configuration
 VAULT_DIR = Path('AI_Employee_Vault')
 BUSINESS_GOALS_FILE = VAULT_DIR / 'Business_Goals.md'
@@ -335,18 +344,12 @@ def save_briefing_data(data: Dict[str, Any]) -> Path:
 
 
 def generate_briefing_with_claude(data: Dict[str, Any]) -> Path:
-    """Call Claude CLI to generate the briefing"""
+    """Generate the briefing through the shared LLM backend"""
     log("Generating briefing with Claude...")
 
-    # Check if Claude CLI is available
-    try:
-        subprocess.run(['claude', '--version'], capture_output=True, check=True)
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        log("Claude CLI not found. Install with: npm install -g @anthropic-ai/claude-cli", "ERROR")
-        raise RuntimeError("Claude CLI not available")
-
     # Check if skill file exists
-    if not CEO_BRIEFING_SKILL.exists():
+    skill = load_skill(CEO_BRIEFING_SKILL)
+    if skill is None:
         log(f"CEO briefing skill not found: {CEO_BRIEFING_SKILL}", "ERROR")
         raise FileNotFoundError(f"Skill file missing: {CEO_BRIEFING_SKILL}")
 
@@ -366,7 +369,14 @@ def generate_briefing_with_claude(data: Dict[str, Any]) -> Path:
     # Build prompt
     data_json = json.dumps(data, indent=2)
 
-    prompt = f"""Read .claude/skills/ceo_briefing_skill.md and generate a Monday Morning CEO Briefing.
+    # Skill text is the constant prefix; the week's data is the per-call suffix
+    prefix = f"""Follow the CEO briefing skill defined below.
+
+SKILL:
+{skill.content}
+"""
+
+    prompt = f"""Generate a Monday Morning CEO Briefing.
 
 Use this collected data:
 
@@ -391,18 +401,20 @@ Format as a professional executive briefing with:
 6. Financial Snapshot
 """
 
-    log("Calling Claude CLI...")
+    backend = get_llm_backend()
+    log(f"Calling Claude ({backend.name} backend)...")
 
     try:
-        result = subprocess.run(
-            ['claude', '-p', prompt],
-            capture_output=True,
-            text=True,
-            check=True
-        )
+        response = backend.complete(prefix, prompt)
+        if not response.ok:
+            raise RuntimeError(response.error)
 
-        log("Claude execution completed")
-        log(f"Output: {result.stdout[:200]}...")  # First 200 chars
+        log(f"Claude execution completed in {response.elapsed:.1f}s")
+        log(f"Output: {response.text[:200]}...")  # First 200 chars
+
+        # Backends without tools return the briefing text instead of writing the file
+        if not output_file.exists() and not backend.acts_on_files and response.text.strip():
+            output_file.write_text(response.text.strip() + "\n", encoding='utf-8')
 
         # Verify output file was created
         if output_file.exists():
@@ -433,7 +445,7 @@ Please review the data below and generate manually if needed.
 
 1. Review the collected data
 2. Manually generate briefing if needed
-3. Check Claude CLI configuration
+3. Check the LLM backend configuration (LLM_BACKEND)
 
 ---
 
@@ -442,9 +454,8 @@ Please review the data below and generate manually if needed.
             output_file.write_text(placeholder_content, encoding='utf-8')
             return output_file
 
-    except subprocess.CalledProcessError as e:
+    except RuntimeError as e:
         log(f"Claude execution failed: {e}", "ERROR")
-        log(f"Stderr: {e.stderr}", "ERROR")
         raise
 
 
@@ -536,7 +547,7 @@ def send_desktop_notification(briefing_file: Path):
         # Don't fail the whole script if notification fails
 
 
-def main():
+def run_briefing():
     """Main execution flow"""
     log("=" * 60)
     log("CEO BRIEFING GENERATOR - STARTING")
@@ -589,5 +600,17 @@ def main():
         return 1
 
 
+def main():
+    """Parse options and run the briefing as one profiled cycle"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Monday Morning CEO Briefing generator')
+    add_profile_arguments(parser)
+    apply_profile_arguments(parser.parse_args())
+
+    with get_cycle_profiler('ceo_briefing', str(LOGS_DIR)).cycle('briefing'):
+        return run_briefing()
+
+
 if __name__ == '__main__':
     sys.exit(main())
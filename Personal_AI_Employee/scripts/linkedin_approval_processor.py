@@ -6,6 +6,7 @@ Respects posting hours (9 AM - 6 PM) and DRY_RUN mode.
 """
 
 import os
+import sys
 import json
 from pathlib import Path
 from datetime import datetime
@@ -17,6 +18,11 @@ load_dotenv()
 
 # Project paths
 PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.vault_records import load_record
+from utils.slo_tracker import approved_at, mark_stage
+
 VAULT_PATH = PROJECT_ROOT / "AI_Employee_Vault"
 APPROVED_PATH = VAULT_PATH / "Approved"
 DONE_PATH = VAULT_PATH / "Done"
@@ -40,19 +46,11 @@ def is_posting_hours() -> bool:
 
 def extract_post_content(filepath: Path) -> str:
     """Extract post content from approval file"""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
+    record = load_record(filepath)
+    if record is None:
+        return ""
 
-    # Extract content between ## Post Content and ## Validation
-    if "## Post Content" in content:
-        start = content.find("## Post Content") + len("## Post Content")
-        end = content.find("## Validation")
-        if end == -1:
-            end = content.find("## To Approve")
-        post_content = content[start:end].strip()
-        return post_content
-
-    return ""
+    return record.section("Post Content")
 
 
 def log_to_linkedin_log(message: str, post_preview: str = ""):
@@ -99,6 +97,8 @@ def process_approved_posts() -> Dict[str, Any]:
 
         # Extract post content
         post_content = extract_post_content(filepath)
+        record = load_record(filepath)
+        trace_id = record.get('trace_id') if record else None
         post_preview = post_content[:100] if post_content else "No content"
 
         # Check posting hours
@@ -129,6 +129,9 @@ def process_approved_posts() -> Dict[str, Any]:
                 post_preview
             )
 
+        mark_stage(trace_id, 'approved', when=approved_at(filepath))
+        mark_stage(trace_id, 'posted', platform='linkedin', dry_run=DRY_RUN)
+
         # Move file to Done
         done_filepath = DONE_PATH / filepath.name
         filepath.rename(done_filepath)
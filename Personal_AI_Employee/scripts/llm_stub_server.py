@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+LLM Stub Server
+
+Local stand-in for the Messages API used by utils/llm_backend.HTTPBackend.
+Answers POST /v1/messages with a deterministic, streamed (SSE) or plain JSON
+reply, so the orchestrator and briefing generator can run end to end without
+network access or API keys.
+
+Usage:
+    python scripts/llm_stub_server.py --port 8765 [--delay 0.05]
+    LLM_BACKEND=http LLM_BASE_URL=http://127.0.0.1:8765 python orchestrator.py --once
+
+The first 500 characters of the reply echo the user turn. Prompt prefixes seen
+before are reported as cache reads in the usage block, mimicking prompt caching.
+"""
+
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Handles /v1/messages requests over keep-alive HTTP/1.1"""
+
+    protocol_version = 'HTTP/1.1'
+    # Streamed events are small writes; Nagle + delayed ACK would add ~40 ms each
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def send_json(self, status: int, payload: dict):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_event(self, event: dict):
+        data = f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode('utf-8')
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        if self.path.rstrip('/') != '/v1/messages':
+            self.send_json(404, {'type': 'error', 'error': {'type': 'not_found_error', 'message': self.path}})
+            return
+
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self.send_json(400, {'type': 'error', 'error': {'type': 'invalid_request_error', 'message': 'bad JSON'}})
+            return
+
+        system = request.get('system', '')
+        if isinstance(system, list):
+            system = ''.join(block.get('text', '') for block in system)
+        messages = request.get('messages', [])
+        user_text = messages[-1].get('content', '') if messages else ''
+        if isinstance(user_text, list):
+            user_text = ''.join(block.get('text', '') for block in user_text)
+
+        # Pretend to cache every distinct prefix
+        prefix_key = hashlib.sha256(system.encode('utf-8')).hexdigest()
+        with self.server.lock:
+            cached = prefix_key in self.server.prefixes
+            self.server.prefixes.add(prefix_key)
+            self.server.requests += 1
+
+        prefix_tokens = len(system) // 4
+        usage = {
+            'input_tokens': len(user_text) // 4,
+            'cache_read_input_tokens': prefix_tokens if cached else 0,
+            'cache_creation_input_tokens': 0 if cached else prefix_tokens
+        }
+        reply = f"STUB REPLY\n\n{user_text[:500]}"
+
+        if self.server.delay:
+            time.sleep(self.server.delay)
+
+        if not request.get('stream'):
+            self.send_json(200, {
+                'type': 'message', 'role': 'assistant', 'model': request.get('model', 'stub'),
+                'content': [{'type': 'text', 'text': reply}], 'usage': usage
+            })
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        self.send_event({'type': 'message_start', 'message': {'role': 'assistant', 'usage': usage}})
+        self.send_event({'type': 'content_block_start', 'index': 0, 'content_block': {'type': 'text', 'text': ''}})
+        for i in range(0, len(reply), 64):
+            self.send_event({'type': 'content_block_delta', 'index': 0,
+                             'delta': {'type': 'text_delta', 'text': reply[i:i + 64]}})
+        self.send_event({'type': 'content_block_stop', 'index': 0})
+        self.send_event({'type': 'message_delta', 'delta': {'stop_reason': 'end_turn'},
+                         'usage': {'output_tokens': len(reply) // 4}})
+        self.send_event({'type': 'message_stop'})
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+def start_stub_server(host: str = '127.0.0.1', port: int = 0, delay: float = 0.0,
+                      verbose: bool = False) -> ThreadingHTTPServer:
+    """Start the stub server on a background thread; port 0 picks a free port"""
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.delay = delay
+    server.verbose = verbose
+    server.lock = threading.Lock()
+    server.prefixes = set()
+    server.requests = 0
+    thread = threading.Thread(target=server.serve_forever, name='llm-stub-server', daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for the LLM Messages API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay', type=float, default=0.0, help='Seconds to wait before replying')
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+    args = parser.parse_args()
+
+    server = start_stub_server(args.host, args.port, args.delay, args.verbose)
+    print(f"LLM stub server listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(f"Stopped after {server.requests} requests")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
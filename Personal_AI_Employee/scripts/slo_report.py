@@ -0,0 +1,63 @@
+"""
+SLO Report Script for Personal AI Employee
+
+Builds the rolling end-to-end SLO report from Logs/traces/*.jsonl:
+- share of items planned within --plan-target seconds of ingest
+- share of approved items executed/posted within --execute-target minutes
+- queue wait and latency percentiles for each leg
+
+Writes AI_Employee_Vault/Logs/slo_report.json and, with --dashboard, an
+"SLO" section in the vault Dashboard.md.
+
+Usage: python scripts/slo_report.py [--hours 24] [--plan-target 60] [--execute-target 15] [--dashboard]
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+# Project paths
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.dashboard_writer import DashboardWriter
+from utils.slo_tracker import (EXECUTE_TARGET_MINUTES, PLAN_TARGET_SECONDS,
+                               render_slo_markdown, slo_report)
+
+VAULT_PATH = PROJECT_ROOT / "AI_Employee_Vault"
+LOGS_PATH = VAULT_PATH / "Logs"
+
+
+def main():
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description='End-to-end SLO report')
+    parser.add_argument('--hours', type=float, default=24, help='Rolling window in hours')
+    parser.add_argument('--plan-target', type=float, default=PLAN_TARGET_SECONDS,
+                        help='Seconds from ingest to plan')
+    parser.add_argument('--execute-target', type=float, default=EXECUTE_TARGET_MINUTES,
+                        help='Minutes from approval to execution')
+    parser.add_argument('--dashboard', action='store_true', help='Update the SLO section in Dashboard.md')
+    args = parser.parse_args()
+
+    report = slo_report(str(LOGS_PATH), args.hours, args.plan_target, args.execute_target)
+
+    report_path = LOGS_PATH / "slo_report.json"
+    LOGS_PATH.mkdir(parents=True, exist_ok=True)
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    markdown = render_slo_markdown(report)
+    print(markdown)
+    print()
+    print(f"[OK] Report saved: {report_path}")
+
+    if args.dashboard:
+        writer = DashboardWriter(str(VAULT_PATH), min_interval=0)
+        writer.set_section("## ⏱️ SLO", markdown)
+        writer.flush()
+        print("[OK] Dashboard SLO section updated")
+
+
+if __name__ == "__main__":
+    main()
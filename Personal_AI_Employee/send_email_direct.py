@@ -15,6 +15,15 @@ from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
 from datetime import datetime
 
+from utils.gmail_quota import PRIORITY_SEND, get_gmail_quota
+
+# Load .env from this folder; the dashboard runs this script from its own directory
+try:
+    from dotenv import load_dotenv
+    load_dotenv(os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env'))
+except ImportError:
+    pass  # dotenv not installed, will use system env vars
+
 # Gmail API scope for sending emails
 SCOPES = ['https://www.googleapis.com/auth/gmail.send']
 
@@ -74,11 +83,11 @@ def send_email_direct(to_email, subject, body):
         # Encode message
         raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
 
-        # Send via Gmail API
-        result = service.users().messages().send(
+        # Send via Gmail API, ahead of any background reads and retried on 429 after Retry-After
+        result = get_gmail_quota().execute(service.users().messages().send(
             userId='me',
             body={'raw': raw_message}
-        ).execute()
+        ), 'messages.send', PRIORITY_SEND)
 
         return {
             'success': True,
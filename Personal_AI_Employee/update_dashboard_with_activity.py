@@ -8,20 +8,18 @@ import json
 from datetime import datetime
 from pathlib import Path
 
-def count_md_files(directory):
-    """Count markdown files in a directory"""
-    if not os.path.exists(directory):
-        return 0
-    return len([f for f in os.listdir(directory) if f.lower().endswith('.md')])
+from utils.activity_log import compact_activity
+from utils.dashboard_writer import DashboardWriter
 
 def get_recent_activity():
     """Get recent activity from log files"""
     vault_path = "AI_Employee_Vault"
     logs_path = os.path.join(vault_path, "Logs")
 
-    # Get today's log file
+    # Get today's log file, folding in the append-only activity segments first
     today = datetime.now().strftime('%Y-%m-%d')
     log_file = os.path.join(logs_path, f"{today}.json")
+    compact_activity(logs_path)
 
     if not os.path.exists(log_file):
         # Check for other recent log files
@@ -54,80 +52,28 @@ def get_recent_activity():
         return []
 
 def update_dashboard():
-    # Define vault paths
-    vault_path = "AI_Employee_Vault"
-    needs_action_path = os.path.join(vault_path, "Needs_Action")
-    in_progress_path = os.path.join(vault_path, "In_Progress")
-    pending_approval_path = os.path.join(vault_path, "Pending_Approval")
-    done_path = os.path.join(vault_path, "Done")
-    logs_path = os.path.join(vault_path, "Logs")
-
-    # Count files in each directory
-    pending_actions = count_md_files(needs_action_path)
-    in_progress = count_md_files(in_progress_path)
-    awaiting_approval = count_md_files(pending_approval_path)
-    completed = count_md_files(done_path)
+    # Counts come from a single scan of the vault folders
+    writer = DashboardWriter("AI_Employee_Vault")
+    counts = writer.counts()
 
-    # Get recent activity
+    # Get recent activity, oldest first so the newest ends up on top
     recent_activity = get_recent_activity()
+    for activity in reversed(recent_activity):
+        when = datetime.strptime(f"{activity['date']} {activity['time']}", '%Y-%m-%d %H:%M')
+        writer.record_activity(activity['action'], activity['subject'], when=when)
 
-    # Create dashboard content
-    dashboard_content = f"""---
-last_updated: {datetime.now().strftime('%Y-%m-%d')}
----
-
-# AI Employee Dashboard
-
-## Current Status
-
-- **Pending Actions**: {pending_actions}
-- **In Progress**: {in_progress}
-- **Awaiting Approval**: {awaiting_approval}
-
-## Bank Summary
-
-- **Current Balance**: PKR 0.00
-- **Last Updated**: Not configured
-
-## Recent Activity
-
-| Date | Time | Action | Status | Details |
-|------|------|--------|--------|---------|
-"""
-
-    # Add recent activity rows
-    if recent_activity:
-        for activity in recent_activity:
-            dashboard_content += f"| {activity['date']} {activity['time']} | {activity['action']} | {activity['subject']} | ✅ Done | |\n"
+    # Write the updated dashboard (skipped when nothing changed)
+    if writer.flush():
+        print(f"Dashboard updated successfully!")
     else:
-        dashboard_content += "| - | - | - | - | No recent activity |\n"
-
-    dashboard_content += """|------|------|--------|--------|---------|
-| - | - | - | - | No recent activity |
-
-## Upcoming Deadlines
-
-| Date | Task | Priority | Status |
-|------|------|----------|--------|
-| - | - | - | No upcoming deadlines |
-
----
-*Last refreshed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*
-"""
-
-    # Write the updated dashboard
-    dashboard_file = os.path.join(vault_path, "Dashboard.md")
-    with open(dashboard_file, 'w', encoding='utf-8') as f:
-        f.write(dashboard_content)
-
-    print(f"Dashboard updated successfully!")
+        print(f"Dashboard already up to date")
     print(f"Current status:")
-    print(f"- Pending Actions: {pending_actions}")
-    print(f"- In Progress: {in_progress}")
-    print(f"- Awaiting Approval: {awaiting_approval}")
-    print(f"- Completed: {completed}")
+    print(f"- Pending Actions: {counts['Needs_Action']}")
+    print(f"- In Progress: {counts['In_Progress']}")
+    print(f"- Awaiting Approval: {counts['Pending_Approval']}")
+    print(f"- Completed: {counts['Done']}")
     print(f"Recent activities included: {len(recent_activity)}")
     print(f"Dashboard last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
 if __name__ == "__main__":
-    update_dashboard()
\ No newline at end of file
+    update_dashboard()
@@ -0,0 +1,240 @@
+"""
+Append-only Activity Log for Personal AI Employee
+
+Task and execution records are appended to JSONL segments by a single writer
+thread, so logging cost stays flat no matter how many actions a day holds.
+Compaction rebuilds the legacy Logs/YYYY-MM-DD.json shape on demand.
+"""
+
+import os
+import json
+import queue
+import atexit
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_DIR_NAME = "activity"
+MAX_SEGMENT_BYTES = 5 * 1024 * 1024  # rotate segments at 5 MB
+LEGACY_SECTIONS = ("actions", "executions")
+COMPACTED_MARKER = "compacted_from"
+
+
+def segment_paths(logs_dir: Path, date_str: str) -> List[Path]:
+    """All JSONL segments for a day, oldest first"""
+    segment_dir = Path(logs_dir) / SEGMENT_DIR_NAME
+    if not segment_dir.exists():
+        return []
+    return sorted(segment_dir.glob(f"{date_str}.*.jsonl"))
+
+
+def read_segments(logs_dir: Path, date_str: str) -> List[Dict[str, Any]]:
+    """Read every record for a day, skipping a torn line left by a crash"""
+    records = []
+    for segment in segment_paths(logs_dir, date_str):
+        with open(segment, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping malformed activity record in {segment.name}")
+    return records
+
+
+def migrate_legacy_log(logs_dir: Path, date_str: str):
+    """Move entries from a pre-JSONL daily log into a segment so compaction keeps them"""
+    legacy_file = Path(logs_dir) / f"{date_str}.json"
+    legacy_segment = Path(logs_dir) / SEGMENT_DIR_NAME / f"{date_str}.legacy.jsonl"
+    if legacy_segment.exists() or not legacy_file.exists():
+        return
+
+    try:
+        with open(legacy_file, 'r', encoding='utf-8') as f:
+            log_data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.error(f"Cannot migrate legacy log {legacy_file.name}: {e}")
+        return
+
+    if not isinstance(log_data, dict) or COMPACTED_MARKER in log_data:
+        return
+
+    legacy_segment.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = legacy_segment.with_suffix('.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        for section in LEGACY_SECTIONS:
+            for entry in log_data.get(section, []):
+                f.write(json.dumps({'section': section, 'entry': entry}) + "\n")
+    os.replace(tmp_file, legacy_segment)
+    logger.info(f"Migrated legacy activity log {legacy_file.name}")
+
+
+def compact_activity(logs_dir: Path, date: datetime = None) -> Optional[Path]:
+    """Rebuild Logs/YYYY-MM-DD.json from the day's segments if they changed"""
+    if date is None:
+        date = datetime.now()
+    logs_dir = Path(logs_dir)
+    date_str = date.strftime('%Y-%m-%d')
+    legacy_file = logs_dir / f"{date_str}.json"
+
+    migrate_legacy_log(logs_dir, date_str)
+    segments = segment_paths(logs_dir, date_str)
+    if not segments:
+        return legacy_file if legacy_file.exists() else None
+
+    # Skip the rewrite when nothing was appended since the last compaction
+    if legacy_file.exists():
+        newest_segment = max(segment.stat().st_mtime_ns for segment in segments)
+        if legacy_file.stat().st_mtime_ns >= newest_segment:
+            return legacy_file
+
+    log_data = {'date': date_str, COMPACTED_MARKER: SEGMENT_DIR_NAME}
+    for section in LEGACY_SECTIONS:
+        log_data[section] = []
+
+    for record in read_segments(logs_dir, date_str):
+        section = record.get('section')
+        if section in log_data and isinstance(log_data[section], list):
+            log_data[section].append(record.get('entry', {}))
+
+    for section in LEGACY_SECTIONS:
+        log_data[section].sort(key=lambda entry: entry.get('timestamp', ''))
+
+    tmp_file = legacy_file.with_suffix('.json.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(log_data, f, indent=2)
+    os.replace(tmp_file, legacy_file)
+
+    return legacy_file
+
+
+class ActivityLog:
+    """Single-writer, append-only daily activity log"""
+
+    def __init__(self, logs_dir: str = "AI_Employee_Vault/Logs", max_segment_bytes: int = MAX_SEGMENT_BYTES):
+        self.logs_dir = Path(logs_dir)
+        self.segment_dir = self.logs_dir / SEGMENT_DIR_NAME
+        self.segment_dir.mkdir(parents=True, exist_ok=True)
+        self.max_segment_bytes = max_segment_bytes
+
+        self.queue = queue.Queue()
+        self.current_date = None
+        self.current_file = None
+        self.current_index = 0
+        self.current_size = 0
+
+        self.writer = threading.Thread(target=self.write_loop, name='activity-log-writer', daemon=True)
+        self.writer.start()
+        atexit.register(self.close)
+
+    def append(self, section: str, entry: Dict[str, Any]):
+        """Queue a record for the writer thread; never blocks on disk"""
+        self.queue.put({'section': section, 'entry': entry})
+
+    def log_action(self, entry: Dict[str, Any]):
+        """Record a processed task"""
+        self.append('actions', entry)
+
+    def log_execution(self, entry: Dict[str, Any]):
+        """Record an executed approval"""
+        self.append('executions', entry)
+
+    def flush(self):
+        """Block until every queued record is on disk"""
+        self.queue.join()
+
+    def close(self):
+        """Drain the queue and stop the writer"""
+        if not self.writer.is_alive():
+            return
+        self.queue.put(None)
+        self.writer.join()
+
+    def compact(self, date: datetime = None) -> Optional[Path]:
+        """Flush pending records, then rebuild the legacy daily JSON"""
+        self.flush()
+        return compact_activity(self.logs_dir, date)
+
+    def open_segment(self, date_str: str):
+        """Open the newest segment for a day, rotating once it is full"""
+        if self.current_file:
+            self.current_file.close()
+
+        existing = [p for p in segment_paths(self.logs_dir, date_str) if p.suffixes[-2][1:].isdigit()]
+        if date_str != self.current_date:
+            self.current_index = int(existing[-1].suffixes[-2][1:]) if existing else 0
+
+        path = self.segment_dir / f"{date_str}.{self.current_index:03d}.jsonl"
+        if path.exists() and path.stat().st_size >= self.max_segment_bytes:
+            self.current_index += 1
+            path = self.segment_dir / f"{date_str}.{self.current_index:03d}.jsonl"
+
+        self.current_file = open(path, 'a', encoding='utf-8')
+        self.current_size = path.stat().st_size
+        self.current_date = date_str
+
+    def write_record(self, record: Dict[str, Any]):
+        """Append one record, switching segment on day change or size limit"""
+        date_str = datetime.now().strftime('%Y-%m-%d')
+        previous_date = self.current_date
+
+        if date_str != self.current_date or self.current_size >= self.max_segment_bytes:
+            self.open_segment(date_str)
+            if previous_date and previous_date != date_str:
+                # Yesterday is complete: fold it into the legacy shape once
+                compact_activity(self.logs_dir, datetime.strptime(previous_date, '%Y-%m-%d'))
+
+        line = json.dumps(record, default=str) + "\n"
+        self.current_file.write(line)
+        self.current_size += len(line.encode('utf-8'))
+
+    def write_loop(self):
+        """Writer thread: drain the queue in batches with one flush per batch"""
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for record in batch:
+                if record is None:
+                    running = False
+                    continue
+                try:
+                    self.write_record(record)
+                except Exception as e:
+                    logger.error(f"Error writing activity record: {e}")
+
+            try:
+                if self.current_file:
+                    self.current_file.flush()
+                    if not running:
+                        self.current_file.close()
+                        self.current_file = None
+            except OSError as e:
+                logger.error(f"Error flushing activity log: {e}")
+
+            for _ in batch:
+                self.queue.task_done()
+
+
+# Global activity log instance, created on first use
+activity_log = None
+_activity_log_lock = threading.Lock()
+
+def get_activity_log(logs_dir: str = "AI_Employee_Vault/Logs") -> ActivityLog:
+    """Get the process-wide activity log writer for a logs directory"""
+    global activity_log
+    with _activity_log_lock:
+        if activity_log is None:
+            activity_log = ActivityLog(logs_dir)
+        return activity_log
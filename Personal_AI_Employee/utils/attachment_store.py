@@ -0,0 +1,144 @@
+"""
+Attachment Store for Personal AI Employee
+
+Content-addressed blobs for dropped files, kept under
+AI_Employee_Vault/Attachments/<first two hex digits>/<sha256><ext>.
+
+A drop is hashed in one streaming read. If a blob with that hash already
+exists the drop costs no write at all; otherwise the blob is created with
+the cheapest copy the filesystem allows:
+- reflink (FICLONE on btrfs/XFS): copy-on-write, no data written
+- os.copy_file_range: in-kernel copy (some filesystems clone here too)
+- a plain buffered copy as the last resort
+With ATTACHMENT_LINK_MODE=hardlink, drops on the same filesystem are hard
+linked instead. That only suits setups where files in the drop folder are
+never edited in place, since an edit would change the stored blob too.
+"""
+
+import os
+import sys
+import stat
+import shutil
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any
+
+logger = logging.getLogger(__name__)
+
+HASH_NAME = 'sha256'
+COPY_CHUNK = 1024 * 1024
+FICLONE = 0x40049409  # linux/fs.h _IOW(0x94, 9, int)
+LINK_MODES = ('copy', 'hardlink')
+
+
+class AttachmentStore:
+    """Deduplicating blob store keyed by SHA-256 of the content"""
+
+    def __init__(self, root: str = "AI_Employee_Vault/Attachments", link_mode: str = 'copy'):
+        if link_mode not in LINK_MODES:
+            logger.warning(f"Unknown attachment link mode '{link_mode}', using copy")
+            link_mode = 'copy'
+        self.root = Path(root)
+        self.link_mode = link_mode
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def blob_path(self, digest: str, suffix: str = "") -> Path:
+        return self.root / digest[:2] / f"{digest}{suffix.lower()}"
+
+    def hash_file(self, source: Path) -> str:
+        with open(source, 'rb') as f:
+            return hashlib.file_digest(f, HASH_NAME).hexdigest()
+
+    def put(self, source: Path) -> Dict[str, Any]:
+        """Store a file; returns sha256, blob path, size and how it was stored ('dedupe' if already present)"""
+        before = source.stat()
+        digest = self.hash_file(source)
+        blob = self.blob_path(digest, source.suffix)
+        info = {'sha256': digest, 'path': blob, 'size': before.st_size}
+
+        if blob.exists():
+            logger.info(f"Attachment {source.name} already stored as {digest[:12]}")
+            return dict(info, method='dedupe')
+
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        tmp = blob.with_name(f".{blob.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            method = self.materialize(source, tmp)
+            after = source.stat()
+            if (after.st_size, after.st_mtime_ns) != (before.st_size, before.st_mtime_ns):
+                raise OSError(f"{source.name} changed while being stored")
+            if method != 'hardlink':
+                # Blobs are immutable; a hard link shares the original's mode, so leave that alone
+                os.chmod(tmp, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            # A concurrent put of the same content wrote identical bytes, so replacing is harmless
+            os.replace(tmp, blob)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+
+        logger.info(f"Stored attachment {source.name} as {digest[:12]} ({method})")
+        return dict(info, method=method)
+
+    def materialize(self, source: Path, dest: Path) -> str:
+        """Create dest with source's content as cheaply as possible; returns the method used"""
+        if self.link_mode == 'hardlink':
+            try:
+                os.link(source, dest)
+                return 'hardlink'
+            except OSError as e:
+                logger.debug(f"Hard link not possible for {source.name} ({e}), copying")
+
+        src = os.open(source, os.O_RDONLY)
+        try:
+            dst = os.open(dest, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                if sys.platform.startswith('linux'):
+                    try:
+                        import fcntl
+                        fcntl.ioctl(dst, FICLONE, src)
+                        return 'reflink'
+                    except OSError:
+                        pass
+
+                if hasattr(os, 'copy_file_range'):
+                    try:
+                        size = os.fstat(src).st_size
+                        copied = 0
+                        while copied < size:
+                            n = os.copy_file_range(src, dst, size - copied, copied, copied)
+                            if n == 0:
+                                break
+                            copied += n
+                        if copied == size:
+                            return 'copy_file_range'
+                    except OSError as e:
+                        logger.debug(f"copy_file_range failed for {source.name} ({e}), copying")
+                    os.ftruncate(dst, 0)
+
+                with open(src, 'rb', closefd=False) as fsrc, open(dst, 'wb', closefd=False) as fdst:
+                    fsrc.seek(0)
+                    fdst.seek(0)
+                    shutil.copyfileobj(fsrc, fdst, COPY_CHUNK)
+                return 'copy'
+            finally:
+                os.close(dst)
+        finally:
+            os.close(src)
+
+
+# Global store instance, created on first use
+attachment_store = None
+_attachment_store_lock = threading.Lock()
+
+def get_attachment_store(root: str = "AI_Employee_Vault/Attachments") -> AttachmentStore:
+    """Get the process-wide attachment store, configured from ATTACHMENT_* environment variables"""
+    global attachment_store
+    with _attachment_store_lock:
+        if attachment_store is None:
+            attachment_store = AttachmentStore(
+                root,
+                link_mode=os.getenv('ATTACHMENT_LINK_MODE', 'copy').strip().lower()
+            )
+        return attachment_store
@@ -15,8 +15,6 @@ import hashlib
 import threading
 from contextlib import contextmanager
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class AuditEventType(Enum):
@@ -0,0 +1,259 @@
+"""
+Cycle Profiling for Personal AI Employee
+
+Wraps each orchestrator/watcher cycle in a profiler when PROFILE_MODE (or the
+--profile flag) is set:
+- cprofile: deterministic cProfile of the cycle's thread, saved as .pstats.
+            Only one cProfile can be active per process (Python 3.12+), so
+            cycles that start while another is being profiled run unprofiled
+- sample:   low-overhead stack sampling, saved as collapsed stacks
+            (one "frame;frame;frame count" line per stack, ready for
+            flamegraph.pl or speedscope)
+
+Profiles land in AI_Employee_Vault/Logs/profiles/ and are capped at
+PROFILE_KEEP files per component. With PROFILE_SLOWEST=N only the N slowest
+cycles seen so far are kept, so a long-running process can be left profiling
+in production and still only retain the flame graphs worth looking at.
+"""
+
+import os
+import re
+import sys
+import time
+import cProfile
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ('off', 'cprofile', 'sample')
+DEFAULT_KEEP = 20
+DEFAULT_SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+
+PROFILE_SUFFIXES = {'cprofile': '.pstats', 'sample': '.collapsed'}
+ELAPSED_PATTERN = re.compile(r'_(\d+)ms\.(?:pstats|collapsed)$')
+
+# Held while a cProfile is enabled, across every component in the process
+_cprofile_lock = threading.Lock()
+
+
+class StackSampler:
+    """One background thread sampling the stacks of every thread being profiled"""
+
+    def __init__(self, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.active: Dict[int, Tuple[int, Counter]] = {}
+        self.tokens = 0
+        self.labels = {}
+        self.wake = threading.Event()
+        self.thread = threading.Thread(target=self.loop, name='profile-sampler', daemon=True)
+        self.thread.start()
+
+    def start(self, thread_id: int) -> int:
+        """Begin sampling a thread; returns a token for stop()"""
+        with self.lock:
+            self.tokens += 1
+            self.active[self.tokens] = (thread_id, Counter())
+            self.wake.set()
+            return self.tokens
+
+    def stop(self, token: int) -> Counter:
+        """Stop sampling and return collapsed stack -> sample count"""
+        with self.lock:
+            _, stacks = self.active.pop(token, (None, Counter()))
+            if not self.active:
+                self.wake.clear()
+            return stacks
+
+    def frame_label(self, code) -> str:
+        label = self.labels.get(code)
+        if label is None:
+            label = self.labels[code] = f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+        return label
+
+    def loop(self):
+        while True:
+            self.wake.wait()
+            frames = sys._current_frames()
+            with self.lock:
+                for thread_id, stacks in self.active.values():
+                    frame = frames.get(thread_id)
+                    if frame is None:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        stack.append(self.frame_label(frame.f_code))
+                        frame = frame.f_back
+                    stacks[';'.join(reversed(stack))] += 1
+            del frames
+            time.sleep(self.interval)
+
+
+class CycleProfiler:
+    """Profiles cycles of one component and keeps a bounded set of profile files"""
+
+    def __init__(self, name: str, profiles_dir: str = "AI_Employee_Vault/Logs/profiles",
+                 mode: str = 'off', keep: int = DEFAULT_KEEP, slowest: int = 0,
+                 interval: float = DEFAULT_SAMPLE_INTERVAL):
+        if mode not in PROFILE_MODES:
+            logger.warning(f"Unknown profile mode '{mode}', profiling disabled")
+            mode = 'off'
+        self.name = re.sub(r'[^\w.-]', '_', name)
+        self.profiles_dir = Path(profiles_dir)
+        self.mode = mode
+        self.keep = max(1, keep)
+        self.slowest = slowest
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.sampler = None
+        self.kept: List[Tuple[float, Path]] = []
+
+        if self.enabled:
+            self.profiles_dir.mkdir(parents=True, exist_ok=True)
+            if mode == 'sample':
+                self.sampler = StackSampler(interval)
+            if slowest:
+                self.kept = self.existing_profiles()
+            logger.info(f"Profiling {self.name} cycles ({mode}"
+                        f"{f', slowest {slowest}' if slowest else ''}, keep {self.keep}) -> {self.profiles_dir}")
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != 'off'
+
+    def existing_profiles(self) -> List[Tuple[float, Path]]:
+        """(elapsed seconds, path) for this component's profiles from earlier runs"""
+        profiles = []
+        for path in self.profiles_dir.glob(f"{self.name}_*"):
+            match = ELAPSED_PATTERN.search(path.name)
+            if match:
+                profiles.append((int(match.group(1)) / 1000, path))
+        return sorted(profiles)
+
+    @contextmanager
+    def cycle(self, label: str = "cycle"):
+        """Profile the enclosed block as one cycle"""
+        # Nested cycles on the same thread are covered by the outer profile
+        if not self.enabled or getattr(self.local, 'active', False):
+            yield
+            return
+
+        profile = token = None
+        if self.mode == 'cprofile':
+            # Concurrent pool cycles skip profiling rather than fail on "Another profiling tool is already active"
+            if not _cprofile_lock.acquire(blocking=False):
+                yield
+                return
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError as e:  # a profiler outside this module (debugger, sys.setprofile) is active
+                _cprofile_lock.release()
+                logger.debug(f"Skipping cProfile of {label}: {e}")
+                yield
+                return
+        else:
+            token = self.sampler.start(threading.get_ident())
+        self.local.active = True
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if profile is not None:
+                profile.disable()
+                _cprofile_lock.release()
+                data = profile
+            else:
+                data = self.sampler.stop(token)
+            self.local.active = False
+            self.save(label, elapsed, data)
+
+    def wanted(self, elapsed: float) -> bool:
+        """Whether a cycle is slow enough to keep in slowest-N mode"""
+        return not self.slowest or len(self.kept) < self.slowest or elapsed > self.kept[0][0]
+
+    def save(self, label: str, elapsed: float, data):
+        with self.lock:
+            if not self.wanted(elapsed):
+                return
+
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        label = re.sub(r'[^\w.-]', '_', label)[:60]
+        path = self.profiles_dir / f"{self.name}_{stamp}_{label}_{int(elapsed * 1000)}ms{PROFILE_SUFFIXES[self.mode]}"
+        try:
+            if self.mode == 'cprofile':
+                data.dump_stats(str(path))
+            else:
+                with open(path, 'w', encoding='utf-8') as f:
+                    for stack, count in data.most_common():
+                        f.write(f"{stack} {count}\n")
+        except OSError as e:
+            logger.error(f"Error writing profile {path.name}: {e}")
+            return
+
+        with self.lock:
+            if self.slowest:
+                self.kept.append((elapsed, path))
+                self.kept.sort()
+                while len(self.kept) > self.slowest:
+                    _, evicted = self.kept.pop(0)
+                    evicted.unlink(missing_ok=True)
+            self.enforce_retention()
+
+    def enforce_retention(self):
+        """Drop this component's oldest profiles beyond the retention cap"""
+        try:
+            profiles = sorted(self.profiles_dir.glob(f"{self.name}_*"), key=lambda p: p.stat().st_mtime)
+        except OSError:
+            return
+        for path in profiles[:-self.keep]:
+            path.unlink(missing_ok=True)
+            self.kept = [(e, p) for e, p in self.kept if p != path]
+
+
+def add_profile_arguments(parser):
+    """--profile/--profile-slowest/--profile-keep switches for a script's argparse parser"""
+    parser.add_argument('--profile', choices=PROFILE_MODES[1:], default=None,
+                        help='Profile each cycle into Logs/profiles (cprofile: .pstats, sample: collapsed stacks)')
+    parser.add_argument('--profile-slowest', type=int, default=None, metavar='N',
+                        help='Only keep profiles of the N slowest cycles')
+    parser.add_argument('--profile-keep', type=int, default=None, metavar='N',
+                        help=f'Maximum profile files to keep (default {DEFAULT_KEEP})')
+
+
+def apply_profile_arguments(args):
+    """Export the parsed switches so get_cycle_profiler() picks them up"""
+    if getattr(args, 'profile', None):
+        os.environ['PROFILE_MODE'] = args.profile
+    if getattr(args, 'profile_slowest', None) is not None:
+        os.environ['PROFILE_SLOWEST'] = str(args.profile_slowest)
+    if getattr(args, 'profile_keep', None) is not None:
+        os.environ['PROFILE_KEEP'] = str(args.profile_keep)
+
+
+# Global profiler instances per component, created on first use
+cycle_profilers: Dict[str, CycleProfiler] = {}
+_cycle_profilers_lock = threading.Lock()
+
+def get_cycle_profiler(name: str, logs_dir: str = "AI_Employee_Vault/Logs") -> CycleProfiler:
+    """Get the profiler for a component, configured from PROFILE_* environment variables"""
+    with _cycle_profilers_lock:
+        profiler = cycle_profilers.get(name)
+        if profiler is None:
+            profiler = cycle_profilers[name] = CycleProfiler(
+                name,
+                str(Path(logs_dir) / "profiles"),
+                mode=os.getenv('PROFILE_MODE', 'off').strip().lower() or 'off',
+                keep=int(os.getenv('PROFILE_KEEP', DEFAULT_KEEP)),
+                slowest=int(os.getenv('PROFILE_SLOWEST', 0)),
+                interval=float(os.getenv('PROFILE_SAMPLE_INTERVAL', DEFAULT_SAMPLE_INTERVAL))
+            )
+        return profiler
@@ -0,0 +1,323 @@
+"""
+Coalescing Dashboard Writer for Personal AI Employee
+
+Keeps folder counts and recent activity in memory, updated from task state
+transitions, and renders Dashboard.md at most once per debounce window.
+Writes are skipped when the rendered content is unchanged and are guarded by
+a cross-process lock so the orchestrator, watchers and scripts never clobber
+each other. Only the orchestrator sees every task move; other long-lived
+writers (track_moves=False) rescan the folders under the lock before each
+write, so they never overwrite its counts with stale ones.
+"""
+
+import os
+import re
+import time
+import atexit
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_INTERVAL = 5.0  # seconds between dashboard writes
+MAX_ACTIVITY_ROWS = 10
+
+# Vault folder -> label shown under "Current Status"
+STATUS_FOLDERS = {
+    'Needs_Action': 'Pending Actions',
+    'In_Progress': 'In Progress',
+    'Pending_Approval': 'Awaiting Approval',
+    'Done': 'Completed'
+}
+
+# Sections owned by the renderer; any other "## " section is carried over as-is
+MANAGED_SECTIONS = {'current status', 'status overview', 'recent activity'}
+
+ACTIVITY_HEADER = "| Time | Type | Description | Status |"
+ACTIVITY_SEPARATOR = "|------|------|-------------|--------|"
+EMPTY_ACTIVITY_ROW = "| - | - | No recent activity | - |"
+
+
+@contextmanager
+def dashboard_lock(lock_path: Path):
+    """Exclusive cross-process lock held while Dashboard.md is rewritten"""
+    with open(lock_path, 'a+') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def section_key(heading: str) -> str:
+    """Normalise a "## " heading, ignoring emoji and punctuation"""
+    return re.sub(r'[^a-z ]', '', heading[3:].lower()).strip()
+
+
+def split_dashboard(content: str) -> Tuple[Optional[str], List[str], List[Tuple[str, List[str]]]]:
+    """Split a dashboard into title, preamble and "## " sections, dropping frontmatter and footer"""
+    lines = content.splitlines()
+
+    if lines and lines[0].strip() == '---':
+        end = next((i for i in range(1, len(lines)) if lines[i].strip() == '---'), None)
+        if end is not None:
+            lines = lines[end + 1:]
+
+    separators = [i for i, line in enumerate(lines) if line.strip() == '---']
+    if separators:
+        tail = lines[separators[-1] + 1:]
+        if all(not line.strip() or line.strip().startswith('*') for line in tail):
+            lines = lines[:separators[-1]]
+
+    title = None
+    preamble = []
+    sections = []
+    for line in lines:
+        if line.startswith('# ') and title is None and not sections:
+            title = line
+        elif line.startswith('## '):
+            sections.append((line, []))
+        elif sections:
+            sections[-1][1].append(line)
+        else:
+            preamble.append(line)
+
+    return title, preamble, sections
+
+
+def parse_activity_rows(sections: List[Tuple[str, List[str]]]) -> List[str]:
+    """Existing Recent Activity rows, newest first"""
+    for heading, body in sections:
+        if section_key(heading) != 'recent activity':
+            continue
+        rows = [line.strip() for line in body if line.strip().startswith('|')]
+        return [
+            row for row in rows[1:]  # skip the header; separators are filtered below
+            if not set(row) <= set('|-: ') and 'No recent activity' not in row
+        ]
+    return []
+
+
+class DashboardWriter:
+    """Single renderer for Dashboard.md with debounced, skip-if-unchanged writes"""
+
+    def __init__(self, vault_path: str = "AI_Employee_Vault",
+                 dashboard_file: Optional[str] = None,
+                 min_interval: float = DEFAULT_MIN_INTERVAL, track_moves: bool = True):
+        self.vault_path = Path(vault_path)
+        self.dashboard_file = Path(dashboard_file) if dashboard_file else self.vault_path / "Dashboard.md"
+        self.lock_path = self.dashboard_file.parent / f".{self.dashboard_file.name}.lock"
+        self.min_interval = min_interval
+        self.track_moves = track_moves
+
+        self.lock = threading.RLock()
+        self.folders = {folder: set() for folder in STATUS_FOLDERS}
+        self.pending_rows = []
+        self.extra_sections = {}
+        self.last_change = datetime.now()
+        self.last_write = 0.0
+        self.dirty = True
+        self.timer = None
+
+        self.refresh_counts()
+        atexit.register(self.close)
+
+    def refresh_counts(self, mark: bool = True) -> bool:
+        """Resync folder contents with one directory scan each; True if anything changed"""
+        changed = False
+        for folder in STATUS_FOLDERS:
+            directory = self.vault_path / folder
+            try:
+                with os.scandir(directory) as entries:
+                    names = {e.name for e in entries if e.name.endswith('.md') and e.is_file()}
+            except FileNotFoundError:
+                names = set()
+
+            with self.lock:
+                if names != self.folders[folder]:
+                    self.folders[folder] = names
+                    changed = True
+
+        if changed and mark:
+            self.mark_changed()
+        return changed
+
+    def counts(self) -> Dict[str, int]:
+        """Current number of files per status folder"""
+        with self.lock:
+            return {folder: len(names) for folder, names in self.folders.items()}
+
+    def move(self, name: str, src: Optional[str] = None, dst: Optional[str] = None):
+        """Record a file moving between vault folders (None for outside the tracked set)"""
+        changed = False
+        with self.lock:
+            if src in self.folders and name in self.folders[src]:
+                self.folders[src].discard(name)
+                changed = True
+            if dst in self.folders and name not in self.folders[dst]:
+                self.folders[dst].add(name)
+                changed = True
+
+        if changed:
+            self.mark_changed()
+
+    def arrived(self, name: str, dst: Optional[str] = None):
+        """Record a file found in dst (None for outside the tracked set), coming from whichever
+        folder still tracks it but no longer holds it on disk"""
+        with self.lock:
+            sources = [folder for folder, names in self.folders.items() if name in names and folder != dst]
+        src = next((folder for folder in sources if not (self.vault_path / folder / name).exists()), None)
+        self.move(name, src, dst)
+
+    def record_activity(self, task_type: str, description: str, status: str = "✅ Done",
+                        when: Optional[datetime] = None):
+        """Queue a Recent Activity row for the next render"""
+        timestamp = (when or datetime.now()).strftime('%Y-%m-%d %H:%M')
+        row = f"| {timestamp} | {task_type} | {description[:50]} | {status} |"
+        with self.lock:
+            self.pending_rows.insert(0, row)
+            del self.pending_rows[MAX_ACTIVITY_ROWS:]
+        self.mark_changed()
+
+    def set_section(self, heading: str, body: str):
+        """Own an extra "## " section, replacing any existing one with the same heading"""
+        with self.lock:
+            self.extra_sections[section_key(heading)] = f"{heading}\n\n{body.strip()}"
+        self.mark_changed()
+
+    def mark_changed(self):
+        """Flag that the next render may differ from what is on disk"""
+        with self.lock:
+            self.dirty = True
+            self.last_change = datetime.now()
+
+    def request_render(self):
+        """Schedule a write, coalescing every change made inside the debounce window"""
+        with self.lock:
+            if self.timer is not None:
+                return
+            delay = max(0.0, self.last_write + self.min_interval - time.monotonic())
+            self.timer = threading.Timer(delay, self.flush)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def render(self, existing: str = "") -> str:
+        """Render the dashboard, keeping sections owned by other tools"""
+        title, preamble, sections = split_dashboard(existing)
+
+        with self.lock:
+            counts = {folder: len(names) for folder, names in self.folders.items()}
+            rows = list(self.pending_rows)
+            extra_sections = dict(self.extra_sections)
+            last_change = self.last_change
+
+        # Merge with rows already on disk (possibly written by another process)
+        existing_rows = parse_activity_rows(sections)
+        merged = [row for row in rows if row not in existing_rows] + existing_rows
+        merged = merged[:MAX_ACTIVITY_ROWS] or [EMPTY_ACTIVITY_ROW]
+
+        status_lines = [f"- **{label}**: {counts[folder]}" for folder, label in STATUS_FOLDERS.items()]
+        preamble_lines = [line for line in preamble if 'last updated' not in line.lower()]
+
+        parts = [
+            "---",
+            f"last_updated: {last_change.strftime('%Y-%m-%d')}",
+            "---",
+            "",
+            title or "# AI Employee Dashboard",
+            "\n".join(preamble_lines).strip(),
+            "## Current Status\n\n" + "\n".join(status_lines),
+            "## Recent Activity\n\n" + "\n".join([ACTIVITY_HEADER, ACTIVITY_SEPARATOR] + merged),
+        ]
+
+        for heading, body in sections:
+            key = section_key(heading)
+            if key in MANAGED_SECTIONS:
+                continue
+            parts.append(extra_sections.pop(key, None) or "\n".join([heading] + body).strip())
+        parts.extend(extra_sections.values())
+
+        parts.append(f"---\n*Last updated: {last_change.strftime('%Y-%m-%d %H:%M:%S')}*")
+
+        header = "\n".join(parts[:5])
+        body = "\n\n".join(part for part in parts[5:] if part)
+        return f"{header}\n\n{body}\n"
+
+    def flush(self) -> bool:
+        """Write the dashboard now if it changed; returns True when the file was rewritten"""
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if not self.dirty:
+                return False
+            self.dirty = False
+
+        try:
+            self.dashboard_file.parent.mkdir(parents=True, exist_ok=True)
+            with dashboard_lock(self.lock_path):
+                existing = ""
+                if self.dashboard_file.exists():
+                    existing = self.dashboard_file.read_text(encoding='utf-8')
+
+                if not self.track_moves:
+                    # Other processes moved tasks since our last scan; never write their counts back stale
+                    self.refresh_counts(mark=False)
+                with self.lock:
+                    rendered_rows = list(self.pending_rows)
+                content = self.render(existing)
+                with self.lock:
+                    # Rows recorded while rendering stay queued for the next write
+                    self.pending_rows = [row for row in self.pending_rows if row not in rendered_rows]
+                    self.last_write = time.monotonic()
+
+                if content == existing:
+                    return False
+
+                tmp_file = self.dashboard_file.with_name(f".{self.dashboard_file.name}.tmp")
+                tmp_file.write_text(content, encoding='utf-8')
+                os.replace(tmp_file, self.dashboard_file)
+
+            logger.info("Dashboard updated")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error updating dashboard: {e}")
+            with self.lock:
+                self.dirty = True
+            return False
+
+    def close(self):
+        """Write any pending change before the process exits"""
+        self.flush()
+
+
+# Global dashboard writer instance, created on first use
+dashboard_writer = None
+_dashboard_writer_lock = threading.Lock()
+
+def get_dashboard_writer(vault_path: str = "AI_Employee_Vault", track_moves: bool = True) -> DashboardWriter:
+    """Get the process-wide dashboard writer (track_moves=False outside the process that moves tasks)"""
+    global dashboard_writer
+    with _dashboard_writer_lock:
+        if dashboard_writer is None:
+            dashboard_writer = DashboardWriter(vault_path, track_moves=track_moves)
+        return dashboard_writer
@@ -0,0 +1,153 @@
+"""
+Drop Folder Manifest for Personal AI Employee
+
+Persistent record of the files a folder watcher has processed: name, size,
+mtime and SHA-256 of each. Watchers only see live events, so anything
+dropped while they were down (including every PM2 restart) used to be
+missed. On startup pending() lists the folder once with os.scandir and
+returns the files that are new or changed since they were processed; the
+watcher feeds them through its normal pipeline.
+
+Records are appended to a JSON-lines file (constant cost per processed
+file) and the file is compacted on load once it holds mostly stale lines.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Callable, Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+COMPACT_RATIO = 2  # rewrite once the log has this many lines per live entry
+
+
+def hash_file(path: Path) -> str:
+    """SHA-256 of a file, read in one streaming pass"""
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+class DropManifest:
+    """Processed files of one watched folder, keyed by file name"""
+
+    def __init__(self, manifest_file: str):
+        self.manifest_file = Path(manifest_file)
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.load()
+
+    def load(self):
+        if not self.manifest_file.exists():
+            return
+        lines = 0
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line after a crash
+                    if record.get('deleted'):
+                        self.entries.pop(record['name'], None)
+                    else:
+                        self.entries[record['name']] = record
+        except OSError as e:
+            logger.error(f"Error loading manifest {self.manifest_file}: {e}")
+            return
+
+        if lines > COMPACT_RATIO * max(len(self.entries), 1):
+            self.compact()
+
+    def compact(self):
+        """Rewrite the log with one line per live entry"""
+        tmp_file = self.manifest_file.with_suffix(self.manifest_file.suffix + '.tmp')
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                for record in self.entries.values():
+                    f.write(json.dumps(record) + "\n")
+            os.replace(tmp_file, self.manifest_file)
+        except OSError as e:
+            logger.error(f"Error compacting manifest {self.manifest_file}: {e}")
+
+    def append(self, record: Dict[str, Any]):
+        try:
+            with open(self.manifest_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError as e:
+            logger.error(f"Error writing manifest {self.manifest_file}: {e}")
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            return self.entries.get(name)
+
+    def record(self, name: str, size: int, mtime_ns: int, sha256: Optional[str] = None):
+        """Mark a file as processed at this size, mtime and content hash"""
+        record = {'name': name, 'size': size, 'mtime_ns': mtime_ns, 'sha256': sha256,
+                  'processed_at': datetime.now().isoformat()}
+        with self.lock:
+            self.entries[name] = record
+            self.append(record)
+
+    def forget(self, name: str):
+        with self.lock:
+            if self.entries.pop(name, None) is not None:
+                self.append({'name': name, 'deleted': True})
+
+    def unchanged(self, path: Path, size: int, mtime_ns: int) -> bool:
+        """Whether this version of the file was already processed.
+
+        A file whose mtime moved but whose size and hash match (touched,
+        or copied back in) counts as unchanged; its new mtime is recorded.
+        """
+        entry = self.get(path.name)
+        if entry is None or entry['size'] != size:
+            return False
+        if entry['mtime_ns'] == mtime_ns:
+            return True
+        if not entry.get('sha256'):
+            return False
+        try:
+            if hash_file(path) != entry['sha256']:
+                return False
+        except OSError:
+            return False
+        self.record(path.name, size, mtime_ns, entry['sha256'])
+        return True
+
+    def pending(self, folder: Path, ignore: Callable[[Path], bool] = lambda path: False) -> List[Path]:
+        """Files in folder that are new or whose size/mtime differ from the manifest.
+
+        Entries for files no longer in the folder are dropped along the way.
+        """
+        found, present = [], set()
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    present.add(entry.name)
+                    try:
+                        if not entry.is_file():
+                            continue
+                        path = Path(entry.path)
+                        if ignore(path):
+                            continue
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    known = self.get(entry.name)
+                    if known is None or (known['size'], known['mtime_ns']) != (stat.st_size, stat.st_mtime_ns):
+                        found.append(path)
+        except OSError as e:
+            logger.error(f"Error scanning {folder}: {e}")
+            return found
+
+        with self.lock:
+            gone = [name for name in self.entries if name not in present]
+        for name in gone:
+            self.forget(name)
+        return found
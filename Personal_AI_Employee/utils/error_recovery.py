@@ -13,8 +13,6 @@ from datetime import datetime, timedelta
 from typing import Dict, Any, Callable, Optional, List
 from enum import Enum
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class RecoveryStrategy(Enum):
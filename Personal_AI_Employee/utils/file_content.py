@@ -0,0 +1,531 @@
+"""
+File Content Sniffing and Extraction for Personal AI Employee
+
+Dropped files are classified by what they contain, not by their extension:
+the first bytes are matched against known signatures (PDF, ZIP-based Office
+files, OLE2, images) and text is told apart from binary. PDF, DOCX, XLSX
+and CSV files then have their text extracted, up to a character budget, on
+a shared process pool, so parsing CPU never runs on a watcher thread. Only
+a bounded preview and a few key fields (invoice number, total, dates,
+sheets, columns...) come back; the watchers write them into the metadata
+frontmatter, and the orchestrator routes on content without opening the
+original file again.
+
+Extraction needs only the standard library. DOCX and XLSX are ZIP archives
+of XML, parsed incrementally. PDF text is read from the literal strings
+shown in (FlateDecode) content streams. When pypdf is installed it is used
+for PDFs instead, since it also handles font encodings and object streams.
+"""
+
+import os
+import re
+import csv
+import zlib
+import codecs
+import logging
+import zipfile
+import threading
+import multiprocessing
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, List, Optional
+
+from utils.keyword_matcher import get_keyword_matcher
+
+try:
+    import pypdf
+except ImportError:
+    pypdf = None
+
+logger = logging.getLogger(__name__)
+
+SNIFF_BYTES = 4096
+DEFAULT_BUDGET = 64 * 1024  # characters of text extracted per file
+PREVIEW_CHARS = 500  # preview in the metadata body
+SUMMARY_CHARS = 200  # single-line preview in the frontmatter
+DEFAULT_TIMEOUT = 30  # seconds to wait for one extraction
+DEFAULT_WORKERS = 2
+TASKS_PER_WORKER = 100  # workers are replaced after this many files, so parser memory cannot build up
+MAX_MEMBER_BYTES = 64 * 1024 * 1024  # declared size of an archive member we will parse (zip bombs)
+MAX_PDF_BYTES = 64 * 1024 * 1024  # bytes of a PDF scanned by the fallback parser
+MAX_STREAM_BYTES = 4 * 1024 * 1024  # inflated bytes per PDF content stream
+
+SIGNATURES = (
+    (b'PK\x03\x04', 'zip'),
+    (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 'ole'),
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpeg'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+    (b'II*\x00', 'tiff'),
+    (b'MM\x00*', 'tiff'),
+)
+
+# Content type -> detected_type used by the orchestrator
+DETECTED_TYPES = {
+    'pdf': 'document',
+    'docx': 'document',
+    'doc': 'document',
+    'text': 'document',
+    'csv': 'data',
+    'xlsx': 'data',
+    'xls': 'data',
+    'png': 'image',
+    'jpeg': 'image',
+    'gif': 'image',
+    'tiff': 'image',
+    'webp': 'image',
+}
+
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+SHEET_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+
+# Key fields found in extracted text
+INVOICE_NUMBER = re.compile(r'\binvoice\s*(?:no\.?|number|num|#|id)?\s*[:#]?\s*'
+                            r'((?=[A-Z0-9/-]*\d)[A-Z0-9][A-Z0-9/-]{1,30})', re.IGNORECASE)
+TOTAL = re.compile(r'\b(?:grand\s+total|total\s+due|amount\s+due|balance\s+due|total)\b[^\d\n]{0,20}?'
+                   r'(\d{1,3}(?:,\d{3})+(?:\.\d{1,2})?|\d+(?:\.\d{1,2})?)', re.IGNORECASE)
+CURRENCY = re.compile(r'[$€£₹]|\b(?:USD|EUR|GBP|INR|PKR|Rs)\b')
+DATE = re.compile(r'\b(?:\d{4}-\d\d-\d\d|\d{1,2}[/.]\d{1,2}[/.]\d{2,4}|'
+                  r'\d{1,2} (?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]* \d{4}|'
+                  r'(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]* \d{1,2},? \d{4})\b')
+EMAIL = re.compile(r'\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+\b')
+MAX_LIST_ITEMS = 3
+
+# PDF content stream tokens: literal strings (plus a following TJ kerning number), hex strings, line breaks
+PDF_STREAM = re.compile(rb'stream\r?\n')
+PDF_TEXT = re.compile(rb'\(((?:[^()\\]|\\.)*)\)\s*(-?\d+(?:\.\d+)?)?|<([0-9A-Fa-f\s]+)>|\b(T\*|(?:Td|TD|ET)\b)', re.DOTALL)
+PDF_ESCAPE = re.compile(rb'\\([nrtbf()\\]|[0-7]{1,3}|\r?\n)')
+PDF_ESCAPES = {b'n': b'\n', b'r': b'\r', b't': b'\t', b'b': b'\b', b'f': b'\f',
+               b'(': b'(', b')': b')', b'\\': b'\\'}
+PDF_PAGE = re.compile(rb'/Type\s*/Page(?![A-Za-z])')
+TJ_SPACE = -200  # TJ adjustment (thousandths of an em) wide enough to be a word gap
+
+
+def sniff(path: Path) -> str:
+    """Content type of a file from its leading bytes: pdf, docx, xlsx, png, csv, text, ... or binary"""
+    path = Path(path)
+    with open(path, 'rb') as f:
+        head = f.read(SNIFF_BYTES)
+
+    if b'%PDF-' in head[:1024]:  # the header may follow a little junk
+        return 'pdf'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    for signature, kind in SIGNATURES:
+        if head.startswith(signature):
+            if kind == 'zip':
+                return sniff_zip(path)
+            if kind == 'ole':
+                # Legacy Word and Excel share the OLE2 container; the extension tells them apart
+                return {'.doc': 'doc', '.xls': 'xls'}.get(path.suffix.lower(), 'ole')
+            return kind
+
+    if not head or b'\x00' in head:
+        return 'binary' if head else 'text'
+    try:
+        text = codecs.getincrementaldecoder('utf-8')().decode(head)  # a cut multi-byte tail is not an error
+    except UnicodeDecodeError:
+        try:
+            text = head.decode('cp1252')
+        except UnicodeDecodeError:
+            return 'binary'
+    if path.suffix.lower() in ('.csv', '.tsv') or looks_like_csv(text):
+        return 'csv'
+    return 'text'
+
+
+def sniff_zip(path: Path) -> str:
+    """Office Open XML flavour of a ZIP archive (one read of its central directory)"""
+    try:
+        with zipfile.ZipFile(path) as archive:
+            names = set(archive.namelist())
+    except (zipfile.BadZipFile, OSError):
+        return 'zip'
+    if 'word/document.xml' in names:
+        return 'docx'
+    if 'xl/workbook.xml' in names:
+        return 'xlsx'
+    if 'ppt/presentation.xml' in names:
+        return 'pptx'
+    return 'zip'
+
+
+def looks_like_csv(text: str) -> bool:
+    """Several lines with the same, non-zero number of one delimiter"""
+    lines = [line for line in text.splitlines()[:6] if line.strip()]
+    if len(lines) < 2:
+        return False
+    if len(lines) == 6:
+        lines = lines[:5]  # the last line read may be cut short
+    for delimiter in (',', ';', '\t'):
+        counts = {line.count(delimiter) for line in lines}
+        if len(counts) == 1 and counts.pop() > 0:
+            return True
+    return False
+
+
+def read_text(path: Path, budget: int) -> str:
+    """Up to budget characters of a text file (UTF-8, else cp1252)"""
+    with open(path, 'rb') as f:
+        data = f.read(budget * 4)
+    try:
+        text = codecs.getincrementaldecoder('utf-8')().decode(data)
+    except UnicodeDecodeError:
+        text = data.decode('cp1252', errors='replace')
+    return text[:budget]
+
+
+def extract_csv(path: Path, budget: int) -> Dict[str, Any]:
+    text = read_text(path, budget)
+    fields = {}
+    rows = list(csv.reader(text.splitlines()[:2]))
+    if rows:
+        fields['columns'] = ', '.join(cell.strip() for cell in rows[0] if cell.strip())
+
+    # Rows are counted over the whole file, a chunk at a time
+    lines, last = 0, b'\n'
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            lines += chunk.count(b'\n')
+            last = chunk[-1:]
+    fields['row_count'] = str(max(0, lines + (last != b'\n') - 1))  # header excluded
+    return {'text': text, 'fields': fields}
+
+
+def extract_docx(path: Path, budget: int) -> Dict[str, Any]:
+    """Paragraph text of word/document.xml, parsed incrementally until the budget is reached"""
+    pieces, length = [], 0
+    with zipfile.ZipFile(path) as archive:
+        check_member(archive, 'word/document.xml')
+        with archive.open('word/document.xml') as xml:
+            for _, element in ET.iterparse(xml):
+                tag = element.tag
+                if tag == WORD_NS + 't' and element.text:
+                    pieces.append(element.text)
+                    length += len(element.text)
+                elif tag == WORD_NS + 'tab':
+                    pieces.append('\t')
+                elif tag == WORD_NS + 'p':
+                    pieces.append('\n')
+                    element.clear()
+                    if length >= budget:
+                        break
+    return {'text': ''.join(pieces)[:budget], 'fields': {}}
+
+
+def extract_xlsx(path: Path, budget: int) -> Dict[str, Any]:
+    """Sheet names and cell values, row by row, until the budget is reached"""
+    fields = {}
+    with zipfile.ZipFile(path) as archive:
+        names = set(archive.namelist())
+
+        check_member(archive, 'xl/workbook.xml')
+        with archive.open('xl/workbook.xml') as xml:
+            sheets = [element.get('name', '') for _, element in ET.iterparse(xml) if element.tag == SHEET_NS + 'sheet']
+        if sheets:
+            fields['sheets'] = ', '.join(sheets)
+
+        shared = []
+        if 'xl/sharedStrings.xml' in names:
+            check_member(archive, 'xl/sharedStrings.xml')
+            with archive.open('xl/sharedStrings.xml') as xml:
+                for _, element in ET.iterparse(xml):
+                    if element.tag == SHEET_NS + 'si':
+                        shared.append(''.join(t.text or '' for t in element.iter(SHEET_NS + 't')))
+                        element.clear()
+
+        worksheets = sorted((name for name in names if re.fullmatch(r'xl/worksheets/sheet\d+\.xml', name)),
+                            key=lambda name: int(re.search(r'\d+', name.rsplit('/', 1)[1]).group()))
+        lines, length = [], 0
+        for number, name in enumerate(worksheets):
+            if length >= budget:
+                break
+            if len(worksheets) > 1:
+                lines.append(f"[{sheets[number] if number < len(sheets) else name}]")
+            check_member(archive, name)
+            with archive.open(name) as xml:
+                for _, element in ET.iterparse(xml):
+                    if element.tag != SHEET_NS + 'row':
+                        continue
+                    values = [cell_value(cell, shared) for cell in element.iter(SHEET_NS + 'c')]
+                    element.clear()
+                    line = ', '.join(value for value in values if value)
+                    if not line:
+                        continue
+                    if 'columns' not in fields:
+                        fields['columns'] = line
+                    lines.append(line)
+                    length += len(line) + 1
+                    if length >= budget:
+                        break
+    return {'text': '\n'.join(lines)[:budget], 'fields': fields}
+
+
+def cell_value(cell, shared: List[str]) -> str:
+    kind = cell.get('t')
+    if kind == 'inlineStr':
+        return ''.join(t.text or '' for t in cell.iter(SHEET_NS + 't')).strip()
+    value = cell.findtext(SHEET_NS + 'v') or ''
+    if kind == 's':
+        try:
+            return shared[int(value)].strip()
+        except (ValueError, IndexError):
+            return ''
+    return value.strip()
+
+
+def check_member(archive: zipfile.ZipFile, name: str):
+    """Refuse archive members whose declared size is beyond MAX_MEMBER_BYTES (zipfile never reads past it)"""
+    if archive.getinfo(name).file_size > MAX_MEMBER_BYTES:
+        raise ValueError(f"{name} is larger than {MAX_MEMBER_BYTES} bytes")
+
+
+def extract_pdf(path: Path, budget: int) -> Dict[str, Any]:
+    if pypdf is not None:
+        reader = pypdf.PdfReader(str(path))
+        pages, length = [], 0
+        for page in reader.pages:
+            text = page.extract_text() or ''
+            pages.append(text)
+            length += len(text)
+            if length >= budget:
+                break
+        return {'text': '\n'.join(pages)[:budget], 'fields': {'page_count': str(len(reader.pages))}}
+
+    with open(path, 'rb') as f:
+        data = f.read(MAX_PDF_BYTES)
+
+    fields = {}
+    pages = len(PDF_PAGE.findall(data))
+    if pages:
+        fields['page_count'] = str(pages)
+
+    pieces, length = [], 0
+    for match in PDF_STREAM.finditer(data):
+        end = data.find(b'endstream', match.end())
+        if end < 0:
+            break
+        # The stream dictionary sits between the object header and the 'stream' keyword
+        header_start = data.rfind(b'obj', max(0, match.start() - 2048), match.start())
+        header = data[header_start if header_start >= 0 else match.start():match.start()]
+        if b'/Image' in header or b'/Length1' in header or b'/FontFile' in header:
+            continue
+        raw = data[match.end():end]
+        if b'/FlateDecode' in header:
+            try:
+                raw = zlib.decompressobj().decompress(raw, MAX_STREAM_BYTES)
+            except zlib.error:
+                continue
+        elif b'/Filter' in header:
+            continue  # image or other encodings we cannot read
+        if b'BT' not in raw:
+            continue
+        text = pdf_stream_text(raw, budget - length)
+        if text:
+            pieces.append(text)
+            length += len(text)
+            if length >= budget:
+                break
+    return {'text': '\n'.join(pieces)[:budget], 'fields': fields}
+
+
+def pdf_stream_text(content: bytes, budget: int) -> str:
+    """Text shown by one content stream (string operands, breaks at line moves), up to about budget characters"""
+    out, length = [], 0
+    for match in PDF_TEXT.finditer(content):
+        if length >= budget:
+            break
+        literal, kerning, hex_string, operator = match.groups()
+        if operator is not None:
+            if out and out[-1] != '\n':
+                out.append('\n')
+            continue
+        if hex_string is not None:
+            digits = re.sub(rb'\s', b'', hex_string)
+            raw = bytes.fromhex((digits + b'0' * (len(digits) % 2)).decode('ascii'))
+        else:
+            raw = PDF_ESCAPE.sub(pdf_unescape, literal)
+        text = ''.join(ch for ch in raw.decode('latin-1') if ch.isprintable() or ch == ' ')
+        out.append(text)
+        length += len(text)
+        if kerning is not None and float(kerning) <= TJ_SPACE:
+            out.append(' ')
+    return '\n'.join(filter(None, (' '.join(line.split()) for line in ''.join(out).split('\n'))))
+
+
+def pdf_unescape(match) -> bytes:
+    code = match.group(1)
+    if code in PDF_ESCAPES:
+        return PDF_ESCAPES[code]
+    if code[:1].isdigit():
+        return bytes([int(code, 8) & 0xFF])
+    return b''  # escaped line break: the string continues on the next line
+
+
+EXTRACTORS = {
+    'pdf': extract_pdf,
+    'docx': extract_docx,
+    'xlsx': extract_xlsx,
+    'csv': extract_csv,
+    'text': lambda path, budget: {'text': read_text(path, budget), 'fields': {}},
+}
+
+
+def key_fields(text: str) -> Dict[str, str]:
+    """Invoice number, total, dates and email addresses found in the text"""
+    fields = {}
+    match = INVOICE_NUMBER.search(text)
+    if match:
+        fields['invoice_number'] = match.group(1)
+    totals = list(TOTAL.finditer(text))
+    if totals:
+        # The last total on a document is the one that is due (after subtotals and tax)
+        fields['total'] = totals[-1].group(1)
+        currency = CURRENCY.search(totals[-1].group(0)) or CURRENCY.search(text)
+        if currency:
+            fields['currency'] = currency.group(0)
+    for name, pattern in (('dates', DATE), ('emails', EMAIL)):
+        found = []
+        for match in pattern.finditer(text):
+            if match.group(0) not in found:
+                found.append(match.group(0))
+                if len(found) == MAX_LIST_ITEMS:
+                    break
+        if found:
+            fields[name] = ', '.join(found)
+    return fields
+
+
+def classify(kind: str, name: str, text: str, fields: Dict[str, str]) -> str:
+    """detected_type for the orchestrator: documents that read like an invoice become 'invoice'"""
+    detected = DETECTED_TYPES.get(kind, 'unknown')
+    if detected in ('document', 'image'):
+        mentions_invoice = 'invoice' in get_keyword_matcher().categories(name.replace('_', ' '), text)
+        # Images and unreadable PDFs only have their name to go on
+        if mentions_invoice and (not text.strip() or 'invoice_number' in fields or 'total' in fields):
+            return 'invoice'
+    return detected
+
+
+def describe(path: Path, kind: str, text: str = '', fields: Optional[Dict[str, str]] = None,
+             error: Optional[str] = None) -> Dict[str, Any]:
+    """Analysis result: content type, detected_type, bounded preview and key fields"""
+    fields = fields or {}
+    return {
+        'content_type': kind,
+        'detected_type': classify(kind, path.name, text, fields),
+        'preview': text.strip()[:PREVIEW_CHARS],
+        'fields': fields,
+        'error': error,
+    }
+
+
+def extract(path: str, kind: str, budget: int = DEFAULT_BUDGET) -> Dict[str, Any]:
+    """Extract one file (runs in a pool worker); returns only the bounded preview and fields"""
+    path = Path(path)
+    try:
+        result = EXTRACTORS[kind](path, budget)
+    except Exception as e:  # malformed files are common drops; keep what the sniff told us
+        return describe(path, kind, error=f"{type(e).__name__}: {e}")
+    return describe(path, kind, result['text'], dict(result['fields'], **key_fields(result['text'])))
+
+
+def flat(value: str, limit: int = SUMMARY_CHARS) -> str:
+    """One frontmatter-safe line: whitespace collapsed, no '---' or leading YAML indicators"""
+    value = ' '.join(str(value).split())[:limit]
+    return re.sub(r'-{3,}', '--', value).lstrip('\'"|>&*!%@`')
+
+
+def format_frontmatter(analysis: Dict[str, Any]) -> str:
+    """Frontmatter lines for an analysis: content type, key fields and a one-line preview"""
+    lines = [f"content_type: {analysis['content_type']}"]
+    lines += [f"{key}: {flat(value)}" for key, value in analysis['fields'].items() if flat(value)]
+    preview = flat(analysis['preview'])
+    if preview:
+        lines.append(f"preview: {preview}")
+    return '\n'.join(lines)
+
+
+class ContentExtractor:
+    """Sniffs dropped files and extracts their text on a process pool"""
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS, timeout: float = DEFAULT_TIMEOUT,
+                 budget: int = DEFAULT_BUDGET):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.budget = budget
+        self.lock = threading.Lock()
+        self.executor = None
+
+    def pool(self) -> ProcessPoolExecutor:
+        with self.lock:
+            if self.executor is None:
+                # Forking a process that runs watcher threads can copy held locks; start workers clean
+                method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                self.executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                    mp_context=multiprocessing.get_context(method),
+                                                    max_tasks_per_child=TASKS_PER_WORKER)
+            return self.executor
+
+    def reset(self, executor: ProcessPoolExecutor, terminate: bool = False):
+        """Drop a broken or hung pool; the next call starts a new one.
+
+        With terminate, also kill its workers: a running extraction cannot be
+        cancelled, and a hung one would otherwise hold its worker forever.
+        """
+        with self.lock:
+            if self.executor is executor:
+                self.executor = None
+        workers = list((executor._processes or {}).values()) if terminate else []
+        executor.shutdown(wait=False, cancel_futures=True)
+        for worker in workers:
+            if worker.is_alive():
+                worker.kill()
+
+    def analyze(self, path: Path) -> Dict[str, Any]:
+        """Content type, detected_type, preview and key fields of a file; blocks the caller only"""
+        path = Path(path)
+        kind = sniff(path)
+        if kind not in EXTRACTORS:
+            return describe(path, kind)  # nothing to parse: no need for a worker
+
+        executor = self.pool()
+        future = executor.submit(extract, str(path), kind, self.budget)
+        try:
+            analysis = future.result(timeout=self.timeout)
+        except FutureTimeout:
+            self.reset(executor, terminate=True)
+            analysis = describe(path, kind, error=f"timed out after {self.timeout:g}s")
+        except BrokenProcessPool as e:
+            self.reset(executor)
+            analysis = describe(path, kind, error=f"extraction worker died ({e})")
+
+        if analysis['error']:
+            logger.warning(f"Could not extract text from {path.name}: {analysis['error']}")
+        return analysis
+
+    def close(self):
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+# Global extractor instance, its pool started on first use
+content_extractor = None
+_content_extractor_lock = threading.Lock()
+
+def get_content_extractor() -> ContentExtractor:
+    """Get the process-wide content extractor, configured from EXTRACT_* environment variables"""
+    global content_extractor
+    with _content_extractor_lock:
+        if content_extractor is None:
+            content_extractor = ContentExtractor(
+                max_workers=int(os.getenv('EXTRACT_WORKERS', DEFAULT_WORKERS)),
+                timeout=float(os.getenv('EXTRACT_TIMEOUT', DEFAULT_TIMEOUT)),
+                budget=int(os.getenv('EXTRACT_BUDGET', DEFAULT_BUDGET))
+            )
+        return content_extractor
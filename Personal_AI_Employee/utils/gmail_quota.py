@@ -0,0 +1,325 @@
+"""
+Gmail Quota Scheduler for Personal AI Employee
+
+Every Gmail API call made by the watcher and the send paths goes through one
+token bucket of quota units (messages.send = 100, messages.get = 5, ...), so
+bursts are paced below the per-user limit instead of being answered with
+429s. When Gmail does rate-limit us, its Retry-After is honoured by pausing
+the whole bucket, not just the call that failed, so other callers stop
+spending quota on requests that would be rejected too.
+
+The watcher and send_email_direct.py are separate processes, so the bucket
+level and any pause live in a row of a shared SQLite file (by default the
+seen-ID database, GMAIL_QUOTA_DB); together they stay under the per-user
+limit. Set GMAIL_QUOTA_DB empty to keep a private in-memory bucket.
+
+Waiters are served by priority: sends first, then reads of high-priority
+messages, then normal sync calls, then background fetches. Within a process
+that is a heap of waiters; across processes a caller that has to wait leaves
+a short claim with its priority in the shared row, and lower-priority callers
+in any process hold off until it is served or the claim lapses. Background
+work also leaves BACKGROUND_RESERVE of the bucket untouched so a send arriving
+mid-burst does not have to wait for the bucket to refill.
+"""
+
+import os
+import re
+import time
+import heapq
+import random
+import sqlite3
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from googleapiclient.errors import HttpError
+
+logger = logging.getLogger(__name__)
+
+# Quota units per method, from the Gmail API usage limits table
+QUOTA_UNITS = {
+    'getProfile': 1,
+    'history.list': 2,
+    'messages.list': 5,
+    'messages.get': 5,
+    'messages.modify': 5,
+    'messages.attachments.get': 5,
+    'messages.batchModify': 50,
+    'messages.send': 100,
+    'drafts.send': 100,
+}
+DEFAULT_UNITS = 5
+
+PRIORITY_SEND = 0
+PRIORITY_HIGH = 1
+PRIORITY_NORMAL = 2
+PRIORITY_BACKGROUND = 3
+
+# Gmail allows 250 units/s per user; stay under it to leave room for other processes
+DEFAULT_RATE = 200.0  # units per second
+DEFAULT_BURST = 200.0
+BACKGROUND_RESERVE = 0.2  # share of the bucket background calls may not use
+DEFAULT_MAX_RETRIES = 5
+MAX_BACKOFF = 64  # seconds
+
+RATE_LIMIT_REASONS = ('rateLimitExceeded', 'userRateLimitExceeded')
+SERVER_ERROR_STATUSES = (500, 502, 503, 504)
+# A 5xx on these may still have delivered the message, so only definite rate-limit rejections are retried
+NON_IDEMPOTENT_METHODS = ('messages.send', 'drafts.send')
+RETRY_AFTER_PATTERN = re.compile(r'Retry after (\d{4}-\d\d-\d\dT[\d:.]+Z)')
+
+# Shared with utils/seen_store; anchored at the project root so every caller opens the same file
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DB_FILE = str(PROJECT_ROOT / ".seen_ids.db")
+BUCKET_NAME = 'gmail'
+CLAIM_GRACE = 1.0  # seconds a waiting caller's priority claim outlives its expected wait
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS quota_bucket (
+    name TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL,
+    paused_until REAL NOT NULL DEFAULT 0,
+    claim_priority INTEGER NOT NULL DEFAULT 0,
+    claim_until REAL NOT NULL DEFAULT 0
+);
+"""
+
+
+class SharedBucket:
+    """Bucket level and pause kept in SQLite, so every process on the account draws from one budget"""
+
+    def __init__(self, db_file: str, rate: float, burst: float, name: str = BUCKET_NAME):
+        self.rate = rate
+        self.burst = burst
+        self.name = name
+        self.db = sqlite3.connect(db_file, timeout=10, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        self.db.execute("INSERT OR IGNORE INTO quota_bucket (name, tokens, updated) VALUES (?, ?, ?)",
+                        (name, burst, time.time()))
+
+    def take(self, units: float, floor: float, priority: int) -> float:
+        """Spend units if the bucket holds units + floor, is not paused and no more urgent
+        caller is waiting; else seconds to wait (leaving a claim if this caller is the most urgent)"""
+        now = time.time()  # wall clock: monotonic clocks are not comparable across processes
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            tokens, updated, paused_until, claim_priority, claim_until = self.db.execute(
+                "SELECT tokens, updated, paused_until, claim_priority, claim_until FROM quota_bucket WHERE name = ?",
+                (self.name,)).fetchone()
+            tokens = min(self.burst, tokens + max(0.0, now - updated) * self.rate)
+            claimed = claim_until > now
+            need = min(units + floor, self.burst)
+            if now >= paused_until and tokens >= need and not (claimed and claim_priority < priority):
+                tokens -= units
+                wait = 0.0
+                if claimed and claim_priority == priority:
+                    claim_until = 0.0  # served; let lower priorities through again
+            else:
+                wait = max(paused_until - now, (need - tokens) / self.rate, 0.001)
+                if not claimed or priority <= claim_priority:
+                    claim_priority, claim_until = priority, now + wait + CLAIM_GRACE
+                else:
+                    wait = min(wait, claim_until - now)  # look again once the claim is served or lapses
+            self.db.execute("UPDATE quota_bucket SET tokens = ?, updated = ?, claim_priority = ?, claim_until = ? "
+                            "WHERE name = ?", (tokens, now, claim_priority, claim_until, self.name))
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        return wait
+
+    def pause(self, seconds: float):
+        self.db.execute("UPDATE quota_bucket SET paused_until = MAX(paused_until, ?) WHERE name = ?",
+                        (time.time() + seconds, self.name))
+
+
+
+class GmailQuota:
+    """Token bucket of Gmail quota units with priority-ordered waiters"""
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: float = DEFAULT_BURST,
+                 background_reserve: float = BACKGROUND_RESERVE, max_retries: int = DEFAULT_MAX_RETRIES,
+                 db_file: Optional[str] = None):
+        self.rate = rate
+        self.burst = burst
+        self.reserve = burst * background_reserve
+        self.max_retries = max_retries
+
+        self.cond = threading.Condition()
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.waiting = []  # heap of (priority, sequence)
+        self.sequence = 0
+
+        self.shared = None
+        if db_file:
+            try:
+                self.shared = SharedBucket(db_file, rate, burst)
+            except sqlite3.Error as e:
+                logger.warning(f"Gmail quota: cannot share bucket via {db_file} ({e}), pacing this process only")
+
+    def refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, units: float, priority: int = PRIORITY_NORMAL) -> float:
+        """Block until units are available and every higher-priority waiter is served; returns seconds waited"""
+        start = time.monotonic()
+        with self.cond:
+            self.sequence += 1
+            ticket = (priority, self.sequence)
+            heapq.heappush(self.waiting, ticket)
+            self.cond.notify_all()
+            try:
+                while True:
+                    now = time.monotonic()
+                    self.refill(now)
+                    timeout = None  # not first in line: wait until the queue moves
+                    if self.waiting[0] == ticket:
+                        floor = self.reserve if priority >= PRIORITY_BACKGROUND else 0
+                        if self.shared is not None:
+                            timeout = self.take_shared(units, floor, priority)
+                            if timeout == 0:
+                                return time.monotonic() - start
+                            timeout = max(timeout, self.paused_until - now)
+                            self.cond.wait(timeout)
+                            continue
+                        # Calls larger than the bucket (big batches) run on a full bucket and leave it in debt
+                        need = min(units + floor, self.burst)
+                        if now >= self.paused_until and self.tokens >= need:
+                            self.tokens -= units
+                            return time.monotonic() - start
+                        timeout = max(self.paused_until - now, (need - self.tokens) / self.rate)
+                    self.cond.wait(timeout)
+            finally:
+                self.waiting.remove(ticket)
+                heapq.heapify(self.waiting)
+                self.cond.notify_all()
+
+    def take_shared(self, units: float, floor: float, priority: int) -> float:
+        """Draw from the shared bucket; seconds to wait, or 0 once the units are spent"""
+        try:
+            return self.shared.take(units, floor, priority)
+        except sqlite3.Error as e:
+            # A locked or broken database must not stop sends; pace this process on its own from here
+            logger.warning(f"Gmail quota: shared bucket unavailable ({e}), pacing this process only")
+            self.shared = None
+            return 0.0 if self.paused_until <= time.monotonic() else self.paused_until - time.monotonic()
+
+    def pause(self, seconds: float, reason: str = ""):
+        """Hold every caller (in every process sharing the bucket) for seconds, keeping the longer pause"""
+        with self.cond:
+            until = time.monotonic() + seconds
+            if until > self.paused_until:
+                self.paused_until = until
+                logger.warning(f"Gmail quota: pausing all calls for {seconds:.1f}s" + (f" ({reason})" if reason else ""))
+            if self.shared is not None:
+                try:
+                    self.shared.pause(seconds)
+                except sqlite3.Error as e:
+                    logger.warning(f"Gmail quota: could not share pause ({e})")
+            self.cond.notify_all()
+
+    def is_rate_limited(self, error: Exception) -> bool:
+        """Whether Gmail rejected the call for quota (429, or 403 rateLimitExceeded/userRateLimitExceeded)"""
+        if not isinstance(error, HttpError) or getattr(error, 'resp', None) is None:
+            return False
+        status = error.resp.status
+        if status == 429:
+            return True
+        content = error.content.decode('utf-8', 'replace') if isinstance(error.content, bytes) else str(error.content)
+        return status == 403 and any(reason in content for reason in RATE_LIMIT_REASONS)
+
+    def retry_delay(self, error: Exception, attempt: int, retry_server_errors: bool = True) -> Optional[float]:
+        """Seconds to wait before retrying error, or None if retrying will not help"""
+        if not self.is_rate_limited(error):
+            if not (retry_server_errors and isinstance(error, HttpError) and getattr(error, 'resp', None) is not None
+                    and error.resp.status in SERVER_ERROR_STATUSES):
+                return None
+        content = error.content.decode('utf-8', 'replace') if isinstance(error.content, bytes) else str(error.content)
+
+        retry_after = error.resp.get('retry-after')
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                try:
+                    return max(0.0, (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds())
+                except (TypeError, ValueError):
+                    pass
+
+        # userRateLimitExceeded carries the time in the message: "Retry after 2024-01-01T00:00:00.000Z"
+        match = RETRY_AFTER_PATTERN.search(content)
+        if match:
+            retry_at = datetime.fromisoformat(match.group(1).replace('Z', '+00:00'))
+            return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+        return min(MAX_BACKOFF, 2 ** attempt) + random.random()
+
+    def note_error(self, error: Exception, method: str = ""):
+        """Pause the bucket for a rate-limit error seen outside execute() (e.g. one part of a batch)"""
+        if self.is_rate_limited(error):
+            self.pause(self.retry_delay(error, 0), f"{method} {error.resp.status}".strip())
+
+    def execute(self, request, method: str, priority: int = PRIORITY_NORMAL, units: Optional[float] = None,
+                retry_server_errors: Optional[bool] = None):
+        """Run a googleapiclient request within quota, retrying rate limits after Retry-After.
+
+        5xx responses are retried too, except for sends (retry_server_errors
+        defaults to False for NON_IDEMPOTENT_METHODS) where the message may
+        already have gone out. Only rate limits pause the whole bucket; a 5xx
+        only delays this call.
+        """
+        units = units if units is not None else QUOTA_UNITS.get(method, DEFAULT_UNITS)
+        if retry_server_errors is None:
+            retry_server_errors = method not in NON_IDEMPOTENT_METHODS
+        for attempt in range(self.max_retries + 1):
+            self.acquire(units, priority)
+            try:
+                return request.execute()
+            except HttpError as error:
+                delay = self.retry_delay(error, attempt, retry_server_errors)
+                if delay is None or attempt == self.max_retries:
+                    raise
+                reason = f"{method} {error.resp.status}, retry {attempt + 1}/{self.max_retries}"
+                if self.is_rate_limited(error):
+                    self.pause(delay, reason)
+                else:
+                    logger.warning(f"Gmail quota: {reason} in {delay:.1f}s")
+                    time.sleep(delay)
+
+    def execute_batch(self, batch, method: str, count: int, priority: int = PRIORITY_NORMAL):
+        """Run a batch of count calls to method; per-call errors reach the batch callback"""
+        self.acquire(QUOTA_UNITS.get(method, DEFAULT_UNITS) * count, priority)
+        batch.execute()
+
+
+# Global quota instance, shared by every Gmail caller in the process
+gmail_quota = None
+_gmail_quota_lock = threading.Lock()
+
+def shared_db_file() -> Optional[str]:
+    """SQLite file backing the shared bucket; relative paths are taken from the project root, not the cwd"""
+    db_file = os.getenv('GMAIL_QUOTA_DB', os.getenv('SEEN_DB_FILE', DEFAULT_DB_FILE))
+    return str(PROJECT_ROOT / db_file) if db_file else None
+
+
+def get_gmail_quota() -> GmailQuota:
+    """Get the process-wide Gmail quota scheduler, configured from GMAIL_QUOTA_* environment variables"""
+    global gmail_quota
+    with _gmail_quota_lock:
+        if gmail_quota is None:
+            gmail_quota = GmailQuota(
+                rate=float(os.getenv('GMAIL_QUOTA_RATE', DEFAULT_RATE)),
+                burst=float(os.getenv('GMAIL_QUOTA_BURST', DEFAULT_BURST)),
+                background_reserve=float(os.getenv('GMAIL_QUOTA_BACKGROUND_RESERVE', BACKGROUND_RESERVE)),
+                max_retries=int(os.getenv('GMAIL_QUOTA_MAX_RETRIES', DEFAULT_MAX_RETRIES)),
+                db_file=shared_db_file()
+            )
+        return gmail_quota
@@ -0,0 +1,146 @@
+"""
+Keyword Matcher for Personal AI Employee
+
+One declarative keyword table and one compiled matcher shared by every
+classifier (orchestrator intents, Gmail/WhatsApp watchers, email queue
+priorities). All keywords are folded into a single trie-shaped regex, so a
+message is classified in one linear scan however many keywords there are.
+"""
+
+import re
+import logging
+import threading
+from typing import Dict, Iterable, List, Set
+
+logger = logging.getLogger(__name__)
+
+# category -> keywords (lowercase)
+KEYWORD_TABLE = {
+    # Orchestrator intents and priority
+    'invoice': ['invoice', 'bill', 'payment', 'charge'],
+    'reply': ['reply', 'respond', 'answer', 'question'],
+    'social': ['post', 'share', 'linkedin', 'twitter', 'facebook'],
+    'urgent': ['urgent', 'asap', 'immediately', 'critical'],
+    'request': ['help', 'quote'],
+
+    # Gmail work/employment filter
+    'work': [
+        'job', 'work', 'employment', 'opportunity', 'hire', 'contract',
+        'freelance', 'position', 'role', 'application', 'candidate',
+        'recruit', 'hiring', 'vacancy', 'opening', 'interview',
+        'company', 'linden', 'project', 'engagement',
+        'consultant', 'consulting', 'freelancer', 'contractor', 'offer',
+        'salary', 'compensation', 'pay', 'wage', 'remuneration'
+    ],
+
+    # Work email priority (HIGH / MEDIUM / LOW)
+    'job_offer': ['offer', 'interview', 'selected', 'congratulations', 'hiring manager', 'next steps', 'final round'],
+    'job_lead': ['freelance', 'contract', 'recruiter', 'agency', 'talent', 'hiring'],
+    'job_digest': ['newsletter', 'update', 'digest', 'opportunities', 'jobs this week']
+}
+
+# Categories that make a WhatsApp message worth an action item
+WHATSAPP_ALERT_CATEGORIES = ('urgent', 'invoice', 'request')
+
+
+def build_trie_pattern(keywords: Iterable[str]) -> str:
+    """Prefix-factored alternation: each position costs O(keyword length), not O(keywords)"""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def emit(node: Dict) -> str:
+        terminal = '' in node
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        # Greedy optional suffix prefers the longest keyword at each position
+        if terminal:
+            return f"(?:{body})?"
+        return body
+
+    return emit(trie)
+
+
+class KeywordMatcher:
+    """Single-pass, multi-category keyword matcher"""
+
+    def __init__(self, table: Dict[str, Iterable[str]] = None, whole_words: bool = False):
+        self.table = {category: list(dict.fromkeys(k.lower() for k in keywords))
+                      for category, keywords in (table or KEYWORD_TABLE).items()}
+        self.whole_words = whole_words
+
+        owners = {}
+        for category, keywords in self.table.items():
+            for keyword in keywords:
+                owners.setdefault(keyword, []).append(category)
+
+        # A longer keyword shadows any keyword nested inside it (e.g. "hiring manager"
+        # hides "hiring"), so fold the nested keywords' categories into the longer one
+        self.expansions = {}
+        for keyword in owners:
+            hits = []
+            for other, categories in owners.items():
+                if other == keyword or self.contains(keyword, other):
+                    hits.extend((category, other) for category in categories)
+            self.expansions[keyword] = hits
+
+        pattern = build_trie_pattern(sorted(owners, key=len, reverse=True))
+        if whole_words:
+            pattern = rf"\b(?:{pattern})\b"
+        # Zero-width lookahead reports overlapping hits, like Aho-Corasick
+        self.pattern = re.compile(f"(?=({pattern}))")
+
+        logger.debug(f"Keyword matcher built: {len(owners)} keywords, {len(self.table)} categories")
+
+    def contains(self, keyword: str, other: str) -> bool:
+        """Whether every occurrence of keyword is also an occurrence of other"""
+        if self.whole_words:
+            return re.search(rf"\b{re.escape(other)}\b", keyword) is not None
+        return other in keyword
+
+    def scan(self, *texts: str) -> Dict[str, List[str]]:
+        """category -> matched keywords (first-seen order), in one pass over all texts"""
+        text = '\n'.join(t for t in texts if t).lower()
+        hits = {}
+        for match in self.pattern.finditer(text):
+            for category, keyword in self.expansions[match.group(1)]:
+                matched = hits.setdefault(category, [])
+                if keyword not in matched:
+                    matched.append(keyword)
+        return hits
+
+    def categories(self, *texts: str) -> Set[str]:
+        """Set of categories present in the texts"""
+        return set(self.scan(*texts))
+
+    def keywords(self, categories: Iterable[str], *texts: str) -> List[str]:
+        """Matched keywords belonging to any of the given categories"""
+        hits = self.scan(*texts)
+        matched = []
+        for category in categories:
+            for keyword in hits.get(category, []):
+                if keyword not in matched:
+                    matched.append(keyword)
+        return matched
+
+
+# Global matcher instance, compiled on first use
+keyword_matcher = None
+_keyword_matcher_lock = threading.Lock()
+
+def get_keyword_matcher() -> KeywordMatcher:
+    """Get the shared keyword matcher"""
+    global keyword_matcher
+    with _keyword_matcher_lock:
+        if keyword_matcher is None:
+            keyword_matcher = KeywordMatcher()
+        return keyword_matcher
+
+def scan_keywords(*texts: str) -> Dict[str, List[str]]:
+    """Convenience wrapper around the shared matcher"""
+    return get_keyword_matcher().scan(*texts)
@@ -0,0 +1,299 @@
+"""
+LLM Backend for Personal AI Employee
+
+One interface for every caller that needs a model completion (orchestrator
+skills, CEO briefing). Two implementations:
+
+- HTTPBackend: Messages API over persistent keep-alive connections, with a
+  bounded concurrency semaphore and streamed responses. The skill prefix is
+  sent as a cacheable system block so the server can reuse it across tasks.
+- CLIBackend: the Claude CLI, with the prompt piped on stdin instead of argv.
+
+Only the CLI can act on the vault; HTTP completions are text, which callers
+persist themselves (acts_on_files tells them apart).
+
+Selected with LLM_BACKEND=http|cli (default: http when ANTHROPIC_API_KEY or
+LLM_BASE_URL is set, cli otherwise). scripts/llm_stub_server.py provides a
+local stand-in server for the HTTP backend.
+"""
+
+import os
+import json
+import time
+import queue
+import shlex
+import logging
+import threading
+import subprocess
+import http.client
+from urllib.parse import urlsplit
+from typing import Callable, Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://api.anthropic.com"
+DEFAULT_MODEL = "claude-sonnet-4-5"
+DEFAULT_MAX_TOKENS = 4096
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_TIMEOUT = 300  # seconds
+API_VERSION = "2023-06-01"
+
+# Errors that mean a pooled keep-alive connection was closed by the server
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError)
+
+
+class LLMResponse:
+    """Outcome of one completion"""
+
+    __slots__ = ('ok', 'text', 'error', 'status', 'usage', 'elapsed')
+
+    def __init__(self, ok: bool, text: str = "", error: str = "", status: int = 0,
+                 usage: Optional[Dict[str, Any]] = None, elapsed: float = 0.0):
+        self.ok = ok
+        self.text = text
+        self.error = error
+        self.status = status
+        self.usage = usage or {}
+        self.elapsed = elapsed
+
+    def __repr__(self) -> str:
+        return f"LLMResponse(ok={self.ok}, status={self.status}, chars={len(self.text)})"
+
+    @property
+    def message(self) -> str:
+        """Text on success, error otherwise (legacy (success, message) shape)"""
+        return self.text if self.ok else self.error
+
+
+class LLMBackend:
+    """Base class: complete(prefix, suffix) under a bounded concurrency limit"""
+
+    name = "base"
+    acts_on_files = False  # whether the model can write vault files itself, or only returns text
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, timeout: float = DEFAULT_TIMEOUT):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+
+    def complete(self, prefix: str, suffix: str = "",
+                 on_text: Optional[Callable[[str], None]] = None) -> LLMResponse:
+        """Run one completion; on_text receives streamed chunks as they arrive"""
+        start = time.monotonic()
+        with self.slots:
+            response = self.request(prefix, suffix, on_text)
+        response.elapsed = time.monotonic() - start
+        return response
+
+    def request(self, prefix: str, suffix: str, on_text: Optional[Callable[[str], None]]) -> LLMResponse:
+        raise NotImplementedError
+
+    def close(self):
+        """Release pooled resources"""
+
+
+class HTTPBackend(LLMBackend):
+    """Messages API client with a keep-alive connection pool"""
+
+    name = "http"
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, api_key: Optional[str] = None,
+                 model: str = DEFAULT_MODEL, max_tokens: int = DEFAULT_MAX_TOKENS,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY, timeout: float = DEFAULT_TIMEOUT):
+        super().__init__(max_concurrency, timeout)
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme or 'http'
+        self.host = parts.hostname or 'localhost'
+        self.port = parts.port
+        self.path = parts.path.rstrip('/') + '/v1/messages'
+        self.api_key = api_key
+        self.model = model
+        self.max_tokens = max_tokens
+        # Idle connections, most recently used first (warmest TLS session)
+        self.idle = queue.LifoQueue()
+        self.connections_opened = 0
+
+    def new_connection(self) -> http.client.HTTPConnection:
+        """Open a fresh keep-alive connection"""
+        self.connections_opened += 1
+        if self.scheme == 'https':
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            'content-type': 'application/json',
+            'accept': 'text/event-stream',
+            'anthropic-version': API_VERSION,
+            'connection': 'keep-alive'
+        }
+        if self.api_key:
+            headers['x-api-key'] = self.api_key
+        return headers
+
+    def payload(self, prefix: str, suffix: str) -> bytes:
+        """Request body: constant prefix as a cacheable system block, task as the user turn"""
+        return json.dumps({
+            'model': self.model,
+            'max_tokens': self.max_tokens,
+            'stream': True,
+            'system': [{'type': 'text', 'text': prefix, 'cache_control': {'type': 'ephemeral'}}],
+            'messages': [{'role': 'user', 'content': suffix or 'Proceed.'}]
+        }).encode('utf-8')
+
+    def request(self, prefix: str, suffix: str, on_text: Optional[Callable[[str], None]]) -> LLMResponse:
+        body = self.payload(prefix, suffix)
+
+        for attempt in range(2):
+            try:
+                conn, reused = self.idle.get_nowait(), True
+            except queue.Empty:
+                conn, reused = self.new_connection(), False
+
+            try:
+                conn.request('POST', self.path, body=body, headers=self.headers())
+                resp = conn.getresponse()
+                response = self.read_response(resp, on_text)
+            except STALE_CONNECTION_ERRORS as e:
+                conn.close()
+                if reused and attempt == 0:
+                    continue  # server dropped an idle connection; retry once on a new one
+                return LLMResponse(False, error=f"Connection error: {e}")
+            except (http.client.HTTPException, OSError) as e:
+                conn.close()
+                return LLMResponse(False, error=f"{type(e).__name__}: {e}")
+
+            if resp.will_close:
+                conn.close()
+            else:
+                self.idle.put(conn)
+            return response
+
+        return LLMResponse(False, error="Connection error: no usable connection")
+
+    def read_response(self, resp: http.client.HTTPResponse,
+                      on_text: Optional[Callable[[str], None]]) -> LLMResponse:
+        """Consume the whole response (required before the connection is reused)"""
+        if resp.status != 200:
+            detail = resp.read().decode('utf-8', errors='replace')
+            try:
+                detail = json.loads(detail).get('error', {}).get('message', detail)
+            except (ValueError, AttributeError):
+                pass
+            return LLMResponse(False, error=f"HTTP {resp.status}: {detail}", status=resp.status)
+
+        if 'text/event-stream' not in resp.getheader('content-type', ''):
+            data = json.loads(resp.read() or b'{}')
+            text = ''.join(block.get('text', '') for block in data.get('content', []))
+            if text and on_text:
+                on_text(text)
+            return LLMResponse(True, text=text, status=200, usage=data.get('usage', {}))
+
+        chunks: List[str] = []
+        usage: Dict[str, Any] = {}
+        error = ""
+        for raw_line in resp:
+            line = raw_line.decode('utf-8').strip()
+            if not line.startswith('data:'):
+                continue
+            try:
+                event = json.loads(line[5:])
+            except ValueError:
+                continue
+
+            event_type = event.get('type')
+            if event_type == 'content_block_delta':
+                text = event.get('delta', {}).get('text', '')
+                if text:
+                    chunks.append(text)
+                    if on_text:
+                        on_text(text)
+            elif event_type == 'message_start':
+                usage.update(event.get('message', {}).get('usage', {}))
+            elif event_type == 'message_delta':
+                usage.update(event.get('usage', {}))
+            elif event_type == 'error':
+                error = event.get('error', {}).get('message', 'stream error')
+
+        if error:
+            return LLMResponse(False, text=''.join(chunks), error=error, status=200, usage=usage)
+        return LLMResponse(True, text=''.join(chunks), status=200, usage=usage)
+
+    def close(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class CLIBackend(LLMBackend):
+    """Claude CLI fallback; the prompt goes on stdin, never on argv"""
+
+    name = "cli"
+    acts_on_files = True  # the CLI runs tools, so skills write their own plans and approvals
+
+    def __init__(self, command: Optional[List[str]] = None,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY, timeout: float = DEFAULT_TIMEOUT):
+        super().__init__(max_concurrency, timeout)
+        self.command = command or ['claude', '-p']
+
+    def request(self, prefix: str, suffix: str, on_text: Optional[Callable[[str], None]]) -> LLMResponse:
+        try:
+            result = subprocess.run(
+                self.command,
+                input=prefix + suffix,
+                capture_output=True,
+                text=True,
+                timeout=self.timeout
+            )
+        except subprocess.TimeoutExpired:
+            return LLMResponse(False, error="Claude CLI call timed out")
+        except FileNotFoundError:
+            return LLMResponse(False, error=f"Claude CLI not found: {self.command[0]}")
+
+        if result.returncode != 0:
+            return LLMResponse(False, error=result.stderr, status=result.returncode)
+        if on_text and result.stdout:
+            on_text(result.stdout)
+        return LLMResponse(True, text=result.stdout)
+
+
+def create_backend(kind: Optional[str] = None) -> LLMBackend:
+    """Build a backend from environment settings"""
+    api_key = os.getenv('ANTHROPIC_API_KEY')
+    base_url = os.getenv('LLM_BASE_URL')
+    kind = (kind or os.getenv('LLM_BACKEND') or ('http' if api_key or base_url else 'cli')).lower()
+    max_concurrency = int(os.getenv('LLM_MAX_CONCURRENCY', DEFAULT_MAX_CONCURRENCY))
+    timeout = float(os.getenv('LLM_TIMEOUT', DEFAULT_TIMEOUT))
+
+    if kind == 'http':
+        backend = HTTPBackend(
+            base_url=base_url or DEFAULT_BASE_URL,
+            api_key=api_key,
+            model=os.getenv('LLM_MODEL', DEFAULT_MODEL),
+            max_tokens=int(os.getenv('LLM_MAX_TOKENS', DEFAULT_MAX_TOKENS)),
+            max_concurrency=max_concurrency,
+            timeout=timeout
+        )
+    elif kind == 'cli':
+        command = shlex.split(os.getenv('LLM_CLI_COMMAND', 'claude -p'))
+        backend = CLIBackend(command, max_concurrency=max_concurrency, timeout=timeout)
+    else:
+        raise ValueError(f"Unknown LLM backend: {kind}")
+
+    logger.info(f"LLM backend: {backend.name} (max {max_concurrency} concurrent)")
+    return backend
+
+
+# Global backend instance, created on first use
+llm_backend = None
+_llm_backend_lock = threading.Lock()
+
+def get_llm_backend() -> LLMBackend:
+    """Get the process-wide LLM backend"""
+    global llm_backend
+    with _llm_backend_lock:
+        if llm_backend is None:
+            llm_backend = create_backend()
+        return llm_backend
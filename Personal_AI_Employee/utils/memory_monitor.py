@@ -0,0 +1,275 @@
+"""
+Memory Monitoring for Personal AI Employee
+
+Long-running processes (watchers, orchestrator) register the structures that
+can grow over time. Every interval a background thread records RSS, the
+tracemalloc total and the allocation sites that grew most since the previous
+sample, plus the length and approximate size of each registered structure,
+and appends the report to Logs/metrics/memory_<process>_YYYY-MM-DD.jsonl
+(latest in Logs/metrics/memory_<process>.json).
+
+tracemalloc roughly halves throughput of allocation-heavy code, so by default
+(MEMORY_TRACEMALLOC=auto) it only starts once RSS passes TRACE_START_FRACTION
+of the soft limit; set MEMORY_TRACEMALLOC=1 to trace from startup.
+
+Above the soft limit (MEMORY_SOFT_LIMIT_MB) the registered compaction hooks
+run. If RSS is still over the limit and MEMORY_LIMIT_ACTION is "restart",
+restart_requested is set so the main loop can shut down cleanly and exit
+with RESTART_EXIT_CODE for PM2 to restart the process.
+"""
+
+import os
+import gc
+import sys
+import json
+import logging
+import threading
+import tracemalloc
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Any, List, Callable, Optional
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 300  # seconds between samples
+DEFAULT_TOP_SITES = 10
+TRACE_FRAMES = 1
+TRACE_START_FRACTION = 0.75  # auto mode: start tracing at this share of the soft limit
+RESTART_EXIT_CODE = 75  # EX_TEMPFAIL; PM2 restarts on any exit
+SIZE_SAMPLE_ITEMS = 100
+
+
+def approx_size(obj) -> int:
+    """Container size plus its items (one level deep), estimated from a sample"""
+    size = sys.getsizeof(obj)
+    try:
+        count = len(obj)
+    except TypeError:
+        return size
+    if not count:
+        return size
+
+    items = obj.items() if isinstance(obj, dict) else obj
+    sampled = total = 0
+    for item in items:
+        if isinstance(item, tuple):
+            total += sum(sys.getsizeof(part) for part in item)
+        elif isinstance(item, dict):
+            total += sys.getsizeof(item) + sum(sys.getsizeof(v) for v in item.values())
+        else:
+            total += sys.getsizeof(item)
+        sampled += 1
+        if sampled >= SIZE_SAMPLE_ITEMS:
+            break
+    return size + int(total / sampled * count)
+
+
+def rss_bytes() -> Optional[int]:
+    """Resident set size of this process, if psutil is available"""
+    if psutil is None:
+        return None
+    try:
+        return psutil.Process().memory_info().rss
+    except psutil.Error:
+        return None
+
+
+class MemoryMonitor:
+    """Periodic memory reports for one process, with soft-limit compaction"""
+
+    def __init__(self, name: str, logs_dir: str = "AI_Employee_Vault/Logs",
+                 interval: float = DEFAULT_INTERVAL, soft_limit_mb: float = 0,
+                 limit_action: str = 'compact', trace: str = 'auto',
+                 top_sites: int = DEFAULT_TOP_SITES):
+        self.name = name
+        self.metrics_dir = Path(logs_dir) / "metrics"
+        self.interval = interval
+        self.soft_limit = soft_limit_mb * 1024 * 1024
+        self.limit_action = limit_action
+        self.top_sites = top_sites
+
+        self.lock = threading.Lock()
+        self.structures: Dict[str, Callable[[], Any]] = {}
+        self.compactors: List[Callable[[], None]] = []
+        self.previous: Dict[str, Any] = {}
+        self.previous_snapshot = None
+        self.restart_requested = threading.Event()
+
+        self.trace = trace
+        if trace == 'on' and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.loop, name=f'memory-monitor-{name}', daemon=True)
+        self.thread.start()
+
+    def track(self, label: str, getter: Callable[[], Any]):
+        """Report the size of a structure; getter returns its current object"""
+        with self.lock:
+            self.structures[label] = getter
+
+    def on_soft_limit(self, compactor: Callable[[], None]):
+        """Run compactor when the process goes over the soft limit"""
+        with self.lock:
+            self.compactors.append(compactor)
+
+    def structure_sizes(self) -> Dict[str, Dict[str, int]]:
+        with self.lock:
+            structures = dict(self.structures)
+        sizes = {}
+        for label, getter in structures.items():
+            try:
+                obj = getter()
+                sizes[label] = {'len': len(obj), 'bytes': approx_size(obj)}
+            except Exception as e:
+                logger.debug(f"Could not size {label}: {e}")
+        return sizes
+
+    def top_growth(self) -> List[Dict[str, Any]]:
+        """Allocation sites that grew most since the previous sample"""
+        if not tracemalloc.is_tracing():
+            return []
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ])
+        previous, self.previous_snapshot = self.previous_snapshot, snapshot
+        if previous is None:
+            stats = [(s, s.size, s.count) for s in snapshot.statistics('lineno')[:self.top_sites]]
+        else:
+            stats = [(s, s.size_diff, s.count_diff)
+                     for s in snapshot.compare_to(previous, 'lineno')[:self.top_sites]]
+
+        sites = []
+        for stat, size_delta, count_delta in stats:
+            frame = stat.traceback[0]
+            sites.append({
+                'site': f"{Path(frame.filename).name}:{frame.lineno}",
+                'size_kb': round(stat.size / 1024, 1),
+                'size_delta_kb': round(size_delta / 1024, 1),
+                'count_delta': count_delta
+            })
+        return sites
+
+    def sample(self) -> Dict[str, Any]:
+        """Take one memory report and handle the soft limit"""
+        rss = rss_bytes()
+        if (self.trace == 'auto' and self.soft_limit and rss is not None and not tracemalloc.is_tracing()
+                and rss > self.soft_limit * TRACE_START_FRACTION):
+            logger.info(f"Memory ({self.name}): RSS {rss / 1048576:.1f} MB nearing soft limit, starting tracemalloc")
+            tracemalloc.start(TRACE_FRAMES)
+        traced, traced_peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        structures = self.structure_sizes()
+
+        previous = self.previous
+        for label, size in structures.items():
+            before = previous.get('structures', {}).get(label, {})
+            size['len_delta'] = size['len'] - before.get('len', 0)
+            size['bytes_delta'] = size['bytes'] - before.get('bytes', 0)
+
+        report = {
+            'process': self.name,
+            'pid': os.getpid(),
+            'at': datetime.now().isoformat(),
+            'rss_mb': round(rss / 1048576, 1) if rss is not None else None,
+            'rss_delta_mb': round((rss - previous['rss']) / 1048576, 1)
+                            if rss is not None and previous.get('rss') is not None else None,
+            'traced_mb': round(traced / 1048576, 2),
+            'traced_peak_mb': round(traced_peak / 1048576, 2),
+            'structures': structures,
+            'top_growth': self.top_growth(),
+            'soft_limit_mb': round(self.soft_limit / 1048576) if self.soft_limit else None,
+            'action': None
+        }
+
+        used = rss if rss is not None else traced
+        if self.soft_limit and used > self.soft_limit:
+            report['action'] = self.handle_soft_limit(used)
+            # Later deltas are measured from the compacted sizes
+            structures = self.structure_sizes()
+            report['after_compaction'] = {label: size['len'] for label, size in structures.items()}
+
+        self.previous = {'rss': rss, 'structures': structures}
+        self.export(report)
+
+        growth = ", ".join(f"{label} {s['len']} ({s['len_delta']:+d})" for label, s in report['structures'].items())
+        logger.info(f"Memory ({self.name}): RSS {report['rss_mb']} MB ({report['rss_delta_mb'] or 0:+} MB), "
+                    f"traced {report['traced_mb']} MB" + (f"; {growth}" if growth else ""))
+        return report
+
+    def handle_soft_limit(self, used: int) -> str:
+        """Compact registered structures; request a restart if that was not enough"""
+        logger.warning(f"Memory ({self.name}): {used / 1048576:.1f} MB over soft limit "
+                       f"{self.soft_limit / 1048576:.0f} MB, compacting")
+        with self.lock:
+            compactors = list(self.compactors)
+        for compactor in compactors:
+            try:
+                compactor()
+            except Exception as e:
+                logger.error(f"Memory compaction failed: {e}")
+        gc.collect()
+
+        rss = rss_bytes()
+        still_used = rss if rss is not None else tracemalloc.get_traced_memory()[0]
+        if still_used <= self.soft_limit or self.limit_action != 'restart':
+            return 'compacted'
+
+        logger.warning(f"Memory ({self.name}): still {still_used / 1048576:.1f} MB after compaction, "
+                       f"requesting restart")
+        self.restart_requested.set()
+        return 'restart'
+
+    def export(self, report: Dict[str, Any]):
+        try:
+            self.metrics_dir.mkdir(parents=True, exist_ok=True)
+            latest = self.metrics_dir / f"memory_{self.name}.json"
+            tmp_file = latest.with_suffix('.json.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            os.replace(tmp_file, latest)
+
+            history = self.metrics_dir / f"memory_{self.name}_{datetime.now().strftime('%Y-%m-%d')}.jsonl"
+            with open(history, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(report) + "\n")
+        except OSError as e:
+            logger.error(f"Error exporting memory report: {e}")
+
+    def loop(self):
+        # First sample soon after start gives later deltas a baseline
+        delay = min(self.interval, 30)
+        while not self.stop_event.wait(delay):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error(f"Memory sample failed: {e}")
+            delay = self.interval
+
+    def close(self):
+        self.stop_event.set()
+
+
+# Global monitor instance, created on first use
+memory_monitor = None
+_memory_monitor_lock = threading.Lock()
+
+def get_memory_monitor(name: str, logs_dir: str = "AI_Employee_Vault/Logs") -> MemoryMonitor:
+    """Get the process-wide memory monitor, configured from MEMORY_* environment variables"""
+    global memory_monitor
+    with _memory_monitor_lock:
+        if memory_monitor is None:
+            memory_monitor = MemoryMonitor(
+                name, logs_dir,
+                interval=float(os.getenv('MEMORY_INTERVAL', DEFAULT_INTERVAL)),
+                soft_limit_mb=float(os.getenv('MEMORY_SOFT_LIMIT_MB', 0)),
+                limit_action=os.getenv('MEMORY_LIMIT_ACTION', 'compact').strip().lower(),
+                trace={'1': 'on', 'true': 'on', 'on': 'on', '0': 'off', 'false': 'off', 'off': 'off'}.get(
+                    os.getenv('MEMORY_TRACEMALLOC', 'auto').strip().lower(), 'auto'),
+                top_sites=int(os.getenv('MEMORY_TOP_SITES', DEFAULT_TOP_SITES))
+            )
+        return memory_monitor
@@ -12,8 +12,6 @@ import logging
 import traceback
 from typing import Dict, Any, List, Optional
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class SecurityMonitor:
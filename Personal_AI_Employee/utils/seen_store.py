@@ -0,0 +1,167 @@
+"""
+Seen-ID Store for Personal AI Employee
+
+Persistent record of message IDs the watchers have already ingested, shared
+by the Gmail and WhatsApp watchers (one row per source and ID in a SQLite
+table, WAL mode so both processes can write). Membership is an indexed
+lookup, each new ID is a single INSERT, and startup opens the database
+instead of parsing an ever-growing JSON list. Entries older than the TTL
+are evicted. An optional in-memory Bloom filter answers "never seen" without
+touching the database, which is the common case for new mail.
+"""
+
+import os
+import json
+import math
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DB_FILE = str(PROJECT_ROOT / ".seen_ids.db")
+DEFAULT_TTL_DAYS = 180
+BLOOM_ERROR_RATE = 0.001
+EVICT_INTERVAL = 3600  # seconds between TTL sweeps
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen (
+    source TEXT NOT NULL,
+    id TEXT NOT NULL,
+    seen_at REAL NOT NULL,
+    PRIMARY KEY (source, id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS seen_by_age ON seen (source, seen_at);
+"""
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing on one blake2b digest)"""
+
+    __slots__ = ('size', 'hashes', 'bits')
+
+    def __init__(self, capacity: int, error_rate: float = BLOOM_ERROR_RATE):
+        capacity = max(1, capacity)
+        self.size = max(64, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def positions(self, item: str):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str):
+        for pos in self.positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self.positions(item))
+
+
+class SeenStore:
+    """Set-like store of seen IDs for one source, persisted in a shared SQLite file"""
+
+    def __init__(self, source: str, db_file: str = DEFAULT_DB_FILE,
+                 ttl_days: float = DEFAULT_TTL_DAYS, bloom_capacity: int = 0):
+        self.source = source
+        self.db_file = Path(db_file)
+        self.ttl = ttl_days * 86400 if ttl_days else 0
+        self.lock = threading.Lock()
+        self.last_evict = 0.0
+
+        self.db = sqlite3.connect(str(self.db_file), timeout=10, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self.db.commit()
+
+        self.evict_expired()
+
+        self.bloom = None
+        if bloom_capacity:
+            count = len(self)
+            self.bloom = BloomFilter(max(bloom_capacity, count * 2))
+            for (seen_id,) in self.db.execute("SELECT id FROM seen WHERE source = ?", (source,)):
+                self.bloom.add(seen_id)
+            logger.info(f"Seen-ID Bloom filter for {source}: {count} IDs, {len(self.bloom.bits) // 1024} KB")
+
+    def __contains__(self, seen_id: str) -> bool:
+        if self.bloom is not None and seen_id not in self.bloom:
+            return False
+        with self.lock:
+            row = self.db.execute("SELECT 1 FROM seen WHERE source = ? AND id = ?",
+                                  (self.source, seen_id)).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM seen WHERE source = ?", (self.source,)).fetchone()[0]
+
+    def add(self, seen_id: str):
+        """Record one ID (one INSERT, however large the history is)"""
+        self.add_many([seen_id])
+
+    def add_many(self, seen_ids: Iterable[str]):
+        now = time.time()
+        rows = [(self.source, seen_id, now) for seen_id in seen_ids]
+        with self.lock:
+            self.db.executemany("INSERT OR REPLACE INTO seen (source, id, seen_at) VALUES (?, ?, ?)", rows)
+            self.db.commit()
+        if self.bloom is not None:
+            for _, seen_id, _ in rows:
+                self.bloom.add(seen_id)
+        if self.ttl and now - self.last_evict > EVICT_INTERVAL:
+            self.evict_expired()
+
+    def evict_expired(self) -> int:
+        """Delete IDs older than the TTL; returns how many were removed"""
+        self.last_evict = time.time()
+        if not self.ttl:
+            return 0
+        with self.lock:
+            cursor = self.db.execute("DELETE FROM seen WHERE source = ? AND seen_at < ?",
+                                     (self.source, self.last_evict - self.ttl))
+            self.db.commit()
+        if cursor.rowcount:
+            logger.info(f"Evicted {cursor.rowcount} seen {self.source} IDs older than {self.ttl / 86400:g} days")
+        return cursor.rowcount
+
+    def import_json(self, json_file: str, key: str = 'processed_ids') -> int:
+        """One-time migration from the old JSON list; the file is renamed once imported"""
+        path = Path(json_file)
+        if not path.exists():
+            return 0
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                seen_ids = json.load(f).get(key, [])
+            self.add_many(seen_ids)
+            os.replace(path, path.with_name(path.name + '.migrated'))
+            logger.info(f"Imported {len(seen_ids)} {self.source} IDs from {path}")
+            return len(seen_ids)
+        except (OSError, ValueError) as e:
+            logger.error(f"Error importing seen IDs from {path}: {e}")
+            return 0
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+def open_seen_store(source: str, legacy_json: Optional[str] = None) -> SeenStore:
+    """Seen-ID store for a watcher, configured from SEEN_* environment variables"""
+    store = SeenStore(
+        source,
+        db_file=PROJECT_ROOT / os.getenv('SEEN_DB_FILE', DEFAULT_DB_FILE),
+        ttl_days=float(os.getenv('SEEN_TTL_DAYS', DEFAULT_TTL_DAYS)),
+        bloom_capacity=int(os.getenv('SEEN_BLOOM_CAPACITY', 0))
+    )
+    if legacy_json:
+        store.import_json(legacy_json)
+    return store
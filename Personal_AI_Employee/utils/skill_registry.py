@@ -0,0 +1,127 @@
+"""
+Skill Registry for Personal AI Employee
+
+Loads each skill markdown file once and keeps it until its mtime or size
+changes. For every skill the constant part of the task prompt (instructions
+plus the full skill text) is rendered ahead of time, so a task only adds its
+own content as a short suffix. Keeping the prefix byte-identical across calls
+also lets an LLM backend reuse its cached prompt prefix.
+"""
+
+import os
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Constant instructions go before the skill so the whole prefix is shared
+PROMPT_HEADER = (
+    "Using the skill defined below, process the task that follows it. "
+    "Create a plan in the Plans directory and any necessary approval requests."
+)
+
+# For backends that can only reply with text; the reply is saved into the task's plan file
+REPLY_PROMPT_HEADER = (
+    "Using the skill defined below, process the task that follows it. "
+    "Reply with the plan in markdown: the steps to take and the full draft of any "
+    "message or document that needs approval."
+)
+
+
+class Skill:
+    """A loaded skill file and its precomputed prompt prefix"""
+
+    __slots__ = ('path', 'mtime_ns', 'size', 'content', 'prefix', 'reply_prefix')
+
+    def __init__(self, path: Path, mtime_ns: int, size: int, content: str):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.content = content
+        self.prefix = f"{PROMPT_HEADER}\n\nSKILL:\n{content}\n\nTASK:\n"
+        self.reply_prefix = f"{REPLY_PROMPT_HEADER}\n\nSKILL:\n{content}\n\nTASK:\n"
+
+    def __repr__(self) -> str:
+        return f"Skill({self.path!s}, {self.size} bytes)"
+
+    @property
+    def name(self) -> str:
+        return self.path.stem
+
+    def prompt(self, task_content: str) -> str:
+        """Full prompt for a task: cached prefix + per-task suffix"""
+        return self.prefix + task_content
+
+
+class SkillRegistry:
+    """Skills keyed by path, reloaded only when the file changes on disk"""
+
+    def __init__(self):
+        self.skills: Dict[str, Skill] = {}
+        self.lock = threading.Lock()
+        self.loads = 0
+        self.hits = 0
+
+    def get(self, skill_path) -> Optional[Skill]:
+        """Loaded skill, or None if the file is missing or unreadable"""
+        key = os.fspath(skill_path)
+        try:
+            st = os.stat(key)
+        except OSError:
+            with self.lock:
+                self.skills.pop(key, None)
+            return None
+
+        with self.lock:
+            skill = self.skills.get(key)
+            if skill and skill.mtime_ns == st.st_mtime_ns and skill.size == st.st_size:
+                self.hits += 1
+                return skill
+
+        try:
+            with open(key, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            logger.error(f"Error reading skill {key}: {e}")
+            return None
+
+        skill = Skill(Path(key), st.st_mtime_ns, st.st_size, content)
+        with self.lock:
+            self.skills[key] = skill
+            self.loads += 1
+        logger.info(f"Loaded skill {skill.name} ({skill.size} bytes)")
+        return skill
+
+    def prompt_parts(self, skill_path, task_content: str) -> Optional[Tuple[str, str]]:
+        """(constant prefix, per-task suffix) for a skill, or None if it is missing"""
+        skill = self.get(skill_path)
+        if skill is None:
+            return None
+        return skill.prefix, task_content
+
+    def invalidate(self, skill_path=None):
+        """Forget one skill, or all of them"""
+        with self.lock:
+            if skill_path is None:
+                self.skills.clear()
+            else:
+                self.skills.pop(os.fspath(skill_path), None)
+
+    def info(self) -> Dict[str, int]:
+        """Registry statistics"""
+        with self.lock:
+            return {'skills': len(self.skills), 'loads': self.loads, 'hits': self.hits}
+
+
+# Global skill registry instance
+skill_registry = SkillRegistry()
+
+def get_skill_registry() -> SkillRegistry:
+    """Get the global skill registry"""
+    return skill_registry
+
+def load_skill(skill_path) -> Optional[Skill]:
+    """Cached load of a single skill file"""
+    return skill_registry.get(skill_path)
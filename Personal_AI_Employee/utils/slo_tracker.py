@@ -0,0 +1,238 @@
+"""
+End-to-End SLO Tracking for Personal AI Employee
+
+Watchers stamp every item with a trace id and an ingest timestamp. The
+orchestrator, approval executor and social posters record stage transitions
+against that id in Logs/traces/YYYY-MM-DD.jsonl (one O_APPEND write per event,
+so separate processes can share the file). slo_report() folds the recent
+events into a rolling report: the share of items planned within a target
+number of seconds of ingest and executed within a target number of minutes
+of approval, with latency percentiles for each leg.
+"""
+
+import os
+import json
+import math
+import uuid
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TRACE_DIR_NAME = "traces"
+
+# Default SLO targets
+PLAN_TARGET_SECONDS = 60
+EXECUTE_TARGET_MINUTES = 15
+
+# Stage names, in pipeline order
+INGESTED = 'ingested'                    # watcher wrote the item
+PICKED_UP = 'picked_up'                  # a worker started on it (end of queue wait)
+PLANNED = 'planned'                      # plan file written
+APPROVAL_REQUESTED = 'approval_requested'
+APPROVED = 'approved'                    # human moved it to Approved
+EXECUTED = 'executed'                    # approved action carried out
+POSTED = 'posted'                        # social post published
+DONE = 'done'
+
+STAGES = (INGESTED, PICKED_UP, PLANNED, APPROVAL_REQUESTED, APPROVED, EXECUTED, POSTED, DONE)
+
+
+def new_trace_id() -> str:
+    """Fresh trace id"""
+    return uuid.uuid4().hex[:16]
+
+
+def ingest_stamp() -> Dict[str, str]:
+    """trace_id and ingested_at fields for a newly ingested item"""
+    return {'trace_id': new_trace_id(), 'ingested_at': datetime.now().isoformat()}
+
+
+def ingest_frontmatter() -> str:
+    """Frontmatter lines stamping a newly ingested item"""
+    stamp = ingest_stamp()
+    return f"trace_id: {stamp['trace_id']}\ningested_at: {stamp['ingested_at']}"
+
+
+def approved_at(path: Path) -> datetime:
+    """When a file was moved into Approved (the rename updates ctime on POSIX)"""
+    if os.name != 'nt':
+        try:
+            return min(datetime.now(), datetime.fromtimestamp(os.stat(path).st_ctime))
+        except OSError:
+            pass
+    return datetime.now()
+
+
+class TraceLog:
+    """Append-only log of stage transitions keyed by trace id"""
+
+    def __init__(self, logs_dir: str = "AI_Employee_Vault/Logs"):
+        self.trace_dir = Path(logs_dir) / TRACE_DIR_NAME
+        self.trace_dir.mkdir(parents=True, exist_ok=True)
+
+    def mark(self, trace_id: Optional[str], stage: str, when: Optional[datetime] = None, **extra):
+        """Record that a traced item reached a stage"""
+        if not trace_id:
+            return
+        when = when or datetime.now()
+        event = {'trace_id': trace_id, 'stage': stage, 'at': when.isoformat()}
+        event.update(extra)
+        line = (json.dumps(event, default=str) + "\n").encode('utf-8')
+
+        path = self.trace_dir / f"{datetime.now().strftime('%Y-%m-%d')}.jsonl"
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            logger.error(f"Error recording trace event: {e}")
+
+
+def load_events(logs_dir: Path, since: datetime) -> List[Dict[str, Any]]:
+    """Trace events recorded since a point in time"""
+    trace_dir = Path(logs_dir) / TRACE_DIR_NAME
+    events = []
+    day = since.date()
+    while day <= datetime.now().date():
+        path = trace_dir / f"{day.isoformat()}.jsonl"
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        events.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+        day += timedelta(days=1)
+    return events
+
+
+def build_traces(events: List[Dict[str, Any]]) -> Dict[str, Dict[str, datetime]]:
+    """trace id -> stage -> first time the stage was reached"""
+    traces: Dict[str, Dict[str, datetime]] = {}
+    for event in events:
+        try:
+            when = datetime.fromisoformat(event['at'])
+        except (KeyError, ValueError):
+            continue
+        stages = traces.setdefault(event.get('trace_id', ''), {})
+        stage = event.get('stage')
+        if stage not in stages or when < stages[stage]:
+            stages[stage] = when
+    traces.pop('', None)
+    return traces
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def leg_summary(durations: List[float], target: float) -> Dict[str, Any]:
+    """Count, share within target and percentiles for one pipeline leg (seconds)"""
+    within = sum(1 for d in durations if d <= target)
+    return {
+        'count': len(durations),
+        'target_s': target,
+        'within_target': within,
+        'attainment': round(within / len(durations), 4) if durations else None,
+        'p50_s': round(percentile(durations, 50), 3),
+        'p95_s': round(percentile(durations, 95), 3),
+        'p99_s': round(percentile(durations, 99), 3)
+    }
+
+
+def slo_report(logs_dir: str = "AI_Employee_Vault/Logs", window_hours: float = 24,
+               plan_target: float = PLAN_TARGET_SECONDS,
+               execute_target_minutes: float = EXECUTE_TARGET_MINUTES) -> Dict[str, Any]:
+    """Rolling SLO report over the last window_hours"""
+    now = datetime.now()
+    since = now - timedelta(hours=window_hours)
+    traces = build_traces(load_events(Path(logs_dir), since))
+
+    queue_wait, plan, execute = [], [], []
+    waiting_plan = waiting_execute = 0
+
+    for stages in traces.values():
+        ingested = stages.get(INGESTED)
+        if ingested and ingested >= since:
+            if PICKED_UP in stages:
+                queue_wait.append((stages[PICKED_UP] - ingested).total_seconds())
+            if PLANNED in stages:
+                plan.append((stages[PLANNED] - ingested).total_seconds())
+            elif (now - ingested).total_seconds() > plan_target:
+                waiting_plan += 1
+
+        approved = stages.get(APPROVED)
+        if approved and approved >= since:
+            finished = stages.get(EXECUTED) or stages.get(POSTED)
+            if finished:
+                execute.append((finished - approved).total_seconds())
+            elif (now - approved).total_seconds() > execute_target_minutes * 60:
+                waiting_execute += 1
+
+    # Items still waiting past the target count as misses
+    plan_summary = leg_summary(plan + [float('inf')] * waiting_plan, plan_target)
+    execute_summary = leg_summary(execute + [float('inf')] * waiting_execute, execute_target_minutes * 60)
+    plan_summary['overdue'] = waiting_plan
+    execute_summary['overdue'] = waiting_execute
+
+    return {
+        'generated': now.isoformat(),
+        'window_hours': window_hours,
+        'traces': len(traces),
+        'queue_wait': leg_summary(queue_wait, plan_target),
+        'ingest_to_plan': plan_summary,
+        'approval_to_execution': execute_summary
+    }
+
+
+def render_slo_markdown(report: Dict[str, Any]) -> str:
+    """Dashboard section body for a report"""
+    def fmt(value: Optional[float]) -> str:
+        return "n/a" if value is None else f"{value:.1%}"
+
+    def seconds(value: float) -> str:
+        return "overdue" if value == float('inf') else f"{value:.1f}s"
+
+    plan = report['ingest_to_plan']
+    execute = report['approval_to_execution']
+    wait = report['queue_wait']
+    return "\n".join([
+        f"*Last {report['window_hours']:g}h, {report['traces']} traced items*",
+        "",
+        "| Leg | Target | Within target | p50 | p95 | Overdue |",
+        "|-----|--------|---------------|-----|-----|---------|",
+        f"| Ingest → Plan | {plan['target_s']:g}s | {fmt(plan['attainment'])} ({plan['within_target']}/{plan['count']}) "
+        f"| {seconds(plan['p50_s'])} | {seconds(plan['p95_s'])} | {plan['overdue']} |",
+        f"| Approval → Execution | {execute['target_s'] / 60:g}m | {fmt(execute['attainment'])} "
+        f"({execute['within_target']}/{execute['count']}) | {seconds(execute['p50_s'])} | {seconds(execute['p95_s'])} "
+        f"| {execute['overdue']} |",
+        f"| Queue wait | - | - | {seconds(wait['p50_s'])} | {seconds(wait['p95_s'])} | - |"
+    ])
+
+
+# Global trace log instance, created on first use
+trace_log = None
+_trace_log_lock = threading.Lock()
+
+def get_trace_log(logs_dir: str = "AI_Employee_Vault/Logs") -> TraceLog:
+    """Get the process-wide trace log"""
+    global trace_log
+    with _trace_log_lock:
+        if trace_log is None:
+            trace_log = TraceLog(logs_dir)
+        return trace_log
+
+def mark_stage(trace_id: Optional[str], stage: str, when: Optional[datetime] = None, **extra):
+    """Convenience wrapper around the shared trace log"""
+    get_trace_log().mark(trace_id, stage, when, **extra)
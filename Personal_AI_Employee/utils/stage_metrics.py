@@ -0,0 +1,254 @@
+"""
+Stage Latency Metrics for Personal AI Employee
+
+Per-stage latency histograms for task processing (disk moves, parsing,
+analysis, plan/invoice/approval writes, LLM call, logging, dashboard) plus
+task throughput. Every interval the exporter thread writes the interval's
+p50/p95/p99 to Logs/metrics.json (latest snapshot) and appends it to
+Logs/metrics/YYYY-MM-DD.jsonl, so slow cycles can be traced to a stage.
+"""
+
+import os
+import json
+import math
+import time
+import atexit
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXPORT_INTERVAL = 60  # seconds
+PERCENTILES = (50, 95, 99)
+
+# Log-scale buckets: 10 us .. ~1 h with <=10% relative error
+BUCKET_MIN = 1e-5
+BUCKET_GROWTH = 1.1
+BUCKET_COUNT = 210
+
+
+class LatencyHistogram:
+    """Fixed-size log-bucket histogram of durations in seconds"""
+
+    __slots__ = ('buckets', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.buckets = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        if seconds <= BUCKET_MIN:
+            index = 0
+        else:
+            index = min(BUCKET_COUNT - 1, int(math.log(seconds / BUCKET_MIN, BUCKET_GROWTH)) + 1)
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other: 'LatencyHistogram'):
+        for i, n in enumerate(other.buckets):
+            self.buckets[i] += n
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, pct: float) -> float:
+        """Upper bound of the bucket holding the pct-th percentile"""
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * pct / 100)
+        seen = 0
+        for index, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(self.max, BUCKET_MIN * BUCKET_GROWTH ** index)
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        """count, mean, max and percentiles in milliseconds"""
+        summary = {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            'max_ms': round(self.max * 1000, 3)
+        }
+        for pct in PERCENTILES:
+            summary[f'p{pct}_ms'] = round(self.percentile(pct) * 1000, 3)
+        return summary
+
+
+class StageTimer:
+    """Lap timer for one task: each lap() records the time since the previous one"""
+
+    def __init__(self, metrics: 'StageMetrics'):
+        self.metrics = metrics
+        self.started = time.perf_counter()
+        self.last = self.started
+
+    def lap(self, stage: str):
+        now = time.perf_counter()
+        self.metrics.record(stage, now - self.last)
+        self.last = now
+
+    def skip(self):
+        """Exclude the time since the last lap (e.g. logging) from the next stage"""
+        self.last = time.perf_counter()
+
+    def finish(self, success: bool):
+        """Record the end-to-end time and count the task"""
+        self.metrics.record('task_total', time.perf_counter() - self.started)
+        self.metrics.task_done(success)
+
+
+class StageMetrics:
+    """Thread-safe stage histograms with a periodic file exporter"""
+
+    def __init__(self, logs_dir: str = "AI_Employee_Vault/Logs",
+                 interval: float = DEFAULT_EXPORT_INTERVAL):
+        self.logs_dir = Path(logs_dir)
+        self.metrics_file = self.logs_dir / "metrics.json"
+        self.history_dir = self.logs_dir / "metrics"
+        self.interval = interval
+
+        self.lock = threading.Lock()
+        self.interval_stages: Dict[str, LatencyHistogram] = {}
+        self.total_stages: Dict[str, LatencyHistogram] = {}
+        self.interval_started = time.time()
+        self.started = self.interval_started
+        self.interval_counts = {'completed': 0, 'failed': 0}
+        self.total_counts = {'completed': 0, 'failed': 0}
+        self.cycle_started = time.perf_counter()
+        self.cycle_counts = {'completed': 0, 'failed': 0}
+
+        self.stop_event = threading.Event()
+        self.exporter = threading.Thread(target=self.export_loop, name='stage-metrics-exporter', daemon=True)
+        self.exporter.start()
+        atexit.register(self.close)
+
+    def record(self, stage: str, seconds: float):
+        """Add one duration to a stage"""
+        with self.lock:
+            histogram = self.interval_stages.get(stage)
+            if histogram is None:
+                histogram = self.interval_stages[stage] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def timer(self) -> StageTimer:
+        """Start timing a task"""
+        return StageTimer(self)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a block as one stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def task_done(self, success: bool):
+        key = 'completed' if success else 'failed'
+        with self.lock:
+            self.interval_counts[key] += 1
+            self.cycle_counts[key] += 1
+
+    def cycle_report(self, label: str = "cycle") -> Dict[str, Any]:
+        """Throughput since the previous cycle_report call, logged and returned"""
+        with self.lock:
+            elapsed = time.perf_counter() - self.cycle_started
+            counts = self.cycle_counts
+            self.cycle_counts = {'completed': 0, 'failed': 0}
+            self.cycle_started = time.perf_counter()
+
+        tasks = counts['completed'] + counts['failed']
+        report = dict(counts, elapsed_s=round(elapsed, 3),
+                      tasks_per_s=round(tasks / elapsed, 3) if elapsed > 0 else 0.0)
+        if tasks:
+            logger.info(f"Throughput ({label}): {tasks} tasks in {elapsed:.2f}s "
+                        f"({report['tasks_per_s']}/s, {counts['failed']} failed)")
+        return report
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Close the current interval and return its report"""
+        now = time.time()
+        with self.lock:
+            stages = self.interval_stages
+            counts = self.interval_counts
+            started = self.interval_started
+            self.interval_stages = {}
+            self.interval_counts = {'completed': 0, 'failed': 0}
+            self.interval_started = now
+
+            for name, histogram in stages.items():
+                self.total_stages.setdefault(name, LatencyHistogram()).merge(histogram)
+            for key, n in counts.items():
+                self.total_counts[key] += n
+            totals = {name: h.summary() for name, h in self.total_stages.items()}
+            total_counts = dict(self.total_counts)
+
+        elapsed = max(now - started, 1e-9)
+        tasks = counts['completed'] + counts['failed']
+        return {
+            'interval_start': datetime.fromtimestamp(started).isoformat(),
+            'interval_end': datetime.fromtimestamp(now).isoformat(),
+            'throughput': dict(counts, tasks_per_min=round(tasks / elapsed * 60, 2)),
+            'stages': {name: h.summary() for name, h in sorted(stages.items())},
+            'since_start': {
+                'started': datetime.fromtimestamp(self.started).isoformat(),
+                'throughput': total_counts,
+                'stages': dict(sorted(totals.items()))
+            }
+        }
+
+    def export(self) -> Optional[Dict[str, Any]]:
+        """Write the interval report; empty intervals only refresh the snapshot"""
+        report = self.snapshot()
+        try:
+            self.logs_dir.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.metrics_file.with_suffix('.json.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            os.replace(tmp_file, self.metrics_file)
+
+            if report['stages']:
+                self.history_dir.mkdir(parents=True, exist_ok=True)
+                history_file = self.history_dir / f"{datetime.now().strftime('%Y-%m-%d')}.jsonl"
+                interval_only = {k: v for k, v in report.items() if k != 'since_start'}
+                with open(history_file, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(interval_only) + "\n")
+        except OSError as e:
+            logger.error(f"Error exporting metrics: {e}")
+            return None
+        return report
+
+    def export_loop(self):
+        while not self.stop_event.wait(self.interval):
+            self.export()
+
+    def close(self):
+        """Export the last partial interval"""
+        if self.stop_event.is_set():
+            return
+        self.stop_event.set()
+        self.export()
+
+
+# Global metrics instance, created on first use
+stage_metrics = None
+_stage_metrics_lock = threading.Lock()
+
+def get_stage_metrics(logs_dir: str = "AI_Employee_Vault/Logs") -> StageMetrics:
+    """Get the process-wide stage metrics"""
+    global stage_metrics
+    with _stage_metrics_lock:
+        if stage_metrics is None:
+            interval = float(os.getenv('METRICS_INTERVAL', DEFAULT_EXPORT_INTERVAL))
+            stage_metrics = StageMetrics(logs_dir, interval)
+        return stage_metrics
@@ -0,0 +1,204 @@
+"""
+Task State Journal for Personal AI Employee
+
+Write-ahead journal for the Needs_Action -> In_Progress -> Done transitions.
+Every move is recorded (and fsynced) before the rename happens, together with
+the task's attempt count, so after a crash or restart the orchestrator can
+resume or roll back in-flight tasks by replaying the journal alone, without
+rescanning vault folders. Tasks that keep failing or keep killing the process
+are quarantined instead of being retried forever.
+"""
+
+import os
+import json
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Any, List
+
+logger = logging.getLogger(__name__)
+
+MAX_TASK_ATTEMPTS = 3
+
+# Journal stages
+CLAIMING = 'claiming'        # about to move Needs_Action -> In_Progress
+IN_PROGRESS = 'in_progress'  # file is in In_Progress and being worked on
+FINISHING = 'finishing'      # about to move In_Progress -> Done
+RETURNED = 'returned'        # failed, moved back to Needs_Action for a retry
+DONE = 'done'                # terminal: entry is dropped
+QUARANTINED = 'quarantined'  # terminal: entry is dropped
+
+TERMINAL_STAGES = (DONE, QUARANTINED)
+
+
+class TaskJournal:
+    """Append-only JSONL journal of task state, replayed into an in-memory table"""
+
+    def __init__(self, journal_file: str, max_attempts: int = MAX_TASK_ATTEMPTS):
+        self.journal_file = Path(journal_file)
+        self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+        self.tasks: Dict[str, Dict[str, Any]] = {}
+        self.file = None
+
+        self.replay()
+        self.compact()
+
+    def replay(self):
+        """Rebuild the task table from the journal, ignoring a torn last line"""
+        if not self.journal_file.exists():
+            return
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Skipping torn task journal record")
+                    continue
+                self.apply(record)
+
+    def apply(self, record: Dict[str, Any]):
+        """Fold one record into the task table"""
+        task = record.get('task')
+        if not task:
+            return
+        if record.get('stage') in TERMINAL_STAGES:
+            self.tasks.pop(task, None)
+        else:
+            self.tasks[task] = record
+
+    def compact(self):
+        """Rewrite the journal with one record per live task, keeping it O(in-flight)"""
+        with self.lock:
+            if self.file:
+                self.file.close()
+            tmp_file = self.journal_file.with_suffix('.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                for record in self.tasks.values():
+                    f.write(json.dumps(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.journal_file)
+            self.file = open(self.journal_file, 'a', encoding='utf-8')
+
+    def record(self, task: str, stage: str, sync: bool = False, **extra) -> Dict[str, Any]:
+        """Append a transition; sync=True makes it durable before the caller acts on it"""
+        with self.lock:
+            previous = self.tasks.get(task, {})
+            record = {
+                'task': task,
+                'stage': stage,
+                'attempts': previous.get('attempts', 0),
+                'timestamp': datetime.now().isoformat()
+            }
+            record.update(extra)
+            self.apply(record)
+            self.file.write(json.dumps(record) + "\n")
+            self.file.flush()
+            if sync:
+                os.fsync(self.file.fileno())
+            return record
+
+    def attempts(self, task: str) -> int:
+        """Times the task has been claimed since it last completed"""
+        with self.lock:
+            return self.tasks.get(task, {}).get('attempts', 0)
+
+    def claim(self, task: str) -> int:
+        """Write-ahead record before Needs_Action -> In_Progress; returns the attempt number"""
+        attempt = self.attempts(task) + 1
+        self.record(task, CLAIMING, sync=True, attempts=attempt)
+        return attempt
+
+    def started(self, task: str):
+        """The claim rename happened"""
+        self.record(task, IN_PROGRESS)
+
+    def finishing(self, task: str):
+        """Write-ahead record before In_Progress -> Done"""
+        self.record(task, FINISHING, sync=True)
+
+    def done(self, task: str):
+        """The task reached Done; its entry is dropped"""
+        self.record(task, DONE)
+
+    def returned(self, task: str, error: str = ""):
+        """The task failed and went back to Needs_Action for a retry"""
+        self.record(task, RETURNED, sync=True, error=error[:200])
+
+    def quarantined(self, task: str, error: str = ""):
+        """The task was parked for a human; its entry is dropped"""
+        self.record(task, QUARANTINED, sync=True, error=error[:200])
+
+    def exhausted(self, task: str) -> bool:
+        """Whether the task has used up its attempts"""
+        return self.attempts(task) >= self.max_attempts
+
+    def in_flight(self) -> List[Dict[str, Any]]:
+        """Tasks interrupted mid-transition (what a restart must resolve)"""
+        with self.lock:
+            return [dict(record) for record in self.tasks.values() if record['stage'] != RETURNED]
+
+    def close(self):
+        with self.lock:
+            if self.file and not self.file.closed:
+                self.file.close()
+
+
+def recover_tasks(journal: TaskJournal, needs_action_dir: Path, in_progress_dir: Path,
+                  done_dir: Path, quarantine_dir: Path) -> Dict[str, List[str]]:
+    """Resolve every in-flight journal entry: roll forward, roll back or quarantine.
+
+    Only files named in the journal are touched, so the cost is O(journal).
+    """
+    outcome = {'resumed': [], 'completed': [], 'quarantined': [], 'cleared': []}
+
+    for record in journal.in_flight():
+        task = record['task']
+        stage = record['stage']
+        pending = Path(needs_action_dir) / task
+        in_progress = Path(in_progress_dir) / task
+        done = Path(done_dir) / task
+
+        try:
+            if stage == FINISHING:
+                # Processing finished; only the final rename may be missing
+                if in_progress.exists():
+                    os.replace(in_progress, done)
+                journal.done(task)
+                outcome['completed'].append(task)
+
+            elif in_progress.exists():
+                if journal.exhausted(task):
+                    # Crashed the process on every attempt: do not try again
+                    Path(quarantine_dir).mkdir(parents=True, exist_ok=True)
+                    os.replace(in_progress, Path(quarantine_dir) / task)
+                    journal.quarantined(task, "interrupted on every attempt")
+                    outcome['quarantined'].append(task)
+                else:
+                    os.replace(in_progress, pending)
+                    journal.returned(task, "interrupted by restart")
+                    outcome['resumed'].append(task)
+
+            elif pending.exists():
+                # The claim never reached the rename
+                journal.returned(task, "claim not completed")
+                outcome['resumed'].append(task)
+
+            elif done.exists():
+                journal.done(task)
+                outcome['completed'].append(task)
+
+            else:
+                # Moved or deleted by hand
+                journal.done(task)
+                outcome['cleared'].append(task)
+
+        except OSError as e:
+            logger.error(f"Error recovering task {task}: {e}")
+
+    if any(outcome.values()):
+        logger.info("Task journal recovery: " + ", ".join(f"{len(v)} {k}" for k, v in outcome.items()))
+    return outcome
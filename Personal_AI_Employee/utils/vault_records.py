@@ -0,0 +1,271 @@
+"""
+Vault Record Parser for Personal AI Employee
+
+Shared, cached parser for vault markdown files (YAML frontmatter + body).
+Records are memoised by (path, mtime_ns, size), so repeated scans of the same
+folders only re-parse files that actually changed.
+
+Watchers write flat `key: value` frontmatter with unescaped free text
+(subjects such as "Re: [URGENT] invoice #42"), which YAML would reject or
+mangle. Flat blocks therefore use the fast line parser; blocks with real YAML
+structure (indentation, block lists, quoting) go through the libyaml C loader,
+falling back to the line parser if they fail to load.
+"""
+
+import os
+import re
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    import yaml
+    try:
+        from yaml import CBaseLoader as YamlLoader
+    except ImportError:
+        from yaml import BaseLoader as YamlLoader
+except ImportError:
+    yaml = None
+
+logger = logging.getLogger(__name__)
+
+MAX_CACHED_RECORDS = 4096
+
+# Frontmatter keys converted to typed values on the record
+DATE_FIELDS = ('created', 'timestamp', 'received', 'date', 'processed', 'last_updated', 'expires')
+LIST_FIELDS = ('keywords_matched', 'keywords', 'tags', 'labels', 'attachments')
+INT_FIELDS = ('size', 'attempts', 'attachment_count')
+
+# Lines that need a real YAML loader rather than the key: value splitter
+STRUCTURED_LINE = re.compile(r'^(\s+\S|- )|:\s*[\'"|>]')
+
+
+class VaultRecord:
+    """Parsed vault file: legacy string frontmatter, typed fields and body"""
+
+    __slots__ = ('path', 'mtime_ns', 'size', 'frontmatter', 'fields', 'body')
+
+    def __init__(self, path: Optional[Path], mtime_ns: int, size: int,
+                 frontmatter: Dict[str, str], fields: Dict[str, Any], body: str):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.frontmatter = frontmatter
+        self.fields = fields
+        self.body = body
+
+    def __repr__(self) -> str:
+        return f"VaultRecord({self.path!s}, type={self.type!r})"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Typed frontmatter value"""
+        return self.fields.get(key, default)
+
+    @property
+    def type(self) -> str:
+        return self.frontmatter.get('type', 'unknown')
+
+    @property
+    def priority(self) -> str:
+        return self.frontmatter.get('priority', 'medium')
+
+    @property
+    def status(self) -> str:
+        return self.frontmatter.get('status', '')
+
+    @property
+    def created(self) -> Optional[datetime]:
+        """First usable creation timestamp in the frontmatter"""
+        for key in ('created', 'timestamp', 'received', 'date'):
+            value = self.fields.get(key)
+            if isinstance(value, datetime):
+                return value
+        return None
+
+    def section(self, heading: str) -> str:
+        """Text under a "## heading" up to the next "## " heading"""
+        lines = self.body.split('\n')
+        target = f"## {heading}".strip()
+        for i, line in enumerate(lines):
+            if line.strip() == target:
+                end = next((j for j in range(i + 1, len(lines)) if lines[j].startswith('## ')), len(lines))
+                return '\n'.join(lines[i + 1:end]).strip()
+        return ""
+
+
+def split_frontmatter(content: str) -> Tuple[Optional[str], str]:
+    """Split raw frontmatter text from the body"""
+    if content.startswith('---'):
+        parts = content.split('---', 2)
+        if len(parts) >= 3:
+            return parts[1].strip(), parts[2].strip()
+    return None, content
+
+
+def parse_lines(frontmatter_text: str) -> Dict[str, str]:
+    """Fast path: split each line on the first colon"""
+    frontmatter = {}
+    for line in frontmatter_text.split('\n'):
+        if ':' in line:
+            key, value = line.split(':', 1)
+            frontmatter[key.strip()] = value.strip()
+    return frontmatter
+
+
+def parse_yaml(frontmatter_text: str) -> Optional[Dict[str, Any]]:
+    """libyaml loader (all scalars as strings); None if the block is not a YAML mapping"""
+    if yaml is None:
+        return None
+    try:
+        data = yaml.load(frontmatter_text, Loader=YamlLoader)
+    except yaml.YAMLError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def to_fields(raw: Dict[str, Any]) -> Tuple[Dict[str, str], Dict[str, Any]]:
+    """Build the legacy string mapping and the typed field mapping"""
+    frontmatter = {}
+    fields = {}
+
+    for key, value in raw.items():
+        key = str(key)
+        if isinstance(value, list):
+            items = [str(item) for item in value]
+            frontmatter[key] = ', '.join(items)
+            fields[key] = items
+            continue
+        if isinstance(value, dict):
+            frontmatter[key] = str(value)
+            fields[key] = value
+            continue
+
+        text = '' if value is None else str(value)
+        frontmatter[key] = text
+
+        if key in DATE_FIELDS or key.endswith('_at'):
+            try:
+                fields[key] = datetime.fromisoformat(text)
+                continue
+            except ValueError:
+                pass
+        elif key in LIST_FIELDS:
+            fields[key] = [item.strip() for item in text.strip('[]').split(',') if item.strip()]
+            continue
+        elif key in INT_FIELDS and text.isdigit():
+            fields[key] = int(text)
+            continue
+
+        fields[key] = text
+
+    return frontmatter, fields
+
+
+def parse_record(content: str, path: Optional[Path] = None, mtime_ns: int = 0, size: int = 0) -> VaultRecord:
+    """Parse markdown content into a VaultRecord (no caching)"""
+    frontmatter_text, body = split_frontmatter(content)
+
+    raw = {}
+    if frontmatter_text:
+        if any(STRUCTURED_LINE.search(line) for line in frontmatter_text.split('\n')):
+            raw = parse_yaml(frontmatter_text)
+        if not raw:
+            raw = parse_lines(frontmatter_text)
+
+    frontmatter, fields = to_fields(raw)
+    return VaultRecord(path, mtime_ns, size, frontmatter, fields, body)
+
+
+def parse_frontmatter(content: str) -> Tuple[Dict[str, str], str]:
+    """Legacy interface: (string frontmatter, body)"""
+    record = parse_record(content)
+    return record.frontmatter, record.body
+
+
+class RecordCache:
+    """LRU cache of parsed records keyed by path, validated by (mtime_ns, size)"""
+
+    def __init__(self, max_records: int = MAX_CACHED_RECORDS):
+        self.max_records = max_records
+        self.records = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, path: Path, stat_result: os.stat_result = None) -> Optional[VaultRecord]:
+        """Parsed record for a file, re-reading it only if it changed"""
+        key = os.fspath(path)
+        try:
+            st = stat_result or os.stat(key)
+        except OSError:
+            self.forget(key)
+            return None
+
+        with self.lock:
+            record = self.records.get(key)
+            if record and record.mtime_ns == st.st_mtime_ns and record.size == st.st_size:
+                self.records.move_to_end(key)
+                self.hits += 1
+                return record
+            self.misses += 1
+
+        try:
+            with open(key, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            logger.error(f"Error reading vault record {key}: {e}")
+            return None
+
+        record = parse_record(content, Path(path), st.st_mtime_ns, st.st_size)
+        with self.lock:
+            self.records[key] = record
+            self.records.move_to_end(key)
+            while len(self.records) > self.max_records:
+                self.records.popitem(last=False)
+        return record
+
+    def forget(self, path):
+        """Drop a path from the cache"""
+        with self.lock:
+            self.records.pop(os.fspath(path), None)
+
+    def clear(self):
+        """Drop every cached record"""
+        with self.lock:
+            self.records.clear()
+            self.hits = self.misses = 0
+
+    def info(self) -> Dict[str, int]:
+        """Cache statistics"""
+        with self.lock:
+            return {'records': len(self.records), 'hits': self.hits, 'misses': self.misses}
+
+
+# Global record cache instance
+record_cache = RecordCache()
+
+def get_record_cache() -> RecordCache:
+    """Get the global record cache"""
+    return record_cache
+
+def load_record(path) -> Optional[VaultRecord]:
+    """Cached parse of a single vault file"""
+    return record_cache.load(path)
+
+def scan_records(directory, suffix: str = '.md') -> List[VaultRecord]:
+    """Cached parse of every matching file in a folder, one stat per entry"""
+    records = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(suffix) or not entry.is_file():
+                    continue
+                record = record_cache.load(Path(entry.path), entry.stat())
+                if record:
+                    records.append(record)
+    except FileNotFoundError:
+        pass
+    return records
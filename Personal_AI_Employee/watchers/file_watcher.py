@@ -4,35 +4,37 @@ Automatically processes and creates action items for dropped files
 """
 
 import os
+import sys
 import time
-import shutil
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
 from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler, FileCreatedEvent
+from watchdog.events import FileSystemEventHandler
 from plyer import notification
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from utils.attachment_store import get_attachment_store
+from utils.file_content import get_content_extractor, format_frontmatter
+from utils.drop_manifest import DropManifest
+from utils.cycle_profiler import add_profile_arguments, apply_profile_arguments, get_cycle_profiler
+from utils.slo_tracker import ingest_stamp, get_trace_log
+
 # Configuration
 DROP_FOLDER = Path.home() / "Desktop" / "AI_Drop_Folder"
 ACTION_DIR = Path("AI_Employee_Vault/Needs_Action")
+ATTACHMENTS_DIR = Path("AI_Employee_Vault/Attachments")  # content-addressed copies of dropped files
+MANIFEST_FILE = ".file_watcher_manifest.jsonl"  # processed drops, for the startup reconciliation scan
 LOG_DIR = Path("AI_Employee_Vault/Logs")
 LOG_FILE = LOG_DIR / "file_watcher.log"
 
-# File type detection mapping
-FILE_TYPE_MAP = {
-    '.pdf': 'invoice',
-    '.csv': 'data',
-    '.jpg': 'image',
-    '.jpeg': 'image',
-    '.png': 'image',
-    '.docx': 'document',
-    '.doc': 'document',
-    '.txt': 'document',
-    '.xlsx': 'data',
-    '.xls': 'data',
-}
+# Readiness: a file is processed once its size and mtime hold still for SETTLE_SECONDS
+SETTLE_SECONDS = 0.5
+READY_TIMEOUT = 300  # seconds a file may keep changing (or stay locked) before it is skipped
+MAX_WORKERS = int(os.getenv('FILE_WATCHER_WORKERS', 4))
 
 # Suggested actions based on file type
 SUGGESTED_ACTIONS = {
@@ -81,81 +83,133 @@ logger = logging.getLogger(__name__)
 
 
 class FileDropHandler(FileSystemEventHandler):
-    """Handler for file system events in the drop folder"""
-
-    def __init__(self):
+    """Handler for file system events in the drop folder.
+
+    The observer thread only (re)starts a per-path settle timer. When it
+    fires, a worker checks that size and mtime are unchanged since the
+    previous check and that the file can be opened, then processes it;
+    otherwise the timer is restarted, until READY_TIMEOUT. The file type
+    comes from its content; text extraction runs on the content extractor's
+    process pool while the worker waits for the result. Processed
+    versions are recorded in the manifest so reconcile() can pick up files
+    dropped while the watcher was not running.
+    """
+
+    def __init__(self, max_workers: int = MAX_WORKERS):
         super().__init__()
+        self.lock = threading.Lock()
+        self.pending: Dict[str, threading.Timer] = {}  # Settle timers by path
         self.processing = set()  # Track files being processed
+        self.manifest = DropManifest(MANIFEST_FILE)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='file-drop')
+        self.store = get_attachment_store(str(ATTACHMENTS_DIR))
+        self.extractor = get_content_extractor()
+        self.profiler = get_cycle_profiler('file_watcher', str(LOG_DIR))
+
+    def is_ignored(self, file_path: Path) -> bool:
+        """Temporary, hidden and our own metadata files are never processed"""
+        return file_path.name.startswith(('.', '~')) or file_path.suffix == '.md'
 
     def on_created(self, event):
         """Handle file creation events"""
-        if event.is_directory:
+        if not event.is_directory:
+            self.schedule(Path(event.src_path))
+
+    def on_modified(self, event):
+        # Writers may still be filling the file; restart its settle timer
+        if not event.is_directory:
+            self.schedule(Path(event.src_path))
+
+    def on_moved(self, event):
+        # Downloads and atomic saves land by renaming a temporary file
+        if not event.is_directory:
+            self.schedule(Path(event.dest_path))
+
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self.manifest.forget(Path(event.src_path).name)
+
+    def reconcile(self, folder: Path) -> int:
+        """Queue files that are new or changed since the manifest was written; returns how many"""
+        missed = self.manifest.pending(folder, self.is_ignored)
+        for file_path in missed:
+            self.schedule(file_path)
+        if missed:
+            logger.info(f"Startup scan: {len(missed)} file(s) dropped while the watcher was down")
+        return len(missed)
+
+    def schedule(self, file_path: Path, first_seen: Optional[float] = None,
+                 signature: Optional[Tuple[int, int]] = None):
+        """(Re)start the settle timer for a path; the check itself runs on the worker pool"""
+        if self.is_ignored(file_path):
             return
 
-        file_path = Path(event.src_path)
+        key = str(file_path)
+        with self.lock:
+            timer = self.pending.pop(key, None)
+            if timer:
+                timer.cancel()
+            timer = threading.Timer(SETTLE_SECONDS, self.executor.submit,
+                                    args=(self.check_ready, file_path, first_seen or time.monotonic(), signature))
+            timer.daemon = True
+            self.pending[key] = timer
+            timer.start()
+
+    def check_ready(self, file_path: Path, first_seen: float, signature: Optional[Tuple[int, int]]):
+        """Process the file if it is unchanged since the last check, else check again later"""
+        key = str(file_path)
+        with self.lock:
+            self.pending.pop(key, None)
 
-        # Ignore temporary files and hidden files
-        if file_path.name.startswith('.') or file_path.name.startswith('~'):
-            return
-
-        # Ignore metadata files we create
-        if file_path.suffix == '.md':
+        try:
+            stat = file_path.stat()
+        except FileNotFoundError:
+            return  # Removed or renamed away before it settled
+        current = (stat.st_size, stat.st_mtime_ns)
+
+        if current != signature or not self.can_open(file_path):
+            if time.monotonic() - first_seen > READY_TIMEOUT:
+                logger.error(f"File not ready after {READY_TIMEOUT}s, skipping: {file_path.name}")
+                return
+            self.schedule(file_path, first_seen, current)
             return
 
-        # Avoid processing the same file multiple times
-        if str(file_path) in self.processing:
+        # Avoid processing the same version of a file twice
+        if self.manifest.unchanged(file_path, *current):
             return
-
-        self.processing.add(str(file_path))
+        with self.lock:
+            if key in self.processing or key in self.pending:
+                return
+            self.processing.add(key)
 
         try:
             logger.info(f"New file detected: {file_path.name}")
-            self.process_file(file_path)
+            with self.profiler.cycle(file_path.name):
+                file_info = self.process_file(file_path)
+            if file_info:
+                self.manifest.record(file_path.name, *current, file_info['sha256'])
         finally:
-            self.processing.discard(str(file_path))
-
-    def wait_for_file_ready(self, file_path: Path, max_attempts: int = 5) -> bool:
-        """Wait for file to be fully written and not locked"""
-        for attempt in range(max_attempts):
-            try:
-                # Try to open the file to check if it's locked
-                with open(file_path, 'rb') as f:
-                    f.read(1)
-
-                # Check if file size is stable
-                size1 = file_path.stat().st_size
-                time.sleep(0.5)
-                size2 = file_path.stat().st_size
-
-                if size1 == size2:
-                    return True
-
-            except (PermissionError, IOError) as e:
-                logger.warning(f"File locked or not ready (attempt {attempt + 1}/{max_attempts}): {file_path.name}")
-                time.sleep(2)
-
-        return False
+            with self.lock:
+                self.processing.discard(key)
 
-    def get_file_type(self, file_path: Path) -> str:
-        """Detect file type based on extension"""
-        ext = file_path.suffix.lower()
-        return FILE_TYPE_MAP.get(ext, 'unknown')
-
-    def get_unique_filename(self, destination: Path, original_name: str) -> Path:
-        """Generate unique filename if file already exists"""
-        dest_path = destination / original_name
-
-        if not dest_path.exists():
-            return dest_path
-
-        # Add timestamp suffix
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        stem = dest_path.stem
-        suffix = dest_path.suffix
-        unique_name = f"{stem}_{timestamp}{suffix}"
-
-        logger.info(f"File already exists, using unique name: {unique_name}")
-        return destination / unique_name
+    def can_open(self, file_path: Path) -> bool:
+        """Whether the writer has released the file (Windows keeps it locked while writing)"""
+        try:
+            with open(file_path, 'rb') as f:
+                f.read(1)
+            return True
+        except (PermissionError, IOError):
+            logger.debug(f"File locked or not ready: {file_path.name}")
+            return False
+
+    def close(self):
+        """Cancel pending checks and wait for files already being processed"""
+        with self.lock:
+            for timer in self.pending.values():
+                timer.cancel()
+            self.pending.clear()
+        self.executor.shutdown(wait=True)
+        self.extractor.close()
 
     def format_file_size(self, size_bytes: int) -> str:
         """Format file size in human-readable format"""
@@ -165,24 +219,33 @@ class FileDropHandler(FileSystemEventHandler):
             size_bytes /= 1024.0
         return f"{size_bytes:.2f} TB"
 
-    def create_metadata_file(self, file_info: Dict, dest_file_path: Path):
-        """Create companion metadata markdown file"""
+    def create_metadata_file(self, file_info: Dict, blob_path: Path):
+        """Create companion metadata markdown file referencing the stored blob"""
         try:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            metadata_filename = f"FILE_{dest_file_path.stem}_{timestamp}.md"
+            metadata_filename = f"FILE_{Path(file_info['original_name']).stem}_{timestamp}.md"
             metadata_path = ACTION_DIR / metadata_filename
 
             file_type = file_info['detected_type']
             actions = '\n'.join(SUGGESTED_ACTIONS.get(file_type, SUGGESTED_ACTIONS['unknown']))
+            stamp = ingest_stamp()
+            location = blob_path.relative_to(ATTACHMENTS_DIR.parent).as_posix()
+            analysis = file_info['analysis']
+            preview = f"\n## Content Preview\n```\n{analysis['preview']}\n```\n" if analysis['preview'] else ""
 
             content = f"""---
 type: file_drop
+trace_id: {stamp['trace_id']}
+ingested_at: {stamp['ingested_at']}
 original_name: {file_info['original_name']}
 size: {file_info['size']}
 size_bytes: {file_info['size_bytes']}
 date_added: {file_info['date_added']}
 detected_type: {file_info['detected_type']}
-file_location: {dest_file_path.name}
+{format_frontmatter(analysis)}
+sha256: {file_info['sha256']}
+duplicate: {'true' if file_info['duplicate'] else 'false'}
+file_location: {location}
 status: pending
 ---
 
@@ -192,9 +255,11 @@ status: pending
 - **Original Name**: {file_info['original_name']}
 - **Size**: {file_info['size']}
 - **Detected Type**: {file_info['detected_type'].upper()}
+- **Content Type**: {analysis['content_type']}
 - **Date Added**: {file_info['date_added']}
-- **Location**: `AI_Employee_Vault/Needs_Action/{dest_file_path.name}`
-
+- **Location**: `AI_Employee_Vault/{location}`
+- **SHA-256**: `{file_info['sha256']}`{' (same content as an earlier drop)' if file_info['duplicate'] else ''}
+{preview}
 ## Detected Type: {file_info['detected_type'].upper()}
 
 ## Suggested Actions
@@ -210,6 +275,7 @@ Add any additional notes or context about this file here.
             with open(metadata_path, 'w', encoding='utf-8') as f:
                 f.write(content)
 
+            get_trace_log(str(LOG_DIR)).mark(stamp['trace_id'], 'ingested', source='file_drop')
             logger.info(f"Created metadata file: {metadata_filename}")
             return metadata_path
 
@@ -229,56 +295,55 @@ Add any additional notes or context about this file here.
         except Exception as e:
             logger.warning(f"Could not send notification: {e}")
 
-    def process_file(self, file_path: Path):
-        """Process a newly detected file"""
+    def process_file(self, file_path: Path) -> Optional[Dict]:
+        """Process a settled file; returns its file info once stored and queued in Needs_Action"""
         try:
-            # Wait for file to be ready
-            if not self.wait_for_file_ready(file_path):
-                logger.error(f"File not ready after retries, skipping: {file_path.name}")
-                return
-
             # Get file information
             file_stats = file_path.stat()
             file_size_bytes = file_stats.st_size
             file_size = self.format_file_size(file_size_bytes)
-            file_type = self.get_file_type(file_path)
             date_added = datetime.now().isoformat()
 
+            # Classify by content; parsing runs in the extractor's worker processes
+            analysis = self.extractor.analyze(file_path)
+            file_type = analysis['detected_type']
+
             file_info = {
                 'original_name': file_path.name,
                 'size': file_size,
                 'size_bytes': file_size_bytes,
                 'detected_type': file_type,
-                'date_added': date_added
+                'date_added': date_added,
+                'analysis': analysis
             }
 
             # Ensure destination directory exists
             ACTION_DIR.mkdir(parents=True, exist_ok=True)
 
-            # Get unique destination path
-            dest_path = self.get_unique_filename(ACTION_DIR, file_path.name)
-
-            # Copy file to action directory
+            # Store the content once by hash; identical drops share one blob
             try:
-                shutil.copy2(file_path, dest_path)
-                logger.info(f"Copied file to: {dest_path}")
+                blob = self.store.put(file_path)
             except PermissionError as e:
                 logger.error(f"Permission denied copying file: {file_path.name} - {e}")
-                return
+                return None
             except Exception as e:
                 logger.error(f"Error copying file: {file_path.name} - {e}")
-                return
+                return None
+            file_info['sha256'] = blob['sha256']
+            file_info['duplicate'] = blob['method'] == 'dedupe'
 
             # Create metadata file
-            self.create_metadata_file(file_info, dest_path)
+            self.create_metadata_file(file_info, blob['path'])
 
             # Send notification
             self.send_notification(file_path.name, file_type)
 
             logger.info(f"Successfully processed: {file_path.name} (Type: {file_type})")
+            return file_info
 
         except Exception as e:
             logger.error(f"Error processing file {file_path.name}: {e}")
+            return None
 
 
 class FileWatcher:
@@ -302,6 +367,9 @@ class FileWatcher:
         self.observer.schedule(self.handler, str(DROP_FOLDER), recursive=False)
         self.observer.start()
 
+        # Catch up on drops made while we were down; started after the observer so none fall in between
+        self.handler.reconcile(DROP_FOLDER)
+
         try:
             while True:
                 time.sleep(1)
@@ -310,10 +378,17 @@ class FileWatcher:
             self.observer.stop()
 
         self.observer.join()
+        self.handler.close()
 
 
 def main():
     """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='AI Employee - File Watcher')
+    add_profile_arguments(parser)
+    apply_profile_arguments(parser.parse_args())
+
     print("=" * 60)
     print("AI Employee - File Watcher")
     print("=" * 60)
@@ -1,6 +1,12 @@
 """
 Gmail Watcher - Monitors Gmail for unread important emails
 Creates action items in AI_Employee_Vault/Needs_Action/
+
+By default new mail is found incrementally with users.history.list from the
+history id stored in .gmail_history.json, so each cycle costs API calls in
+proportion to new mail and a burst drains in one pass. The first run, or an
+expired history id, falls back to a full `is:unread` resync. Set
+GMAIL_SYNC_MODE=poll for the old fixed-size `is:unread` listing.
 """
 
 import os
@@ -9,9 +15,9 @@ import time
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional
-import base64
+from typing import List, Dict, Optional, Tuple
 import re
+import sys
 import psutil
 
 from google.auth.transport.requests import Request
@@ -21,6 +27,15 @@ from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from utils.keyword_matcher import get_keyword_matcher
+from utils.mail_text import DEFAULT_BUDGET, extract_body
+from utils.cycle_profiler import add_profile_arguments, apply_profile_arguments, get_cycle_profiler
+from utils.memory_monitor import RESTART_EXIT_CODE, get_memory_monitor
+from utils.gmail_quota import PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_BACKGROUND, get_gmail_quota
+from utils.seen_store import open_seen_store
+from utils.slo_tracker import ingest_stamp, mark_stage
+
 # Load environment variables
 load_dotenv()
 
@@ -29,10 +44,32 @@ SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
 
 # Configuration
 CHECK_INTERVAL = 120  # seconds
-PROCESSED_IDS_FILE = '.processed_ids.json'
+PROCESSED_IDS_FILE = '.processed_ids.json'  # legacy list, imported into the seen-ID store once
 LOG_DIR = Path('AI_Employee_Vault/Logs')
 ACTION_DIR = Path('AI_Employee_Vault/Needs_Action')
 TOKEN_FILE = 'token.json'
+HISTORY_STATE_FILE = '.gmail_history.json'
+# history: incremental sync from a persisted startHistoryId; poll: legacy `is:unread` listing
+SYNC_MODE = os.getenv('GMAIL_SYNC_MODE', 'history').strip().lower()
+FULL_SYNC_MAX_MESSAGES = int(os.getenv('GMAIL_FULL_SYNC_MAX', 500))
+# Cycles a message that keeps failing is retried by ID before it is given up
+MAX_EMAIL_ATTEMPTS = int(os.getenv('GMAIL_MAX_ATTEMPTS', 5))
+
+# Batched fetches: metadata for every new message, full bodies only where classification needs them
+BATCH_SIZE = 50  # Gmail's recommended maximum per batch request
+METADATA_HEADERS = ['Subject', 'From', 'Date']
+METADATA_FIELDS = 'id,snippet,labelIds,payload/headers'
+# Four levels of parts covers mixed > related > alternative > text
+BODY_FIELDS = ('id,payload(mimeType,body/data,parts(mimeType,filename,body/data,'
+               'parts(mimeType,filename,body/data,parts(mimeType,filename,body/data,'
+               'parts(mimeType,filename,body/data)))))')
+# Decoded bytes read from the chosen body part; the rest of a huge newsletter is never decoded
+BODY_MAX_BYTES = int(os.getenv('GMAIL_BODY_MAX_BYTES', DEFAULT_BUDGET))
+# Bulk categories are classified from headers and snippet alone
+BODY_SKIP_LABELS = {label.strip() for label in os.getenv(
+    'GMAIL_BODY_SKIP_LABELS', 'CATEGORY_PROMOTIONS,CATEGORY_SOCIAL,CATEGORY_FORUMS').split(',') if label.strip()}
+# Bodies of these are fetched ahead of background work when quota is short
+HIGH_PRIORITY_LABELS = {'IMPORTANT', 'STARRED'}
 WORK_EMAIL_QUEUE_FILE = Path('work_email_queue.json')
 GENERAL_EMAIL_QUEUE_FILE = Path('general_email_queue.json')
 
@@ -54,32 +91,41 @@ logger = logging.getLogger(__name__)
 class GmailWatcher:
     def __init__(self):
         self.service = None
-        self.processed_ids = self.load_processed_ids()
+        # Processed email IDs live in the shared seen-ID store (SQLite), not in memory
+        self.processed_ids = open_seen_store('gmail', legacy_json=PROCESSED_IDS_FILE)
+        # Messages that failed to process, by ID, with the number of cycles they have failed
+        self.history_id, self.retry_ids = self.load_history_state()
         self.retry_delay = 1  # Initial retry delay in seconds
         self.max_retry_delay = 60
+        # Quota units are paced and 429s retried here, so API errors need no extra backoff
+        self.quota = get_gmail_quota()
 
-    def load_processed_ids(self) -> set:
-        """Load previously processed email IDs"""
-        if os.path.exists(PROCESSED_IDS_FILE):
+        # Periodic memory reports
+        self.memory = get_memory_monitor('gmail_watcher', str(LOG_DIR))
+
+    def load_history_state(self) -> Tuple[Optional[str], Dict[str, int]]:
+        """Load the history id the next incremental sync starts from, and the IDs to retry"""
+        if os.path.exists(HISTORY_STATE_FILE):
             try:
-                with open(PROCESSED_IDS_FILE, 'r') as f:
-                    data = json.load(f)
-                    return set(data.get('processed_ids', []))
+                with open(HISTORY_STATE_FILE, 'r') as f:
+                    state = json.load(f)
+                return state.get('history_id'), state.get('retry_ids', {})
             except Exception as e:
-                logger.error(f"Error loading processed IDs: {e}")
-                return set()
-        return set()
+                logger.error(f"Error loading history state: {e}")
+        return None, {}
 
-    def save_processed_ids(self):
-        """Save processed email IDs to file"""
+    def save_history_state(self, history_id: Optional[str], retry_ids: Dict[str, int]):
+        """Persist the sync position once the messages before it are processed or queued for a retry"""
+        self.history_id = history_id
+        self.retry_ids = retry_ids
         try:
-            with open(PROCESSED_IDS_FILE, 'w') as f:
-                json.dump({
-                    'processed_ids': list(self.processed_ids),
-                    'last_updated': datetime.now().isoformat()
-                }, f, indent=2)
+            tmp_file = f"{HISTORY_STATE_FILE}.tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump({'history_id': history_id, 'retry_ids': retry_ids,
+                           'last_updated': datetime.now().isoformat()}, f)
+            os.replace(tmp_file, HISTORY_STATE_FILE)
         except Exception as e:
-            logger.error(f"Error saving processed IDs: {e}")
+            logger.error(f"Error saving history state: {e}")
 
     def authenticate(self) -> bool:
         """Authenticate with Gmail API using OAuth2"""
@@ -154,11 +200,11 @@ class GmailWatcher:
             # Query for unread emails (latest 10 only as per requirements)
             query = 'is:unread'
 
-            results = self.service.users().messages().list(
+            results = self.quota.execute(self.service.users().messages().list(
                 userId='me',
                 q=query,
                 maxResults=10  # Process only latest 10 as per requirements
-            ).execute()
+            ), 'messages.list')
 
             messages = results.get('messages', [])
 
@@ -171,38 +217,99 @@ class GmailWatcher:
 
         except HttpError as error:
             logger.error(f"Gmail API error: {error}")
-            self.exponential_backoff()
             return []
         except Exception as e:
             logger.error(f"Unexpected error fetching emails: {e}")
             self.exponential_backoff()
             return []
 
+    def full_sync(self) -> Tuple[List[Dict], Optional[str]]:
+        """List every unread message (up to GMAIL_FULL_SYNC_MAX) and the history id to continue from"""
+        # Read the position first: mail arriving while we page is picked up by the next history call
+        history_id = self.quota.execute(self.service.users().getProfile(userId='me'), 'getProfile').get('historyId')
+
+        messages, page_token = [], None
+        while len(messages) < FULL_SYNC_MAX_MESSAGES:
+            results = self.quota.execute(self.service.users().messages().list(
+                userId='me',
+                q='is:unread',
+                maxResults=min(500, FULL_SYNC_MAX_MESSAGES - len(messages)),
+                pageToken=page_token
+            ), 'messages.list')
+            messages.extend(results.get('messages', []))
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+
+        logger.info(f"Full sync: {len(messages)} unread email(s), continuing from history id {history_id}")
+        return messages, history_id
+
+    def history_sync(self) -> Tuple[List[Dict], Optional[str]]:
+        """Messages added since the stored history id; one page per ~100 changes, not per backlog"""
+        messages, seen, page_token = [], set(), None
+        history_id = self.history_id
+        while True:
+            results = self.quota.execute(self.service.users().history().list(
+                userId='me',
+                startHistoryId=self.history_id,
+                historyTypes=['messageAdded'],
+                pageToken=page_token
+            ), 'history.list')
+
+            for record in results.get('history', []):
+                for added in record.get('messagesAdded', []):
+                    message = added.get('message', {})
+                    labels = message.get('labelIds')
+                    # Same scope as the `is:unread` query: skip drafts, sent mail and already-read mail
+                    if labels is not None and ('UNREAD' not in labels or 'DRAFT' in labels or 'SENT' in labels):
+                        continue
+                    if message.get('id') and message['id'] not in seen:
+                        seen.add(message['id'])
+                        messages.append(message)
+
+            history_id = results.get('historyId', history_id)
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+
+        if messages:
+            logger.info(f"Found {len(messages)} new email(s) since history id {self.history_id}")
+        return messages, history_id
+
+    def fetch_new_messages(self) -> Tuple[List[Dict], Optional[str]]:
+        """New message IDs plus the history id to store after processing them"""
+        if SYNC_MODE == 'poll':
+            return self.get_unread_important_emails(), None
+
+        try:
+            if not self.history_id:
+                return self.full_sync()
+            try:
+                return self.history_sync()
+            except HttpError as error:
+                # History ids expire after about a week (or on mailbox changes): start over
+                if getattr(error, 'resp', None) is not None and error.resp.status == 404:
+                    logger.warning(f"History id {self.history_id} expired, running a full resync")
+                    return self.full_sync()
+                raise
+        except HttpError as error:
+            logger.error(f"Gmail API error: {error}")
+            return [], None
+        except Exception as e:
+            logger.error(f"Unexpected error fetching emails: {e}")
+            self.exponential_backoff()
+            return [], None
+
     def is_work_related_email(self, email_info: Dict[str, str]) -> bool:
         """Check if an email is work/employment related based on keywords."""
-        subject = email_info.get('subject', '').lower()
-        sender = email_info.get('from', '').lower()
-        body = email_info.get('body', '').lower()
-        snippet = email_info.get('snippet', '').lower()
-
-        # Work-related keywords
-        work_keywords = [
-            'job', 'work', 'employment', 'opportunity', 'hire', 'contract',
-            'freelance', 'position', 'role', 'application', 'candidate',
-            'recruit', 'hiring', 'vacancy', 'opening', 'interview',
-            'company', 'linden', 'role', 'position', 'project', 'engagement',
-            'consultant', 'consulting', 'freelancer', 'contractor', 'offer',
-            'salary', 'compensation', 'pay', 'wage', 'remuneration'
-        ]
-
-        combined_text = f"{subject} {sender} {body} {snippet}"
-
-        # Check for work-related keywords
-        for keyword in work_keywords:
-            if keyword in combined_text:
-                return True
-
-        return False
+        # One pass over all fields against the shared keyword table
+        hits = get_keyword_matcher().scan(
+            email_info.get('subject', ''),
+            email_info.get('from', ''),
+            email_info.get('body', ''),
+            email_info.get('snippet', '')
+        )
+        return 'work' in hits
 
     def save_email_to_queue(self, email_info: Dict[str, str], is_work_related: bool):
         """Save email to appropriate queue file."""
@@ -213,8 +320,9 @@ class GmailWatcher:
             queue_file = GENERAL_EMAIL_QUEUE_FILE
             email_type = "GENERAL"
 
-        # Add timestamp and type to email info
+        # Add timestamp, trace id and type to email info
         email_info['timestamp'] = datetime.now().isoformat()
+        email_info.update(ingest_stamp())
         email_info['email_type'] = email_type
 
         try:
@@ -233,74 +341,108 @@ class GmailWatcher:
             with open(queue_file, 'w') as f:
                 json.dump(queue_data, f, indent=2)
 
+            mark_stage(email_info['trace_id'], 'ingested', source='gmail')
             logger.info(f"Saved {email_type} email to queue: {email_info['subject']}")
 
         except Exception as e:
             logger.error(f"Error saving email to queue: {e}")
 
-    def get_email_details(self, msg_id: str) -> Optional[Dict]:
-        """Get detailed information about an email"""
-        try:
-            message = self.service.users().messages().get(
-                userId='me',
-                id=msg_id,
-                format='full'
-            ).execute()
-
-            headers = message['payload']['headers']
-
-            # Extract relevant headers
-            subject = next((h['value'] for h in headers if h['name'].lower() == 'subject'), 'No Subject')
-            from_email = next((h['value'] for h in headers if h['name'].lower() == 'from'), 'Unknown')
-            date = next((h['value'] for h in headers if h['name'].lower() == 'date'), '')
-
-            # Get email body
-            body = self.get_email_body(message)
-
-            # Get snippet
-            snippet = message.get('snippet', '')
-
-            return {
-                'id': msg_id,
-                'subject': subject,
-                'from': from_email,
-                'date': date,
-                'body': body,
-                'snippet': snippet
-            }
+    def batch_get(self, msg_ids: List[str], priority: int = PRIORITY_NORMAL,
+                  **params) -> Tuple[Dict[str, Dict], Dict[str, Exception]]:
+        """messages.get for many IDs in batch requests of BATCH_SIZE; returns (messages, errors) by ID"""
+        results, errors = {}, {}
 
-        except HttpError as error:
-            logger.error(f"Error getting email details for {msg_id}: {error}")
-            return None
-        except Exception as e:
-            logger.error(f"Unexpected error getting email details: {e}")
-            return None
+        def collect(request_id, response, exception):
+            if exception is not None:
+                # A rate-limited part pauses the bucket; the ID is retried next cycle
+                self.quota.note_error(exception, 'messages.get')
+                errors[request_id] = exception
+            else:
+                results[request_id] = response
+
+        for start in range(0, len(msg_ids), BATCH_SIZE):
+            chunk = msg_ids[start:start + BATCH_SIZE]
+            batch = self.service.new_batch_http_request(callback=collect)
+            for msg_id in chunk:
+                batch.add(self.service.users().messages().get(userId='me', id=msg_id, **params),
+                          request_id=msg_id)
+            try:
+                self.quota.execute_batch(batch, 'messages.get', len(chunk), priority)
+            except Exception as e:
+                # The whole batch failed (network, auth): report every ID in it as failed
+                logger.error(f"Batch fetch failed: {e}")
+                for msg_id in chunk:
+                    errors.setdefault(msg_id, e)
+
+        return results, errors
+
+    def parse_headers(self, message: Dict) -> Dict:
+        """id, subject, from, date and snippet of a message resource"""
+        headers = message.get('payload', {}).get('headers', [])
+        subject = next((h['value'] for h in headers if h['name'].lower() == 'subject'), 'No Subject')
+        from_email = next((h['value'] for h in headers if h['name'].lower() == 'from'), 'Unknown')
+        date = next((h['value'] for h in headers if h['name'].lower() == 'date'), '')
+        return {
+            'id': message['id'],
+            'subject': subject,
+            'from': from_email,
+            'date': date,
+            'snippet': message.get('snippet', '')
+        }
+
+    def needs_body(self, email: Dict, labels: List[str]) -> bool:
+        """Whether the full body could change the classification made from metadata"""
+        if BODY_SKIP_LABELS.intersection(labels):
+            return False
+        return not self.is_work_related_email(email)
+
+    def fetch_emails(self, msg_ids: List[str]) -> Tuple[List[Dict], List[str]]:
+        """Email dicts for create_action_item, in order, plus the IDs that failed to fetch"""
+        if not msg_ids:
+            return [], []
+
+        metadata, errors = self.batch_get(msg_ids, format='metadata',
+                                          metadataHeaders=METADATA_HEADERS, fields=METADATA_FIELDS)
+        emails, labels = [], {}
+        for msg_id in msg_ids:
+            if msg_id in metadata:
+                emails.append(self.parse_headers(metadata[msg_id]))
+                labels[msg_id] = metadata[msg_id].get('labelIds', [])
+
+        body_ids = [email['id'] for email in emails if self.needs_body(email, labels[email['id']])]
+        # Important/starred bodies go ahead of the rest when quota is short
+        urgent_ids = [msg_id for msg_id in body_ids if HIGH_PRIORITY_LABELS.intersection(labels[msg_id])]
+        other_ids = [msg_id for msg_id in body_ids if not HIGH_PRIORITY_LABELS.intersection(labels[msg_id])]
+        bodies, body_errors = self.batch_get(urgent_ids, PRIORITY_HIGH, format='full', fields=BODY_FIELDS)
+        other_bodies, other_errors = self.batch_get(other_ids, PRIORITY_BACKGROUND, format='full', fields=BODY_FIELDS)
+        bodies.update(other_bodies)
+        body_errors.update(other_errors)
+        errors.update(body_errors)
+
+        ready = []
+        for email in emails:
+            if email['id'] in body_errors:
+                continue
+            body = bodies.get(email['id'])
+            email['body'] = self.get_email_body(dict(body, snippet=email['snippet'])) if body else ''
+            ready.append(email)
+
+        failed = []
+        for msg_id, error in errors.items():
+            if isinstance(error, HttpError) and error.resp.status == 404:
+                logger.warning(f"Email {msg_id} no longer exists, skipping")
+            else:
+                logger.error(f"Error getting email details for {msg_id}: {error}")
+                failed.append(msg_id)
+
+        logger.debug(f"Fetched {len(emails)} email(s) as metadata, {len(body_ids)} with full body")
+        return ready, failed
 
     def get_email_body(self, message: Dict) -> str:
-        """Extract email body from message payload"""
+        """Extract email body from message payload (bounded by GMAIL_BODY_MAX_BYTES)"""
         try:
-            if 'parts' in message['payload']:
-                # Multipart message
-                for part in message['payload']['parts']:
-                    if part['mimeType'] == 'text/plain':
-                        data = part['body'].get('data', '')
-                        if data:
-                            return base64.urlsafe_b64decode(data).decode('utf-8')
-                    elif part['mimeType'] == 'text/html':
-                        # Fallback to HTML if no plain text
-                        data = part['body'].get('data', '')
-                        if data:
-                            html = base64.urlsafe_b64decode(data).decode('utf-8')
-                            # Basic HTML stripping
-                            text = re.sub('<[^<]+?>', '', html)
-                            return text
-            else:
-                # Simple message
-                data = message['payload']['body'].get('data', '')
-                if data:
-                    return base64.urlsafe_b64decode(data).decode('utf-8')
-
-            return message.get('snippet', '')
+            body = extract_body(message['payload'], BODY_MAX_BYTES)
+            return body if body is not None else message.get('snippet', '')
 
         except Exception as e:
             logger.error(f"Error extracting email body: {e}")
@@ -330,6 +472,7 @@ class GmailWatcher:
                     'status': 'system_load_high'
                 }
                 self.save_email_to_queue(email_simple, False)  # Save to general queue with note
+                self.processed_ids.add(email['id'])  # queued, so not fetched again
                 return
 
             # Determine if work-related email
@@ -350,7 +493,6 @@ class GmailWatcher:
 
             # Mark as processed
             self.processed_ids.add(email['id'])
-            self.save_processed_ids()
 
             logger.info(f"Processed email as { 'WORK_RELATED' if is_work_related else 'GENERAL' }: {email['subject']}")
 
@@ -359,45 +501,61 @@ class GmailWatcher:
 
     def process_emails(self):
         """Main processing loop for emails"""
-        messages = self.get_unread_important_emails()
+        messages, history_id = self.fetch_new_messages()
 
-        new_emails = 0
-        for msg in messages:
-            msg_id = msg['id']
-
-            # Skip if already processed
-            if msg_id in self.processed_ids:
-                logger.debug(f"Skipping already processed email: {msg_id}")
-                continue
+        # Earlier failures are retried by ID, so the history id never has to wait for them
+        msg_ids = list(dict.fromkeys([msg['id'] for msg in messages] + list(self.retry_ids)))
+        # Skip already processed IDs, then fetch the rest in a few batch round trips
+        new_ids = [msg_id for msg_id in msg_ids if msg_id not in self.processed_ids]
+        emails, failed = self.fetch_emails(new_ids)
 
-            # Get email details
-            email = self.get_email_details(msg_id)
-            if email:
-                self.create_action_item(email)
-                new_emails += 1
+        new_emails = 0
+        for email in emails:
+            self.create_action_item(email)
+            new_emails += 1
+            if email['id'] not in self.processed_ids:
+                failed.append(email['id'])
 
         if new_emails > 0:
             logger.info(f"Processed {new_emails} new email(s)")
 
+        retry_ids = {}
+        for msg_id in failed:
+            attempts = self.retry_ids.get(msg_id, 0) + 1
+            if attempts >= MAX_EMAIL_ATTEMPTS:
+                logger.error(f"Giving up on email {msg_id} after {attempts} failed attempts")
+            else:
+                retry_ids[msg_id] = attempts
+        if retry_ids:
+            logger.warning(f"{len(retry_ids)} email(s) failed, retrying them next cycle")
+
+        # Saved only after the batch is handled, so a crash re-reads it from the old position
+        # next cycle (processed_ids skips the ones already done)
+        if (history_id and history_id != self.history_id) or retry_ids != self.retry_ids:
+            self.save_history_state(history_id or self.history_id, retry_ids)
+
         # Reset retry delay on successful processing
         self.reset_retry_delay()
 
     def run(self):
         """Main run loop"""
         logger.info("Gmail Watcher started")
-        logger.info(f"Checking every {CHECK_INTERVAL} seconds for unread important emails")
+        logger.info(f"Checking every {CHECK_INTERVAL} seconds for unread important emails ({SYNC_MODE} sync)")
 
         # Authenticate
         if not self.authenticate():
             logger.error("Failed to authenticate with Gmail API")
             return
 
-        # Main loop
-        while True:
+        profiler = get_cycle_profiler('gmail_watcher', str(LOG_DIR))
+
+        # Main loop, until stopped or the memory monitor asks for a restart
+        while not self.memory.restart_requested.is_set():
             try:
                 logger.debug("Checking for new emails...")
-                self.process_emails()
-                time.sleep(CHECK_INTERVAL)
+                with profiler.cycle('process_emails'):
+                    self.process_emails()
+                self.memory.restart_requested.wait(CHECK_INTERVAL)
 
             except KeyboardInterrupt:
                 logger.info("Gmail Watcher stopped by user")
@@ -406,8 +564,18 @@ class GmailWatcher:
                 logger.error(f"Unexpected error in main loop: {e}")
                 self.exponential_backoff()
 
+        if self.memory.restart_requested.is_set():
+            logger.warning("Exiting for restart: memory soft limit exceeded")
+            sys.exit(RESTART_EXIT_CODE)
+
 
 def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Gmail Watcher')
+    add_profile_arguments(parser)
+    apply_profile_arguments(parser.parse_args())
+
     watcher = GmailWatcher()
     watcher.run()
 
@@ -15,9 +15,16 @@ import time
 import logging
 from pathlib import Path
 from datetime import datetime
-import json
+import sys
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from utils.keyword_matcher import WHATSAPP_ALERT_CATEGORIES, get_keyword_matcher
+from utils.cycle_profiler import add_profile_arguments, apply_profile_arguments, get_cycle_profiler
+from utils.memory_monitor import RESTART_EXIT_CODE, get_memory_monitor
+from utils.seen_store import open_seen_store
+from utils.slo_tracker import ingest_stamp, mark_stage
+
 # Configure logging
 LOG_DIR = Path('AI_Employee_Vault/Logs')
 LOG_DIR.mkdir(parents=True, exist_ok=True)
@@ -47,11 +54,15 @@ class WhatsAppWatcher:
         self.session_path = Path('sessions/whatsapp')
         self.processed_file = Path('.whatsapp_processed.json')
 
-        # Keywords to filter for urgent messages (as specified)
-        self.keywords = ['urgent', 'asap', 'invoice', 'payment', 'help', 'quote', 'bill']
+        # Keywords to filter for urgent messages, from the shared keyword table
+        self.matcher = get_keyword_matcher()
+        self.keywords = [kw for category in WHATSAPP_ALERT_CATEGORIES for kw in self.matcher.table[category]]
+
+        # Processed message IDs live in the shared seen-ID store (SQLite), not in memory
+        self.processed_messages = open_seen_store('whatsapp', legacy_json=str(self.processed_file))
 
-        # Load processed messages from file
-        self.processed_messages = self.load_processed_messages()
+        # Periodic memory reports
+        self.memory = get_memory_monitor('whatsapp_watcher', str(LOG_DIR))
 
         # Ensure directories exist
         self.needs_action_dir.mkdir(parents=True, exist_ok=True)
@@ -62,29 +73,6 @@ class WhatsAppWatcher:
         logger.info(f"Monitoring keywords: {', '.join(self.keywords)}")
         logger.info(f"Check interval: {self.check_interval} seconds")
 
-    def load_processed_messages(self) -> set:
-        """Load previously processed message IDs from JSON file"""
-        if self.processed_file.exists():
-            try:
-                with open(self.processed_file, 'r') as f:
-                    data = json.load(f)
-                    return set(data.get('processed_ids', []))
-            except Exception as e:
-                logger.error(f"Error loading processed messages: {e}")
-                return set()
-        return set()
-
-    def save_processed_messages(self):
-        """Save processed message IDs to JSON file"""
-        try:
-            with open(self.processed_file, 'w') as f:
-                json.dump({
-                    'processed_ids': list(self.processed_messages),
-                    'last_updated': datetime.now().isoformat()
-                }, f, indent=2)
-        except Exception as e:
-            logger.error(f"Error saving processed messages: {e}")
-
     def check_for_updates(self):
         """
         Check WhatsApp Web for new unread messages containing keywords.
@@ -257,8 +245,7 @@ class WhatsAppWatcher:
                             logger.debug(f"Sender: {sender_name}, Message: {message_text[:50]}")
 
                             # Filter messages with keywords
-                            message_lower = message_text.lower()
-                            matched_keywords = [kw for kw in self.keywords if kw in message_lower]
+                            matched_keywords = self.matcher.keywords(WHATSAPP_ALERT_CATEGORIES, message_text)
 
                             if matched_keywords:
                                 # Create unique message ID
@@ -317,10 +304,13 @@ class WhatsAppWatcher:
             safe_sender = message['from'].replace(' ', '_').replace('/', '_')[:50]
             filename = f"WHATSAPP_{timestamp}_{safe_sender}.md"
             filepath = self.needs_action_dir / filename
+            stamp = ingest_stamp()
 
             # Create content with YAML frontmatter
             content = f"""---
 type: whatsapp
+trace_id: {stamp['trace_id']}
+ingested_at: {stamp['ingested_at']}
 from: {message['from']}
 message_preview: {message['message_preview']}
 keywords_matched: {', '.join(message['keywords_matched'])}
@@ -359,11 +349,11 @@ This message was flagged because it contains urgent keywords: {', '.join(message
             with open(filepath, 'w', encoding='utf-8') as f:
                 f.write(content)
 
+            mark_stage(stamp['trace_id'], 'ingested', source='whatsapp')
             logger.info(f"Created action item: {filename}")
 
             # Mark as processed and save
             self.processed_messages.add(message['id'])
-            self.save_processed_messages()
 
             return filepath
 
@@ -387,18 +377,20 @@ This message was flagged because it contains urgent keywords: {', '.join(message
         logger.info("=" * 60)
 
         iteration = 0
+        profiler = get_cycle_profiler('whatsapp_watcher', str(LOG_DIR))
 
-        while True:
+        while not self.memory.restart_requested.is_set():
             try:
                 iteration += 1
                 logger.info(f"\n--- Check #{iteration} at {datetime.now().strftime('%H:%M:%S')} ---")
 
-                # Check for new messages
-                messages = self.check_for_updates()
+                with profiler.cycle(f"check_{iteration}"):
+                    # Check for new messages
+                    messages = self.check_for_updates()
 
-                # Create action items for each urgent message
-                for message in messages:
-                    self.create_action_item(message)
+                    # Create action items for each urgent message
+                    for message in messages:
+                        self.create_action_item(message)
 
                 if messages:
                     logger.info(f"✓ Processed {len(messages)} urgent message(s)")
@@ -407,7 +399,7 @@ This message was flagged because it contains urgent keywords: {', '.join(message
 
                 # Wait before next check
                 logger.info(f"Waiting {self.check_interval} seconds until next check...")
-                time.sleep(self.check_interval)
+                self.memory.restart_requested.wait(self.check_interval)
 
             except KeyboardInterrupt:
                 logger.info("\n" + "=" * 60)
@@ -420,7 +412,17 @@ This message was flagged because it contains urgent keywords: {', '.join(message
                 logger.info("Waiting 30 seconds before retry...")
                 time.sleep(30)
 
+        if self.memory.restart_requested.is_set():
+            logger.warning("Exiting for restart: memory soft limit exceeded")
+            sys.exit(RESTART_EXIT_CODE)
+
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='WhatsApp Watcher')
+    add_profile_arguments(parser)
+    apply_profile_arguments(parser.parse_args())
+
     watcher = WhatsAppWatcher(check_interval=30)
     watcher.run()
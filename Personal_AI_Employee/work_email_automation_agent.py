@@ -14,6 +14,9 @@ import re
 import psutil
 from typing import Dict, Any, List
 
+from utils.keyword_matcher import get_keyword_matcher
+from utils.slo_tracker import mark_stage
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -170,32 +173,21 @@ def extract_job_details_from_email(email_body: str) -> Dict[str, Any]:
     return details
 
 def assign_priority(email_body: str, position: str, subject: str) -> str:
-    """Assign priority level as per requirements:
-    HIGH → job offer / interview
-    MEDIUM → freelance or recruiter message
-    LOW → hiring newsletter
-    """
-    body_lower = email_body.lower()
-    subject_lower = subject.lower()
-    position_lower = position.lower() if position else ""
+    """Assign priority level based on email content"""
+    matcher = get_keyword_matcher()
+    hits = matcher.scan(email_body, subject)
 
     # HIGH priority: job offer or interview
-    high_keywords = ['offer', 'interview', 'selected', 'congratulations', 'hiring manager', 'next steps', 'final round']
-    for keyword in high_keywords:
-        if keyword in body_lower or keyword in subject_lower or keyword in position_lower:
-            return 'HIGH'
+    if 'job_offer' in hits or (position and 'job_offer' in matcher.categories(position)):
+        return 'HIGH'
 
     # MEDIUM priority: freelance or recruiter message
-    medium_keywords = ['freelance', 'contract', 'recruiter', 'agency', 'talent', 'hiring']
-    for keyword in medium_keywords:
-        if keyword in body_lower or keyword in subject_lower:
-            return 'MEDIUM'
+    if 'job_lead' in hits:
+        return 'MEDIUM'
 
     # LOW priority: hiring newsletter
-    low_keywords = ['newsletter', 'update', 'digest', 'opportunities', 'jobs this week']
-    for keyword in low_keywords:
-        if keyword in body_lower or keyword in subject_lower:
-            return 'LOW'
+    if 'job_digest' in hits:
+        return 'LOW'
 
     # Default to MEDIUM if it's work-related
     return 'MEDIUM'
@@ -261,7 +253,8 @@ def generate_professional_response(email_info: Dict[str, Any], job_details: Dict
 
     return full_response
 
-def save_to_approval_queue(company: str, position: str, priority: str, draft_response: str):
+def save_to_approval_queue(company: str, position: str, priority: str, draft_response: str,
+                           trace_id: str = None):
     """Save draft response to approval queue as per requirements."""
     approval_data = {
         "company": company,
@@ -269,7 +262,8 @@ def save_to_approval_queue(company: str, position: str, priority: str, draft_res
         "priority": priority,
         "draft_response": draft_response,
         "status": "AWAITING USER APPROVAL",
-        "timestamp": datetime.now().isoformat()
+        "timestamp": datetime.now().isoformat(),
+        "trace_id": trace_id
     }
 
     try:
@@ -285,6 +279,7 @@ def save_to_approval_queue(company: str, position: str, priority: str, draft_res
         with open(APPROVAL_QUEUE_FILE, 'w') as f:
             json.dump(queue_data, f, indent=2)
 
+        mark_stage(trace_id, 'approval_requested', position=position)
         logger.info(f"Saved approval request for: {company} - {position}")
 
     except Exception as e:
@@ -326,6 +321,8 @@ def process_work_email_queue():
                     )
                     continue
 
+                mark_stage(email.get('trace_id'), 'picked_up')
+
                 # Extract job details from email
                 email_body = email.get('body', email.get('snippet', ''))
                 job_details = extract_job_details_from_email(email_body)
@@ -335,13 +332,15 @@ def process_work_email_queue():
 
                 # Generate professional response as per requirements
                 draft_response = generate_professional_response(email, job_details)
+                mark_stage(email.get('trace_id'), 'planned', intent='job_reply')
 
                 # Save to approval queue (instead of sending automatically) as per requirements
                 save_to_approval_queue(
                     company=job_details.get('company_name', 'Unknown Company'),
                     position=job_details.get('position', 'Unknown Position'),
                     priority=priority,
-                    draft_response=draft_response
+                    draft_response=draft_response,
+                    trace_id=email.get('trace_id')
                 )
 
                 processed_count += 1